@@ -0,0 +1,311 @@
+"""
+Latency/throughput benchmark for the Flight Booking MCP Server.
+
+Generates a synthetic inventory, then times search_flights, book_flight, cancel_booking,
+the flight resources and the prompts either in-process (through FastMCP's call_tool/
+read_resource/get_prompt) or end-to-end over stdio against run_mcp_server.py. Results can
+be saved as JSON and compared against an earlier run.
+
+Searches run twice: "distinct" gives every call its own cache key, so each one misses the
+search cache, and "repeat" cycles through a small hot set, so it mostly hits. The search
+cache hit ratio of each workload is reported next to its percentiles. --cache cold sets
+SEARCH_CACHE_SIZE=0 so that no search is ever answered from the cache.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server_code')
+sys.path.insert(0, SERVER_DIR)
+
+from DB.flights_DB import generate_synthetic_flights
+
+
+def write_inventory(path, size, seed):
+    """Write the synthetic inventory as JSONL and return (route/date queries, flight ids)."""
+    queries = set()
+    flight_ids = []
+    with open(path, "w", encoding="utf-8") as fh:
+        for flight in generate_synthetic_flights(size, seed=seed):
+            fh.write(flight.model_dump_json() + "\n")
+            flight_ids.append(flight.flight_id)
+            queries.add((flight.origin, flight.destination, flight.departure_time.date().isoformat()))
+    return sorted(queries), flight_ids
+
+
+def summarize(samples, wall_seconds):
+    samples = sorted(samples)
+    count = len(samples)
+
+    def pct(p):
+        return samples[min(count - 1, int(round(p / 100 * (count - 1))))] * 1000
+
+    return {
+        "count": count,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p95_ms": round(pct(95), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(samples[-1] * 1000, 3),
+        "ops_per_sec": round(count / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+
+async def measure(calls, warmup):
+    """Await each zero-arg coroutine factory in `calls`, timing all but the first `warmup`."""
+    samples = []
+    start = None
+    for i, call in enumerate(calls):
+        if i == warmup:
+            start = time.perf_counter()
+        t0 = time.perf_counter()
+        await call()
+        if i >= warmup:
+            samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def measure_cached(calls, warmup, cache_stats):
+    """Like measure(), and add the search cache hit ratio over the timed calls."""
+    for call in calls[:warmup]:
+        await call()
+    before = await cache_stats()
+    stats = await measure(calls[warmup:], 0)
+    after = await cache_stats()
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    stats["cache_hit_ratio"] = round(hits / lookups, 4) if lookups else None
+    return stats
+
+
+SEARCH_VARIANTS = [(passenger, sort_by) for sort_by in ("price", "departure") for passenger in (1, 2, 3)]
+
+
+def search_arguments(queries, index):
+    """The index-th of all (route/date, party size, sort order) search combinations."""
+    query, variant = divmod(index, len(SEARCH_VARIANTS))
+    origin, destination, departure_date = queries[query]
+    passenger, sort_by = SEARCH_VARIANTS[variant]
+    return {
+        "origin": origin, "destination": destination, "departure_date": departure_date,
+        "passenger": passenger, "sort_by": sort_by,
+    }
+
+
+def booking_id_of(payload):
+    if "result" in payload and isinstance(payload["result"], dict):
+        payload = payload["result"]
+    return payload.get("booking_id")
+
+
+async def run_workload(call_tool, read_resource, get_prompt, queries, flight_ids, args):
+    rng = random.Random(args.seed)
+    results = {}
+    warmup = args.warmup
+    count = args.iterations + warmup
+
+    async def cache_stats():
+        return json.loads(await read_resource("file://search_cache_stats/"))
+
+    # Distinct searches are sampled without replacement, so no call can be answered from the
+    # cache; repeat searches draw from a hot set of 20.
+    combinations = len(queries) * len(SEARCH_VARIANTS)
+    if combinations >= count:
+        distinct = rng.sample(range(combinations), count)
+    else:
+        distinct = [rng.randrange(combinations) for _ in range(count)]
+    hot = rng.sample(range(combinations), min(20, combinations))
+    for name, indexes in (("distinct", distinct), ("repeat", [rng.choice(hot) for _ in range(count)])):
+        results[f"search_flights ({name})"] = await measure_cached(
+            [lambda a=search_arguments(queries, i): call_tool("search_flights", a) for i in indexes],
+            warmup,
+            cache_stats,
+        )
+
+    booking_ids = []
+
+    async def book(flight_id):
+        payload = await call_tool("book_flight", {"flight_id": flight_id, "passenger_name": "Bench Passenger", "num_seats": 1})
+        booking_id = booking_id_of(payload)
+        if booking_id:
+            booking_ids.append(booking_id)
+
+    results["book_flight"] = await measure(
+        [lambda f=rng.choice(flight_ids): book(f) for _ in range(count)], warmup
+    )
+
+    cancels = [lambda b=b: call_tool("cancel_booking", {"booking_id": b}) for b in booking_ids]
+    if len(cancels) > warmup:
+        results["cancel_booking"] = await measure(cancels, warmup)
+
+    results["file://flight_details/{flight_id}"] = await measure(
+        [lambda f=rng.choice(flight_ids): read_resource(f"file://flight_details/{f}")
+         for _ in range(count)],
+        warmup,
+    )
+    pages = max(1, len(flight_ids) // 500)
+    results["file://flights/page/{cursor}"] = await measure(
+        [lambda c=rng.randrange(pages): read_resource(f"file://flights/page/{c}")
+         for _ in range(count)],
+        warmup,
+    )
+    results["file://flights"] = await measure(
+        [lambda: read_resource("file://flights/") for _ in range(args.resource_iterations + 1)], 1
+    )
+
+    results["prompt flight_search_prompt"] = await measure(
+        [lambda q=rng.choice(queries): get_prompt("flight_search_prompt", {
+            "origin": q[0], "destination": q[1], "date": q[2], "passenger": str(rng.randint(1, 3)),
+        }) for _ in range(count)],
+        warmup,
+    )
+    results["prompt handle_disruption"] = await measure(
+        [lambda f=rng.choice(flight_ids): get_prompt("handle_disruption", {"flight_id": f, "reason": "weather"})
+         for _ in range(count)],
+        warmup,
+    )
+    return results
+
+
+async def bench_in_process(queries, flight_ids, args):
+    from mcp_instance import mcp
+    import tools
+    import resources
+    import promts
+
+    async def call_tool(name, arguments):
+        result = await mcp.call_tool(name, arguments)
+        if isinstance(result, tuple):
+            return result[1]
+        return json.loads(result[0].text) if result else {}
+
+    async def read_resource(uri):
+        return (await mcp.read_resource(uri))[0].content
+
+    async def get_prompt(name, arguments):
+        return await mcp.get_prompt(name, arguments)
+
+    return await run_workload(call_tool, read_resource, get_prompt, queries, flight_ids, args)
+
+
+async def bench_stdio(inventory_path, queries, flight_ids, args):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    env = dict(os.environ, FLIGHT_SCHEDULE_PATH=inventory_path, FLIGHT_DB_BACKEND=args.backend)
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(SERVER_DIR, "run_mcp_server.py")],
+        env=env,
+    )
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(server_params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+
+                async def call_tool(name, arguments):
+                    result = await session.call_tool(name, arguments)
+                    if result.structuredContent is not None:
+                        return result.structuredContent
+                    return json.loads(result.content[0].text) if result.content else {}
+
+                async def read_resource(uri):
+                    return (await session.read_resource(uri)).contents[0].text
+
+                async def get_prompt(name, arguments):
+                    return await session.get_prompt(name, arguments)
+
+                return await run_workload(call_tool, read_resource, get_prompt, queries, flight_ids, args)
+
+
+def print_report(report, baseline=None):
+    print("=" * 94)
+    print(
+        f"Flight Booking MCP benchmark — mode={report['mode']} cache={report['cache']} "
+        f"flights={report['inventory_size']:,}"
+    )
+    print("=" * 94)
+    header = f"{'operation':<36}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'ops/sec':>11}{'hit %':>8}"
+    if baseline:
+        header += f"{'Δp50':>10}"
+    print(header)
+    print("-" * 94)
+    for name, stats in report["results"].items():
+        line = f"{name:<36}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}{stats['ops_per_sec']:>11,.0f}"
+        ratio = stats.get("cache_hit_ratio")
+        line += f"{ratio:>8.1%}" if ratio is not None else f"{'':>8}"
+        old = (baseline or {}).get("results", {}).get(name)
+        if old and old["p50_ms"]:
+            line += f"{(stats['p50_ms'] - old['p50_ms']) / old['p50_ms']:>+10.1%}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("in-process", "stdio"), default="in-process")
+    parser.add_argument("--flights", type=int, default=100_000, help="synthetic inventory size")
+    parser.add_argument("--backend", default="memory", help="FLIGHT_DB_BACKEND for the server")
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--cache", choices=("warm", "cold"), default="warm",
+                        help="cold sets SEARCH_CACHE_SIZE=0 so searches never hit the search cache")
+    parser.add_argument("--resource-iterations", type=int, default=5, help="reads of the full file://flights resource")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare p50 latency against")
+    args = parser.parse_args()
+
+    if args.cache == "cold":
+        os.environ["SEARCH_CACHE_SIZE"] = "0"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        inventory_path = os.path.join(tmp, "inventory.jsonl")
+        queries, flight_ids = write_inventory(inventory_path, args.flights, args.seed)
+
+        if args.mode == "in-process":
+            os.environ["FLIGHT_SCHEDULE_PATH"] = inventory_path
+            os.environ["FLIGHT_DB_BACKEND"] = args.backend
+            if args.backend == "sqlite":
+                os.environ.setdefault("FLIGHT_DB_PATH", os.path.join(tmp, "bench.db"))
+            if args.backend == "snapshot":
+                os.environ.setdefault("FLIGHT_SNAPSHOT_PATH", os.path.join(tmp, "bench.snap"))
+            results = asyncio.run(bench_in_process(queries, flight_ids, args))
+        else:
+            if args.backend == "sqlite":
+                os.environ.setdefault("FLIGHT_DB_PATH", os.path.join(tmp, "bench.db"))
+            if args.backend == "snapshot":
+                os.environ.setdefault("FLIGHT_SNAPSHOT_PATH", os.path.join(tmp, "bench.snap"))
+            results = asyncio.run(bench_stdio(inventory_path, queries, flight_ids, args))
+
+    report = {
+        "mode": args.mode,
+        "backend": args.backend,
+        "cache": args.cache,
+        "inventory_size": args.flights,
+        "iterations": args.iterations,
+        "python": platform.python_version(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "results": results,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
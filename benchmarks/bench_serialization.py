@@ -0,0 +1,96 @@
+"""
+Payload encode benchmark for the Flight Booking MCP Server.
+
+Times how long it takes to turn a search_flights result of N flights into MCP tool content
+(the unstructured text blocks plus structured content), reported per 10k flights:
+
+  legacy       flight.dict() per row, then FastMCP's convert_result()
+  typeadapter  one precompiled TypeAdapter dump for the list, then convert_result()
+  direct       the TypeAdapter dump, then serialization.encode_tool_result()
+
+The low-level server's output schema check and the transport framing that follow are the
+same for every path; they are timed once for reference.
+"""
+import argparse
+import json
+import platform
+import time
+import warnings
+from datetime import datetime
+
+import bench_mcp  # noqa: F401  (puts server_code on sys.path)
+from bench_mcp import summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=10_000, help="flights per encoded result")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    import jsonschema
+    from mcp.types import CallToolResult
+    from DB.flights_DB import generate_synthetic_flights
+    from mcp_instance import mcp
+    from serialization import dump_flights, encode_tool_result
+    import tools  # noqa: F401  (registers search_flights)
+
+    flights = list(generate_synthetic_flights(args.flights, seed=args.seed))
+    tool = mcp._tool_manager.get_tool("search_flights")
+    metadata = tool.fn_metadata
+    warnings.simplefilter("ignore", DeprecationWarning)
+
+    paths = {
+        "legacy": lambda: metadata.convert_result([flight.dict() for flight in flights]),
+        "typeadapter": lambda: metadata.convert_result(dump_flights(flights)),
+        "direct": lambda: encode_tool_result(metadata, dump_flights(flights)),
+    }
+    content, structured = paths["direct"]()
+    reference = {
+        "output_schema_check": lambda: jsonschema.validate(structured, tool.output_schema),
+        "transport_framing": lambda: CallToolResult(
+            content=list(content), structuredContent=structured
+        ).model_dump_json(by_alias=True, exclude_none=True),
+    }
+    if paths["legacy"]() != (content, structured):
+        raise SystemExit("encoded payloads differ between paths")
+
+    scale = 10_000 / args.flights
+    results = {}
+    for name, encode in {**paths, **reference}.items():
+        encode()
+        samples = []
+        start = time.perf_counter()
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            encode()
+            samples.append((time.perf_counter() - t0) * scale)
+        results[name] = summarize(samples, time.perf_counter() - start)
+
+    print("=" * 70)
+    print(f"Flight Booking MCP payload encode — {args.flights:,} flights, {args.runs} runs, per 10k flights")
+    print("=" * 70)
+    print(f"{'path':<24}{'p50 ms':>10}{'mean ms':>10}{'max ms':>10}{'speedup':>10}")
+    print("-" * 70)
+    legacy = results["legacy"]["p50_ms"]
+    for name, stats in results.items():
+        speedup = f"{legacy / stats['p50_ms']:.2f}x" if name in paths else ""
+        print(f"{name:<24}{stats['p50_ms']:>10.1f}{stats['mean_ms']:>10.1f}{stats['max_ms']:>10.1f}{speedup:>10}")
+
+    if args.output:
+        report = {
+            "flights": args.flights,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
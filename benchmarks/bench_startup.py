@@ -0,0 +1,97 @@
+"""
+Cold-start benchmark for the Flight Booking MCP Server.
+
+Spawns run_mcp_server.py over stdio again and again, the way MCP clients launch it, and
+measures the time from process spawn to the initialize response, to the list_tools
+response, and to the first search_flights answer (which waits for the inventory to load).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from bench_mcp import SERVER_DIR, summarize, write_inventory
+
+
+async def cold_start(env, query):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    server_params = StdioServerParameters(
+        command=sys.executable,
+        args=[os.path.join(SERVER_DIR, "run_mcp_server.py")],
+        env=env,
+    )
+    timings = {}
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull:
+        async with stdio_client(server_params, errlog=devnull) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                timings["initialize"] = time.perf_counter() - start
+                await session.list_tools()
+                timings["list_tools"] = time.perf_counter() - start
+                await session.call_tool("search_flights", query)
+                timings["first_search"] = time.perf_counter() - start
+                status = await session.read_resource("file://status")
+                timings["inventory_load"] = json.loads(status.contents[0].text)["inventory"]["load_seconds"] or 0.0
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flights", type=int, default=100_000, help="synthetic inventory size (0 = mock flights)")
+    parser.add_argument("--backend", default="memory", help="FLIGHT_DB_BACKEND for the server")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, FLIGHT_DB_BACKEND=args.backend)
+        query = {"origin": "NYC", "destination": "LAX", "departure_date": datetime.now().date().isoformat()}
+        if args.flights:
+            inventory_path = os.path.join(tmp, "inventory.jsonl")
+            queries, _ = write_inventory(inventory_path, args.flights, args.seed)
+            env["FLIGHT_SCHEDULE_PATH"] = inventory_path
+            query = dict(zip(("origin", "destination", "departure_date"), queries[0]))
+        # A snapshot is built by the first run and only mapped by the later ones.
+        env.setdefault("FLIGHT_SNAPSHOT_PATH", os.path.join(tmp, "startup.snap"))
+        samples = {}
+        for run in range(args.runs):
+            if args.backend == "sqlite":
+                # A fresh store per run, so every start pays the full load.
+                env["FLIGHT_DB_PATH"] = os.path.join(tmp, f"startup-{run}.db")
+            for name, seconds in asyncio.run(cold_start(env, query)).items():
+                samples.setdefault(name, []).append(seconds)
+
+    results = {name: summarize(values, sum(values)) for name, values in samples.items()}
+    print("=" * 70)
+    print(f"Flight Booking MCP cold start — backend={args.backend} flights={args.flights:,} runs={args.runs}")
+    print("=" * 70)
+    print(f"{'milestone (from spawn)':<28}{'p50 ms':>10}{'mean ms':>10}{'max ms':>10}")
+    print("-" * 70)
+    for name, stats in results.items():
+        print(f"{name:<28}{stats['p50_ms']:>10.1f}{stats['mean_ms']:>10.1f}{stats['max_ms']:>10.1f}")
+
+    if args.output:
+        report = {
+            "backend": args.backend,
+            "inventory_size": args.flights,
+            "runs": args.runs,
+            "python": platform.python_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
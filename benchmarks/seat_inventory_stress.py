@@ -0,0 +1,114 @@
+"""
+Stress benchmark for the seat inventory: hammers reserve/release from many threads
+and verifies that no flight is ever oversold.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'server_code'))
+
+from schemas.Flight1 import Flight
+from DB.flight_index import FlightIndex
+from DB.seat_inventory import SeatInventory
+
+
+def build_inventory(num_flights, seats_per_flight):
+    flights = {}
+    index = FlightIndex()
+    departure = datetime.now() + timedelta(days=1)
+    for i in range(num_flights):
+        flight = Flight(
+            flight_id=f"F{i}",
+            airline="BenchAir",
+            flight_number=f"BA{i}",
+            origin="NYC",
+            destination="LAX",
+            departure_time=departure,
+            arrival_time=departure + timedelta(hours=5),
+            price=100.0 + i % 50,
+            available_seats=seats_per_flight,
+        )
+        flights[flight.flight_id] = flight
+        index.add(flight)
+    return flights, index
+
+
+def worker(inventory, flight_ids, attempts, cancel_ratio, seed):
+    rng = random.Random(seed)
+    held = []
+    booked = 0
+    rejected = 0
+    for _ in range(attempts):
+        if held and rng.random() < cancel_ratio:
+            flight_id, seats = held.pop(rng.randrange(len(held)))
+            inventory.release(flight_id, seats)
+            continue
+        flight_id = rng.choice(flight_ids)
+        seats = rng.randint(1, 4)
+        if inventory.reserve(flight_id, seats) is None:
+            rejected += 1
+        else:
+            held.append((flight_id, seats))
+            booked += 1
+    return booked, rejected, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flights", type=int, default=1000)
+    parser.add_argument("--seats", type=int, default=150)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=20000, help="reserve/release attempts per thread")
+    parser.add_argument("--cancel-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    flights, index = build_inventory(args.flights, args.seats)
+    inventory = SeatInventory(flights, index)
+    flight_ids = list(flights)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        futures = [
+            pool.submit(worker, inventory, flight_ids, args.attempts, args.cancel_ratio, seed)
+            for seed in range(args.threads)
+        ]
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    held_per_flight = dict.fromkeys(flight_ids, 0)
+    booked = rejected = 0
+    for b, r, held in results:
+        booked += b
+        rejected += r
+        for flight_id, seats in held:
+            held_per_flight[flight_id] += seats
+
+    oversold = [
+        fid for fid, flight in flights.items()
+        if flight.available_seats < 0 or flight.available_seats + held_per_flight[fid] != args.seats
+    ]
+
+    print("=" * 60)
+    print("Seat inventory stress benchmark")
+    print("=" * 60)
+    print(f"Flights:          {args.flights} x {args.seats} seats")
+    print(f"Threads:          {args.threads}")
+    print(f"Bookings:         {booked} ({rejected} rejected for lack of seats)")
+    print(f"Elapsed:          {elapsed:.3f}s")
+    print(f"Bookings/sec:     {booked / elapsed:,.0f}")
+    print(f"Operations/sec:   {args.threads * args.attempts / elapsed:,.0f}")
+    print(f"Oversold flights: {len(oversold)}")
+
+    if oversold:
+        print("✗ Seat counts diverged from confirmed bookings!")
+        sys.exit(1)
+    print("✓ Zero oversell")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# DB/airport_index.py
+import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+AIRPORTS_PATH = os.environ.get("AIRPORTS_PATH") or os.path.join(os.path.dirname(__file__), "airports.csv")
+
+# Score bands: an exact code beats an exact city/name/alias, which beats any prefix or typo match.
+CODE_SCORE = 1.0
+EXACT_SCORE = 0.95
+MIN_FUZZY_SIMILARITY = 0.4
+
+
+def normalize(text: str) -> str:
+    """Lower-case, accents stripped, punctuation folded to single spaces ("São Paulo" -> "sao paulo")."""
+    text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.casefold()).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(frozen=True)
+class Airport:
+    code: str
+    kind: str  # "airport", or "metro" for a city code covering several airports
+    name: str
+    city: str
+    country: str
+    metro: Optional[str] = None
+    aliases: Tuple[str, ...] = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        entry = {"code": self.code, "kind": self.kind, "name": self.name, "city": self.city, "country": self.country}
+        if self.metro:
+            entry["metro"] = self.metro
+        return entry
+
+
+def load_airports(path: str = AIRPORTS_PATH) -> List[Airport]:
+    """Read the reference CSV: code, kind, name, city, country, metro, aliases ("|"-separated)."""
+    with open(path, newline="", encoding="utf-8") as fh:
+        return [
+            Airport(
+                code=row["code"].strip().upper(),
+                kind=row.get("kind") or "airport",
+                name=row["name"],
+                city=row["city"],
+                country=row["country"],
+                metro=(row.get("metro") or "").strip().upper() or None,
+                aliases=tuple(alias for alias in (row.get("aliases") or "").split("|") if alias),
+            )
+            for row in csv.DictReader(fh)
+        ]
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.ids: Set[int] = set()
+
+
+class AirportIndex:
+    """Resolves free-text airport input (codes, city or airport names, typos) to airports.
+
+    Every code, city, name and alias is normalized into a term. A character trie over each
+    term and every word-suffix of it ("kennedy international airport") answers prefix queries
+    in O(len(query)); a trigram index over the terms finds misspellings by shared trigrams.
+    Both only propose candidates, which are then scored against their own terms, so a query
+    costs a few dictionary walks plus work proportional to the candidates, not the dataset.
+    """
+
+    def __init__(self, airports: Iterable[Airport]):
+        self.airports: List[Airport] = list(airports)
+        self._by_code: Dict[str, int] = {airport.code: i for i, airport in enumerate(self.airports)}
+        self._members: Dict[str, List[str]] = {}
+        self._terms: List[Tuple[int, str, str, Set[str]]] = []  # (airport, term, kind, trigrams)
+        self._terms_of: Dict[int, List[int]] = {}
+        self._trie = _TrieNode()
+        self._trigrams: Dict[str, List[int]] = {}
+        for i, airport in enumerate(self.airports):
+            if airport.metro:
+                self._members.setdefault(airport.metro, []).append(airport.code)
+            self._add_term(i, airport.code, "code")
+            for kind, text in (("city", airport.city), ("name", airport.name)):
+                self._add_term(i, text, kind)
+            for alias in airport.aliases:
+                self._add_term(i, alias, "alias")
+
+    def _add_term(self, airport: int, text: str, kind: str) -> None:
+        term = normalize(text)
+        if not term:
+            return
+        grams = trigrams(term)
+        term_id = len(self._terms)
+        self._terms.append((airport, term, kind, grams))
+        self._terms_of.setdefault(airport, []).append(term_id)
+        for gram in grams:
+            self._trigrams.setdefault(gram, []).append(term_id)
+        words = term.split(" ")
+        for start in range(len(words)):
+            node = self._trie
+            for char in " ".join(words[start:]):
+                node = node.children.setdefault(char, _TrieNode())
+                node.ids.add(airport)
+
+    def __len__(self) -> int:
+        return len(self.airports)
+
+    def get(self, code: str) -> Optional[Airport]:
+        i = self._by_code.get(code.strip().upper())
+        return self.airports[i] if i is not None else None
+
+    def members(self, metro: str) -> List[str]:
+        """Codes of the airports a metro code covers."""
+        return list(self._members.get(metro.upper(), ()))
+
+    def _prefixed(self, query: str) -> Set[int]:
+        node = self._trie
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+    def _score(self, airport: int, query: str, query_grams: Set[str]) -> Tuple[float, str]:
+        best, match = 0.0, ""
+        for term_id in self._terms_of[airport]:
+            _, term, kind, grams = self._terms[term_id]
+            if term == query:
+                score, how = (CODE_SCORE, "code") if kind == "code" else (EXACT_SCORE, kind)
+            elif f" {query}" in f" {term}":
+                # Starts the term or one of its words: longer prefixes score higher.
+                score, how = 0.5 + 0.4 * len(query) / len(term), "prefix"
+            else:
+                shared = len(grams & query_grams)
+                similarity = 2 * shared / (len(grams) + len(query_grams))
+                if similarity < MIN_FUZZY_SIMILARITY:
+                    continue
+                score, how = 0.85 * similarity, "fuzzy"
+            if score > best:
+                best, match = score, how
+        return best, match
+
+    def resolve(self, query: str, limit: int = 5, prefer: Set[str] = frozenset()) -> List[Tuple[Airport, str, float]]:
+        """Best `limit` (airport, match, score) candidates for `query`, highest score first.
+
+        match is "code", "city", "name" or "alias" for an exact match, "prefix" when the query
+        starts the code/name or one of its words, and "fuzzy" for a close misspelling. Equal
+        scores rank codes in `prefer` first, then metro codes, then by code.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        query_grams = trigrams(query)
+        candidates = set(self._prefixed(query))
+        hits = Counter(self._terms[term_id][0] for gram in query_grams for term_id in self._trigrams.get(gram, ()))
+        candidates.update(airport for airport, shared in hits.items() if shared >= len(query_grams) // 3)
+        found = []
+        for airport in candidates:
+            score, match = self._score(airport, query, query_grams)
+            if score > 0:
+                found.append((self.airports[airport], match, round(score, 3)))
+        found.sort(key=lambda entry: (-entry[2], entry[0].code not in prefer, entry[0].kind != "metro", entry[0].code))
+        return found[:limit]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_airport_index() -> AirportIndex:
+    """The airport reference index, loaded from AIRPORTS_PATH on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = AirportIndex(load_airports())
+    return _index
@@ -0,0 +1,57 @@
+# DB/booking_index.py
+import threading
+from itertools import islice
+from typing import Dict, List, Tuple
+
+from schemas.Flight1 import Bookings
+
+
+def passenger_key(name: str) -> str:
+    """Normalized passenger name: case-folded, with runs of whitespace collapsed."""
+    return " ".join(name.split()).casefold()
+
+
+class BookingIndex:
+    """Secondary indexes over a bookings dict, by normalized passenger name and by flight_id.
+
+    Each key maps to an insertion-ordered dict of booking ids, so adding and removing a booking
+    is O(1). A page walks one bucket from its front to the end of the page, O(offset + limit):
+    the bucket is not copied, and no other passenger's or flight's bookings are looked at.
+    """
+
+    def __init__(self, bookings: Dict[str, Bookings]):
+        self.bookings = bookings
+        self._lock = threading.Lock()
+        self.by_passenger: Dict[str, Dict[str, None]] = {}
+        self.by_flight: Dict[str, Dict[str, None]] = {}
+        for booking in bookings.values():
+            self.add(booking)
+
+    def add(self, booking: Bookings) -> None:
+        with self._lock:
+            self.by_passenger.setdefault(passenger_key(booking.passenger_name), {})[booking.booking_id] = None
+            self.by_flight.setdefault(booking.flight_id, {})[booking.booking_id] = None
+
+    def remove(self, booking: Bookings) -> None:
+        keys = ((self.by_passenger, passenger_key(booking.passenger_name)), (self.by_flight, booking.flight_id))
+        with self._lock:
+            for index, key in keys:
+                bucket = index.get(key)
+                if bucket is not None:
+                    bucket.pop(booking.booking_id, None)
+                    if not bucket:
+                        del index[key]
+
+    def _page(self, bucket: Dict[str, None], offset: int, limit: int) -> Tuple[List[Bookings], int]:
+        # Under the lock, since a concurrent add or remove would break iteration over the bucket.
+        with self._lock:
+            ids = list(islice(bucket, offset, offset + limit))
+            total = len(bucket)
+        return [booking for booking in map(self.bookings.get, ids) if booking is not None], total
+
+    def for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self._page(self.by_passenger.get(passenger_key(passenger_name), {}), offset, limit)
+
+    def for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self._page(self.by_flight.get(flight_id, {}), offset, limit)
+
@@ -0,0 +1,411 @@
+# DB/columnar_store.py
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from schemas.Flight1 import Flight, Bookings
+from DB.booking_index import BookingIndex
+from DB.flight_index import NO_FILTERS, SearchFilters
+from DB.repository import FlightRepository, seats_after_reload
+from DB.loader import FlightBatch
+
+EPOCH = datetime(1970, 1, 1)
+SECONDS_PER_DAY = 86_400
+
+
+def to_epoch(value: datetime) -> int:
+    """Seconds since 1970-01-01 of the flight's wall-clock time (tzinfo, if any, is dropped)."""
+    return int((value.replace(tzinfo=None) - EPOCH).total_seconds())
+
+
+def from_epoch(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+def day_start(value: date) -> int:
+    return int(datetime(value.year, value.month, value.day, tzinfo=timezone.utc).timestamp())
+
+
+def select_rows(
+    rows: np.ndarray,
+    price: np.ndarray,
+    departure: np.ndarray,
+    arrival: np.ndarray,
+    sort_by: str = "price",
+    limit: int = 0,
+    filters: SearchFilters = NO_FILTERS,
+    tiebreak: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """The best `limit` of `rows` (all if 0) within `filters`, ordered by price, departure or
+    duration; the other columns are full columns indexed by row.
+
+    When fewer rows are wanted than match, np.partition finds the limit-th smallest sort value
+    in linear time and only the rows up to it (ties included) are sorted.
+    """
+    prices = price[rows].astype(np.float64).round(2)
+    departures = departure[rows]
+    keep = np.ones(len(rows), dtype=bool)
+    if filters.min_price is not None:
+        keep &= prices >= filters.min_price
+    if filters.max_price is not None:
+        keep &= prices <= filters.max_price
+    if filters.depart_after is not None or filters.depart_before is not None:
+        seconds = departures % SECONDS_PER_DAY
+        if filters.depart_after is not None:
+            keep &= seconds >= _seconds_of_day(filters.depart_after)
+        if filters.depart_before is not None:
+            keep &= seconds <= _seconds_of_day(filters.depart_before)
+    rows, prices, departures = rows[keep], prices[keep], departures[keep]
+
+    # np.lexsort sorts by the last key first.
+    if sort_by == "departure":
+        keys = [prices, departures]
+    elif sort_by == "duration":
+        keys = [prices, arrival[rows] - departures]
+    else:
+        keys = [departures, prices]
+    if tiebreak is not None:
+        keys.insert(0, tiebreak[rows])
+    if limit and len(rows) > limit:
+        primary = keys[-1]
+        within = primary <= np.partition(primary, limit - 1)[limit - 1]
+        rows, keys = rows[within], [key[within] for key in keys]
+    order = np.lexsort(keys)
+    return rows[order[:limit] if limit else order]
+
+
+def _seconds_of_day(value) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class StringTable:
+    """Interns repeated strings (airports, airlines) as small integer codes."""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        key = name.lower()
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def lookup(self, name: str) -> Optional[int]:
+        return self._codes.get(name.lower())
+
+
+class ColumnarFlightStore:
+    """Flight inventory held as parallel NumPy columns, one row per flight.
+
+    Airports and airlines are interned to int32 codes, times are int64 epoch seconds, prices
+    (current and loaded base fares) float32 and seats (current and loaded) int32. Row ids per
+    (origin, destination) route are kept so a search only runs its vectorized date/seat filter
+    over that route's rows.
+    """
+
+    def __init__(self, capacity: int = 1024, stripes: int = 1024):
+        self.airports = StringTable()
+        self.airlines = StringTable()
+        self.flight_ids: List[str] = []
+        self.flight_numbers: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.size = 0
+        self.origin = np.empty(capacity, dtype=np.int32)
+        self.destination = np.empty(capacity, dtype=np.int32)
+        self.airline = np.empty(capacity, dtype=np.int32)
+        self.departure = np.empty(capacity, dtype=np.int64)
+        self.arrival = np.empty(capacity, dtype=np.int64)
+        self.price = np.empty(capacity, dtype=np.float32)
+        self.base_price = np.empty(capacity, dtype=np.float32)
+        self.seats = np.empty(capacity, dtype=np.int32)
+        self.base_seats = np.empty(capacity, dtype=np.int32)
+        self._route_rows: Dict[Tuple[int, int], List[int]] = {}
+        self._route_arrays: Dict[Tuple[int, int], np.ndarray] = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _reserve_capacity(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(self.seats)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("origin", "destination", "airline", "departure", "arrival", "base_price", "base_seats"):
+            setattr(self, name, self._grow(getattr(self, name), capacity))
+        # Seat and fare updates write into their columns in place, so block them while swapped out.
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            self.seats = self._grow(self.seats, capacity)
+            self.price = self._grow(self.price, capacity)
+        finally:
+            for lock in self._locks:
+                lock.release()
+
+    def _grow(self, column: np.ndarray, capacity: int) -> np.ndarray:
+        grown = np.empty(capacity, dtype=column.dtype)
+        grown[:self.size] = column[:self.size]
+        return grown
+
+    def add(self, flights: Iterable[Flight]) -> int:
+        flights = list(flights)
+        self._reserve_capacity(len(flights))
+        for flight in flights:
+            row = self.rows.get(flight.flight_id)
+            replaced = row is not None
+            if not replaced:
+                row = self.size
+                self.flight_ids.append(flight.flight_id)
+                self.flight_numbers.append(flight.flight_number)
+            else:
+                self._drop_route_row(row)
+                self.flight_numbers[row] = flight.flight_number
+            origin = self.airports.intern(flight.origin)
+            destination = self.airports.intern(flight.destination)
+            self.origin[row] = origin
+            self.destination[row] = destination
+            self.airline[row] = self.airlines.intern(flight.airline)
+            self.departure[row] = to_epoch(flight.departure_time)
+            self.arrival[row] = to_epoch(flight.arrival_time)
+            self.price[row] = flight.price
+            self.base_price[row] = flight.price
+            with self.lock_for(flight.flight_id):
+                seats = flight.available_seats
+                if replaced:
+                    seats = seats_after_reload(seats, int(self.base_seats[row]), int(self.seats[row]))
+                self.seats[row] = seats
+                self.base_seats[row] = flight.available_seats
+            if not replaced:
+                self.rows[flight.flight_id] = row
+                self.size += 1
+            self._route_rows.setdefault((origin, destination), []).append(row)
+            self._route_arrays.pop((origin, destination), None)
+        return len(flights)
+
+    def _drop_route_row(self, row: int) -> None:
+        key = (int(self.origin[row]), int(self.destination[row]))
+        self._route_rows[key].remove(row)
+        self._route_arrays.pop(key, None)
+
+    def _route(self, origin: str, destination: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Row ids of the route sorted by departure, plus their departure times."""
+        o, d = self.airports.lookup(origin), self.airports.lookup(destination)
+        if o is None or d is None:
+            return None
+        key = (o, d)
+        route = self._route_arrays.get(key)
+        if route is None:
+            rows = np.asarray(self._route_rows.get(key, ()), dtype=np.int64)
+            rows = rows[np.argsort(self.departure[rows], kind="stable")]
+            route = self._route_arrays[key] = (rows, self.departure[rows])
+        return route
+
+    def search(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> np.ndarray:
+        """Row ids on the route/day with at least `min_seats` seats, cheapest first."""
+        route = self._route(origin, destination)
+        if route is None:
+            return np.empty(0, dtype=np.int64)
+        rows, departures = route
+        start = day_start(departure_date)
+        lo, hi = np.searchsorted(departures, (start, start + SECONDS_PER_DAY))
+        candidates = rows[lo:hi]
+        matches = candidates[self.seats[candidates] >= min_seats]
+        return matches[np.lexsort((self.departure[matches], self.price[matches]))]
+
+    def top(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> np.ndarray:
+        """Row ids of the best `limit` matches on the route/day (see select_rows)."""
+        route = self._route(origin, destination)
+        if route is None:
+            return np.empty(0, dtype=np.int64)
+        rows, departures = route
+        start = day_start(departure_date)
+        lo, hi = np.searchsorted(departures, (start, start + SECONDS_PER_DAY))
+        candidates = rows[lo:hi]
+        matches = candidates[self.seats[candidates] >= min_seats]
+        return select_rows(matches, self.price, self.departure, self.arrival, sort_by, limit, filters)
+
+    def lock_for(self, flight_id: str) -> threading.Lock:
+        return self._locks[hash(flight_id) % len(self._locks)]
+
+    def reserve(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        row = self.rows.get(flight_id)
+        if row is None:
+            return None
+        with self.lock_for(flight_id):
+            if self.seats[row] < num_seats:
+                return None
+            self.seats[row] -= num_seats
+            return int(self.seats[row])
+
+    def release(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        row = self.rows.get(flight_id)
+        if row is None:
+            return None
+        with self.lock_for(flight_id):
+            self.seats[row] += num_seats
+            return int(self.seats[row])
+
+    def set_price(self, flight_id: str, price: float) -> bool:
+        """Change the flight's fare; False if the flight is unknown or already at that price."""
+        row = self.rows.get(flight_id)
+        if row is None:
+            return False
+        with self.lock_for(flight_id):
+            if round(float(self.price[row]), 2) == price:
+                return False
+            self.price[row] = price
+            return True
+
+    def base_prices(self) -> Dict[str, float]:
+        return {
+            flight_id: round(price, 2)
+            for flight_id, price in zip(self.flight_ids, self.base_price[:self.size].tolist())
+        }
+
+    def materialize(self, row: int) -> Flight:
+        return self.materialize_many([row])[0]
+
+    def materialize_many(self, rows) -> List[Flight]:
+        """Build Flight models for `rows`, converting each column to Python values in one pass."""
+        rows = np.asarray(rows, dtype=np.int64)
+        airports, airlines = self.airports.names, self.airlines.names
+        columns = zip(
+            rows.tolist(),
+            self.airline[rows].tolist(),
+            self.origin[rows].tolist(),
+            self.destination[rows].tolist(),
+            self.departure[rows].tolist(),
+            self.arrival[rows].tolist(),
+            self.price[rows].tolist(),
+            self.seats[rows].tolist(),
+        )
+        return FlightBatch.validate_python([
+            {
+                "flight_id": self.flight_ids[row],
+                "airline": airlines[airline],
+                "flight_number": self.flight_numbers[row],
+                "origin": airports[origin],
+                "destination": airports[destination],
+                "departure_time": from_epoch(departure),
+                "arrival_time": from_epoch(arrival),
+                "price": round(price, 2),
+                "available_seats": seats,
+            }
+            for row, airline, origin, destination, departure, arrival, price, seats in columns
+        ])
+
+
+class ColumnarRepository(FlightRepository):
+    """Repository over a ColumnarFlightStore; Flight models exist only for rows being returned."""
+
+    def __init__(self, bookings: Optional[Dict[str, Bookings]] = None):
+        super().__init__()
+        self.store = ColumnarFlightStore()
+        self.bookings = bookings if bookings is not None else {}
+        self.booking_index = BookingIndex(self.bookings)
+        self._write_lock = threading.Lock()
+
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        row = self.store.rows.get(flight_id)
+        return self.store.materialize(row) if row is not None else None
+
+    def list_flights(self) -> Iterator[Flight]:
+        store = self.store
+        for start in range(0, len(store), 1024):
+            yield from store.materialize_many(range(start, min(start + 1024, len(store))))
+
+    def count_flights(self) -> int:
+        return len(self.store)
+
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        return self.store.materialize_many(self.store.search(origin, destination, departure_date, min_seats))
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        rows = self.store.top(origin, destination, departure_date, min_seats, sort_by, limit, filters)
+        return self.store.materialize_many(rows)
+
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        with self._write_lock:
+            count = self.store.add(flights)
+        self._notify_reloaded()
+        return count
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        return self.store.materialize_many(range(offset, min(offset + limit, len(self.store))))
+
+    def base_prices(self) -> Dict[str, float]:
+        return self.store.base_prices()
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        changed = [flight_id for flight_id, price in prices.items() if self.store.set_price(flight_id, price)]
+        for flight_id in changed:
+            self._notify_changed(flight_id)
+        return len(changed)
+
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        remaining = self.store.reserve(flight_id, num_seats)
+        if remaining is not None:
+            self._notify_changed(flight_id)
+        return remaining
+
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        remaining = self.store.release(flight_id, num_seats)
+        if remaining is not None:
+            self._notify_changed(flight_id)
+        return remaining
+
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        return self.bookings.get(booking_id)
+
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        if not seats_reserved and self.reserve_seats(booking.flight_id, booking.num_seats) is None:
+            return False
+        self.bookings[booking.booking_id] = booking
+        self.booking_index.add(booking)
+        return True
+
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        booking = self.bookings.pop(booking_id, None)
+        if booking is not None:
+            self.booking_index.remove(booking)
+            self.release_seats(booking.flight_id, booking.num_seats)
+        return booking
+
+    def list_bookings(self) -> Iterator[Bookings]:
+        return iter(list(self.bookings.values()))
+
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_passenger(passenger_name, offset, limit)
+
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_flight(flight_id, offset, limit)
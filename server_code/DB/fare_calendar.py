@@ -0,0 +1,148 @@
+# DB/fare_calendar.py
+import threading
+from bisect import insort
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from DB.flight_index import RouteKey, route_key
+from DB.repository import FlightRepository
+
+
+@dataclass
+class DayFares:
+    """One route/day: its flights in price order plus running seat aggregates."""
+    fares: List[Tuple[float, str]] = field(default_factory=list)
+    available_seats: int = 0
+    bookable_flights: int = 0
+    cheapest: Optional[float] = None
+
+
+class FareCalendar:
+    """Per-route/day fare aggregates: lowest bookable price, bookable flights and seats left.
+
+    The aggregates are built from the repository on first use and rebuilt after the inventory
+    is reloaded. Seat changes update them in place: the seat total moves by the delta, and the
+    lowest price is only searched for again when the cheapest flight sells out or a fare on
+    the day is repriced, so a month of days is answered with one dictionary lookup per day.
+    """
+
+    def __init__(self, repository: FlightRepository):
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._days: Optional[Dict[RouteKey, DayFares]] = None
+        self._day_of: Dict[str, DayFares] = {}
+        self._seats: Dict[str, int] = {}
+        self._prices: Dict[str, float] = {}
+        repository.add_change_listener(self._on_change)
+        repository.add_reload_listener(self._on_reload)
+
+    def _on_reload(self) -> None:
+        with self._lock:
+            self._days = None
+
+    def _on_change(self, flight_id: str) -> None:
+        if self._days is None or flight_id not in self._seats:
+            return
+        # Read the flight under the lock so concurrent changes are applied in order.
+        with self._lock:
+            day = self._day_of.get(flight_id)
+            old = self._seats.get(flight_id)
+            flight = self.repository.get_flight(flight_id)
+            if day is None or old is None or flight is None:
+                return
+            new, price = flight.available_seats, flight.price
+            old_price = self._prices[flight_id]
+            self._seats[flight_id] = new
+            day.available_seats += new - old
+            if old > 0 and new == 0:
+                day.bookable_flights -= 1
+            elif old == 0 and new > 0:
+                day.bookable_flights += 1
+            if price != old_price:
+                # Repriced: re-file the fare; the day's lowest may have moved either way.
+                self._prices[flight_id] = price
+                day.fares.remove((old_price, flight_id))
+                insort(day.fares, (price, flight_id))
+                day.cheapest = self._lowest(day, 1)
+            elif old > 0 and new == 0:
+                if price == day.cheapest:
+                    day.cheapest = self._lowest(day, 1)
+            elif old == 0 and new > 0:
+                if day.cheapest is None or price < day.cheapest:
+                    day.cheapest = price
+
+    def _lowest(self, day: DayFares, passengers: int) -> Optional[float]:
+        seats = self._seats
+        return next((price for price, fid in day.fares if seats[fid] >= passengers), None)
+
+    def _build(self) -> Dict[RouteKey, DayFares]:
+        days = self._days
+        if days is not None:
+            return days
+        with self._lock:
+            if self._days is not None:
+                return self._days
+            days, day_of, seats, prices = {}, {}, {}, {}
+            for flight in self.repository.list_flights():
+                key = route_key(flight.origin, flight.destination, flight.departure_time.date())
+                day = days.get(key)
+                if day is None:
+                    day = days[key] = DayFares()
+                insort(day.fares, (flight.price, flight.flight_id))
+                day.available_seats += flight.available_seats
+                if flight.available_seats > 0:
+                    day.bookable_flights += 1
+                day_of[flight.flight_id] = day
+                seats[flight.flight_id] = flight.available_seats
+                prices[flight.flight_id] = flight.price
+            self._day_of, self._seats, self._prices = day_of, seats, prices
+            for day in days.values():
+                day.cheapest = self._lowest(day, 1)
+            self._days = days
+            return days
+
+    def calendar(self, origin: str, destination: str, start: date, end: date, passengers: int = 1) -> List[Dict[str, Any]]:
+        """One entry per day from `start` to `end` inclusive with the lowest price of a flight
+        that still has `passengers` seats (None if there is none), how many such flights there
+        are, and the seats left across the route/day."""
+        days = self._build()
+        found = []
+        with self._lock:
+            day = start
+            while day <= end:
+                fares = days.get(route_key(origin, destination, day))
+                if fares is None:
+                    entry = {"date": day.isoformat(), "min_price": None, "flights": 0, "available_seats": 0}
+                elif passengers == 1:
+                    entry = {
+                        "date": day.isoformat(),
+                        "min_price": fares.cheapest,
+                        "flights": fares.bookable_flights,
+                        "available_seats": fares.available_seats,
+                    }
+                else:
+                    seats = self._seats
+                    entry = {
+                        "date": day.isoformat(),
+                        "min_price": self._lowest(fares, passengers),
+                        "flights": sum(1 for _, fid in fares.fares if seats[fid] >= passengers),
+                        "available_seats": fares.available_seats,
+                    }
+                found.append(entry)
+                day += timedelta(days=1)
+        return found
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_fare_calendar() -> FareCalendar:
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                from DB.flights_DB import get_repository
+                _calendar = FareCalendar(get_repository())
+    return _calendar
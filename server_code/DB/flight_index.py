@@ -0,0 +1,174 @@
+# DB/flight_index.py
+import heapq
+import itertools
+import threading
+from bisect import insort
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from schemas.Flight1 import Flight
+
+RouteKey = Tuple[str, str, date]
+
+SORT_KEYS = ("price", "departure", "duration")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Optional price range and departure-time window (times of day) for a route/day search."""
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    depart_after: Optional[time] = None
+    depart_before: Optional[time] = None
+
+    def matches(self, price: float, departure: datetime) -> bool:
+        if self.min_price is not None and price < self.min_price:
+            return False
+        if self.max_price is not None and price > self.max_price:
+            return False
+        if self.depart_after is not None and departure.time() < self.depart_after:
+            return False
+        if self.depart_before is not None and departure.time() > self.depart_before:
+            return False
+        return True
+
+
+NO_FILTERS = SearchFilters()
+
+
+def flight_sort_key(sort_by: str) -> Callable[[Flight], tuple]:
+    if sort_by == "departure":
+        return lambda flight: (flight.departure_time, flight.price, flight.flight_id)
+    if sort_by == "duration":
+        return lambda flight: (flight.arrival_time - flight.departure_time, flight.price, flight.flight_id)
+    return lambda flight: (flight.price, flight.departure_time, flight.flight_id)
+
+
+def top_k(items: Iterable, key: Callable, limit: int) -> list:
+    """The `limit` smallest items by `key` in order (all of them if limit is 0), via a bounded heap."""
+    return heapq.nsmallest(limit, items, key=key) if limit else sorted(items, key=key)
+
+
+def route_key(origin: str, destination: str, departure_date: date) -> RouteKey:
+    return (origin.lower(), destination.lower(), departure_date)
+
+
+class FlightIndex:
+    """Secondary index over the flight inventory keyed by (origin, destination, departure date).
+
+    Each bucket keeps its flights ordered by (price, departure_time, flight_id), and a seat
+    count mirror is maintained so searches never touch flights outside the requested route/day.
+    Writers never change a bucket list in place: adding, replacing, removing or repricing a
+    flight swaps in an updated copy of its bucket, so searches iterating the old list
+    concurrently (without a lock) are not disturbed. Readers look seat counts up with a
+    default, since a removed flight may still be in a bucket a search is iterating.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[RouteKey, List[Tuple[float, object, str]]] = {}
+        self._keys: Dict[str, RouteKey] = {}
+        self._entries: Dict[str, Tuple[float, object, str]] = {}
+        self._seats: Dict[str, int] = {}
+        self._durations: Dict[str, timedelta] = {}
+        self._write_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, flight: Flight) -> None:
+        with self._write_lock:
+            flight_id = flight.flight_id
+            previous = self._keys.get(flight_id)
+            if previous is not None:
+                self._without(previous, self._entries[flight_id])
+            key = route_key(flight.origin, flight.destination, flight.departure_time.date())
+            entry = (flight.price, flight.departure_time, flight_id)
+            # Seats first: a search that sees the new entry must find its seat count.
+            self._seats[flight_id] = flight.available_seats
+            self._durations[flight_id] = flight.arrival_time - flight.departure_time
+            bucket = list(self._buckets.get(key, ()))
+            insort(bucket, entry)
+            self._buckets[key] = bucket
+            self._keys[flight_id] = key
+            self._entries[flight_id] = entry
+
+    def remove(self, flight_id: str) -> None:
+        with self._write_lock:
+            key = self._keys.pop(flight_id, None)
+            if key is None:
+                return
+            self._without(key, self._entries.pop(flight_id))
+            self._seats.pop(flight_id, None)
+            self._durations.pop(flight_id, None)
+
+    def _without(self, key: RouteKey, entry: Tuple[float, object, str]) -> None:
+        """Swap in a copy of the bucket without `entry` (called with the write lock held)."""
+        bucket = list(self._buckets[key])
+        bucket.remove(entry)
+        if bucket:
+            self._buckets[key] = bucket
+        else:
+            del self._buckets[key]
+
+    def update_price(self, flight_id: str, price: float) -> None:
+        with self._write_lock:
+            key = self._keys.get(flight_id)
+            if key is None:
+                return
+            old = self._entries[flight_id]
+            entry = (price, old[1], flight_id)
+            bucket = list(self._buckets[key])
+            bucket.remove(old)
+            insort(bucket, entry)
+            self._entries[flight_id] = entry
+            self._buckets[key] = bucket
+
+    def update_seats(self, flight_id: str, available_seats: int) -> None:
+        if flight_id in self._seats:
+            self._seats[flight_id] = available_seats
+
+    def search(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[str]:
+        """Return flight ids on the route/day with at least `min_seats` seats, cheapest first."""
+        bucket = self._buckets.get(route_key(origin, destination, departure_date), ())
+        seats = self._seats
+        return [fid for _, _, fid in bucket if seats.get(fid, -1) >= min_seats]
+
+    def top(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[str]:
+        """Ids of the best `limit` matching flights (all if 0) by price, departure or duration.
+
+        Buckets are already in price order, so a price search stops after `limit` matches; the
+        other orders keep a bounded heap of `limit` entries over the bucket instead of sorting it.
+        """
+        bucket = self._buckets.get(route_key(origin, destination, departure_date), ())
+        seats = self._seats
+        matches = (
+            entry for entry in bucket if seats.get(entry[2], -1) >= min_seats and filters.matches(entry[0], entry[1])
+        )
+        if sort_by == "price":
+            ranked = itertools.islice(matches, limit) if limit else matches
+        elif sort_by == "departure":
+            ranked = top_k(matches, lambda entry: (entry[1], entry[0], entry[2]), limit)
+        else:
+            durations = self._durations
+            ranked = top_k(matches, lambda entry: (durations[entry[2]], entry[0], entry[2]), limit)
+        return [fid for _, _, fid in ranked]
+
+    def clear(self) -> None:
+        # Swap in empty dicts rather than clearing in place: a search still holding the old
+        # bucket list keeps a consistent view, and a concurrent add cannot interleave.
+        with self._write_lock:
+            self._buckets = {}
+            self._keys = {}
+            self._entries = {}
+            self._seats = {}
+            self._durations = {}
@@ -1,11 +1,28 @@
 # DB/flights_DB.py
 from datetime import date, time, datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, Sequence, TypeVar
+import os
+import random
+import threading
+import time as clock
 import uuid
+import anyio
 from schemas.Flight1 import Flight
+from DB.repository import FlightRepository, InMemoryRepository
+from DB.loader import LoadStats, load_flights
 
 mock_flights = {}
 mock_Booking = {}
 
+_repository = None
+_repository_lock = threading.Lock()
+_status: Dict[str, Any] = {"state": "idle", "error": None, "load_seconds": None}
+
+T = TypeVar("T")
+
+SYNTHETIC_AIRPORTS = ("NYC", "LAX", "SFO", "ORD", "DFW", "ATL", "DEN", "SEA", "MIA", "BOS", "PHX", "IAH")
+SYNTHETIC_AIRLINES = ("AirSwift", "Global Airlines", "SkyConnect", "JetStream", "BlueWing")
+
 def generate_mock_flights():
     global mock_flights
     today = date.today()
@@ -65,5 +82,185 @@ def generate_mock_flights():
 
     return mock_flights.copy()
 
-# Ensure data is generated
-generate_mock_flights()
\ No newline at end of file
+def _mock_inventory() -> dict:
+    """The mock flights, generated on first use rather than at import time."""
+    if not mock_flights:
+        generate_mock_flights()
+    return mock_flights
+
+def generate_synthetic_flights(
+    count: int,
+    days: int = 30,
+    airports: Sequence[str] = SYNTHETIC_AIRPORTS,
+    seed: int = 0,
+) -> Iterator[Flight]:
+    """Yield `count` reproducible random flights spread over the `days` starting tomorrow."""
+    rng = random.Random(seed)
+    start = datetime.combine(date.today() + timedelta(days=1), time(0, 0))
+    for i in range(count):
+        origin, destination = rng.sample(airports, 2)
+        departure = start + timedelta(days=rng.randrange(days), minutes=rng.randrange(5 * 60, 23 * 60, 5))
+        airline = rng.choice(SYNTHETIC_AIRLINES)
+        yield Flight(
+            flight_id=f"SYN{i:08d}",
+            airline=airline,
+            flight_number=f"{airline[:2].upper()}{rng.randrange(100, 9999)}",
+            origin=origin,
+            destination=destination,
+            departure_time=departure,
+            arrival_time=departure + timedelta(minutes=rng.randrange(60, 7 * 60, 5)),
+            price=round(rng.uniform(60, 900), 2),
+            available_seats=rng.randrange(0, 220),
+        )
+
+
+def create_repository(
+    backend: str = None, path: str = None, schedule_path: str = None, seed_mock: bool = True
+) -> FlightRepository:
+    """Build the storage backend named by FLIGHT_DB_BACKEND ("memory", "columnar", "sqlite" or "snapshot").
+
+    If FLIGHT_SCHEDULE_PATH (or `schedule_path`) names a CSV/JSONL schedule, it is streamed in
+    instead of the mock flights; a shared SQLite store is only loaded when it is still empty.
+    With `seed_mock=False` and no schedule, the store starts without flights (the loader CLI
+    fills it itself).
+    With BOOKING_JOURNAL_PATH set, bookings on the process-local backends are journaled to
+    disk and replayed on start (SQLite bookings are durable already); this needs a schedule
+    file or a snapshot, since the mock flights get new ids on every start.
+    """
+    backend = (backend or os.environ.get("FLIGHT_DB_BACKEND", "memory")).lower()
+    if schedule_path is None:
+        schedule_path = os.environ.get("FLIGHT_SCHEDULE_PATH", "")
+    repository = _create_backend(backend, path, schedule_path, seed_mock)
+
+    journal_path = os.environ.get("BOOKING_JOURNAL_PATH")
+    if journal_path and backend != "sqlite":
+        if backend in ("memory", "columnar") and not schedule_path and seed_mock:
+            # The mock flights get new ids on every start, so replayed bookings would match nothing.
+            raise ValueError(
+                "BOOKING_JOURNAL_PATH needs flight ids that survive a restart: "
+                "set FLIGHT_SCHEDULE_PATH or use FLIGHT_DB_BACKEND=snapshot"
+            )
+        from DB.journal import BookingJournal, JournaledRepository
+        journal = BookingJournal(journal_path, float(os.environ.get("BOOKING_JOURNAL_WINDOW_MS", "2")) / 1000)
+        repository = JournaledRepository(
+            repository, journal, compact_every=int(os.environ.get("BOOKING_JOURNAL_COMPACT_EVERY", "10000"))
+        )
+    return repository
+
+
+def _create_backend(backend: str, path: str, schedule_path: str, seed_mock: bool = True) -> FlightRepository:
+    mock = seed_mock and not schedule_path
+    if backend == "memory":
+        repository = InMemoryRepository(_mock_inventory() if mock else {}, mock_Booking)
+        if schedule_path:
+            load_flights(schedule_path, repository)
+        return repository
+    if backend == "columnar":
+        from DB.columnar_store import ColumnarRepository
+        repository = ColumnarRepository(mock_Booking)
+        if schedule_path:
+            load_flights(schedule_path, repository)
+        elif mock:
+            repository.add_flights(_mock_inventory().values())
+        return repository
+    if backend == "sqlite":
+        from DB.sqlite_repository import SQLiteRepository
+        repository = SQLiteRepository(path or os.environ.get("FLIGHT_DB_PATH", "flights.db"))
+        if mock:
+            repository.seed(_mock_inventory().values())
+        elif schedule_path and repository.count_flights() == 0:
+            load_flights(schedule_path, repository)
+        # Other server processes may share the file; replay their seat changes into our caches.
+        interval = float(os.environ.get("FLIGHT_DB_SYNC_INTERVAL", "1"))
+        if interval > 0:
+            repository.watch_changes(interval)
+        return repository
+    if backend == "snapshot":
+        from DB.loader import iter_flights
+        from DB.snapshot import SnapshotRepository, write_snapshot
+        path = path or os.environ.get("FLIGHT_SNAPSHOT_PATH", "flights.snap")
+        if not os.path.exists(path):
+            if schedule_path:
+                flights = iter_flights(schedule_path)
+            else:
+                flights = _mock_inventory().values() if mock else ()
+            write_snapshot(flights, path)
+        return SnapshotRepository(path, mock_Booking)
+    raise ValueError(f"Unknown FLIGHT_DB_BACKEND: {backend!r}")
+
+
+def _start_pricing(repository: FlightRepository) -> None:
+    """With FLIGHT_PRICING=dynamic, reprice fares by load factor and time to departure."""
+    mode = os.environ.get("FLIGHT_PRICING", "static").lower()
+    if mode == "static":
+        return
+    if mode != "dynamic":
+        raise ValueError(f"Unknown FLIGHT_PRICING: {mode!r}")
+    from DB.pricing import start_pricing
+    start_pricing(repository, float(os.environ.get("FLIGHT_PRICING_INTERVAL", "60")))
+
+
+def refresh_inventory(schedule_path: str = None) -> LoadStats:
+    """Re-stream a schedule file into the live repository, upserting flights by flight_id."""
+    schedule_path = schedule_path or os.environ.get("FLIGHT_SCHEDULE_PATH")
+    if not schedule_path:
+        raise ValueError("No schedule file given and FLIGHT_SCHEDULE_PATH is not set")
+    return load_flights(schedule_path, get_repository())
+
+
+def get_repository() -> FlightRepository:
+    """The shared repository, built on first use; callers block while another thread builds it."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _status.update(state="loading", error=None)
+                started = clock.perf_counter()
+                try:
+                    repository = create_repository()
+                    _start_pricing(repository)
+                except Exception as exc:
+                    _status.update(state="failed", error=f"{type(exc).__name__}: {exc}")
+                    raise
+                _status.update(state="ready", load_seconds=round(clock.perf_counter() - started, 3))
+                _repository = repository
+    return _repository
+
+
+async def await_inventory(get: Callable[[], T] = get_repository) -> T:
+    """`get()` for async handlers, where `get` is get_repository or an accessor built on it.
+
+    Once the inventory is ready it is called inline; while it is still loading it runs on a
+    worker thread, so a request waiting for the load never blocks the event loop (and with it
+    status, health checks and every other session).
+    """
+    if _repository is not None:
+        return get()
+    return await anyio.to_thread.run_sync(get)
+
+
+def start_background_load() -> threading.Thread:
+    """Build the repository on a daemon thread so the server can answer initialize meanwhile."""
+    def load():
+        try:
+            get_repository()
+        except Exception:
+            pass  # recorded in inventory_status(); the next get_repository() call retries
+
+    _status.update(state="loading")
+    thread = threading.Thread(target=load, name="inventory-loader", daemon=True)
+    thread.start()
+    return thread
+
+
+def inventory_status() -> Dict[str, Any]:
+    """Readiness of the inventory: idle, loading, ready or failed."""
+    status = dict(_status)
+    if _repository is not None:
+        status["flights"] = _repository.count_flights()
+        if getattr(_repository, "journal", None) is not None:
+            status["journal"] = _repository.stats()
+        if os.environ.get("FLIGHT_PRICING", "static").lower() == "dynamic":
+            from DB.pricing import pricing_stats
+            status["pricing"] = pricing_stats()
+    return status
@@ -0,0 +1,441 @@
+# DB/journal.py
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from schemas.Flight1 import Flight, Bookings
+from DB.flight_index import NO_FILTERS, SearchFilters
+from DB.repository import FlightRepository
+
+logger = logging.getLogger(__name__)
+
+_fsync = getattr(os, "fdatasync", os.fsync)
+
+
+def _fsync_dir(path: str) -> None:
+    """Make a rename in `path`'s directory durable (a no-op where directories cannot be opened)."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class BookingJournal:
+    """Append-only JSON-lines log of booking events with group commit.
+
+    append() only queues an event and hands back its sequence number; a flusher thread writes
+    everything queued within `commit_window` seconds and makes it durable with a single fsync,
+    then wakes every caller blocked in wait() on those events. compact() checkpoints the live
+    bookings to `<path>.checkpoint` and drops the events it covers from the journal.
+    """
+
+    def __init__(self, path: str, commit_window: float = 0.002):
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint"
+        self.commit_window = commit_window
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._pending: List[str] = []
+        self._seq = 0
+        self._durable = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._fh = None
+        self._durable_size = 0
+        self._flusher: Optional[threading.Thread] = None
+        self.events_since_compaction = 0
+        self.commits = 0
+        self.events = 0
+        self.largest_commit = 0
+        self.compactions = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    @property
+    def durable_seq(self) -> int:
+        return self._durable
+
+    def replay(self) -> Iterator[Tuple[str, Any]]:
+        """Yield ("book", booking dict) / ("cancel", booking_id) events from the checkpoint and
+        the journal, in order, then open the journal for appending.
+
+        A torn final line left by a crash mid-write is cut off before new events are appended.
+        """
+        checkpoint_seq = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding="utf-8") as fh:
+                checkpoint_seq = json.loads(fh.readline())["seq"]
+                for line in fh:
+                    yield "book", json.loads(line)
+        self._seq = checkpoint_seq
+
+        valid_bytes = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as fh:
+                for raw in fh:
+                    try:
+                        event = json.loads(raw)
+                    except ValueError:
+                        break
+                    valid_bytes += len(raw)
+                    self.events_since_compaction += 1
+                    if event["seq"] <= checkpoint_seq:
+                        continue
+                    self._seq = event["seq"]
+                    yield event["op"], event["booking"] if event["op"] == "book" else event["booking_id"]
+            if valid_bytes < os.path.getsize(self.path):
+                with open(self.path, "r+b") as fh:
+                    fh.truncate(valid_bytes)
+        self._durable = self._seq
+        self._open()
+
+    def _open(self) -> None:
+        self._fh = open(self.path, "a", encoding="utf-8")
+        self._durable_size = os.path.getsize(self.path)
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name="booking-journal", daemon=True)
+            self._flusher.start()
+
+    def append(self, op: str, data: Any) -> int:
+        """Queue one event and return its sequence number; it is durable once wait(seq) returns.
+
+        Once a write has failed the journal accepts nothing more: the flusher has stopped, and
+        an event that can never become durable must not be applied.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("booking journal is closed")
+            if self._error is not None:
+                raise OSError(f"booking journal write failed: {self._error}")
+            self._seq += 1
+            key = "booking" if op == "book" else "booking_id"
+            self._pending.append(json.dumps({"seq": self._seq, "op": op, key: data}, separators=(",", ":")))
+            self._cond.notify_all()
+            return self._seq
+
+    def wait(self, seq: int) -> None:
+        with self._cond:
+            while self._durable < seq:
+                if self._error is not None:
+                    raise OSError(f"booking journal write failed: {self._error}")
+                self._cond.wait()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+            if self.commit_window:
+                # Let other bookings arriving in the window share this fsync.
+                time.sleep(self.commit_window)
+            with self._cond:
+                batch, self._pending = self._pending, []
+                last = self._seq
+            try:
+                with self._io_lock:
+                    self._fh.write("\n".join(batch) + "\n")
+                    self._fh.flush()
+                    _fsync(self._fh.fileno())
+                    self._durable_size = os.fstat(self._fh.fileno()).st_size
+            except OSError as exc:
+                self._discard_unsynced()
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._durable = last
+                self.commits += 1
+                self.events += len(batch)
+                self.events_since_compaction += len(batch)
+                self.largest_commit = max(self.largest_commit, len(batch))
+                self._cond.notify_all()
+
+    def _discard_unsynced(self) -> None:
+        # The failed batch may still have reached the file; cut it off so a restart cannot
+        # replay events whose callers were told they failed.
+        try:
+            with self._io_lock:
+                os.ftruncate(self._fh.fileno(), self._durable_size)
+        except (OSError, ValueError):
+            logger.exception("Could not cut unsynced events off the booking journal")
+
+    def compact(self, seq: int, bookings: Iterable[Dict[str, Any]]) -> None:
+        """Checkpoint `bookings` (the live set as of event `seq`) and drop events up to `seq`."""
+        self.wait(seq)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            fh.write(json.dumps({"seq": seq}) + "\n")
+            for booking in bookings:
+                fh.write(json.dumps(booking, separators=(",", ":")) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        _fsync_dir(self.checkpoint_path)
+
+        with self._io_lock:
+            self._fh.flush()
+            with open(self.path, encoding="utf-8") as fh:
+                kept = [line for line in fh if json.loads(line)["seq"] > seq]
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.writelines(kept)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, self.path)
+            _fsync_dir(self.path)
+            self._fh.close()
+            self._fh = open(self.path, "a", encoding="utf-8")
+            self._durable_size = os.path.getsize(self.path)
+        with self._cond:
+            self.events_since_compaction = len(kept)
+            self.compactions += 1
+
+    def close(self) -> None:
+        """Flush everything queued and stop the flusher thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._fh is not None:
+            self._fh.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "commit_window_ms": round(self.commit_window * 1000, 3),
+            "events": self.events,
+            "commits": self.commits,
+            "events_per_commit": round(self.events / self.commits, 2) if self.commits else 0.0,
+            "largest_commit": self.largest_commit,
+            "events_since_compaction": self.events_since_compaction,
+            "compactions": self.compactions,
+            "last_seq": self._seq,
+            "durable_seq": self._durable,
+        }
+
+
+class JournaledRepository(FlightRepository):
+    """Makes bookings on a process-local repository durable through a BookingJournal.
+
+    Every successful create/cancel is journaled and only returns once its event is on disk, so
+    a confirmed booking survives a crash. On start the journal is replayed into the wrapped
+    repository, which rebuilds both the bookings and the seat counts they took. A booking whose
+    flight is no longer in the inventory is kept aside and written into every checkpoint, so it
+    is not lost while the inventory is wrong. Everything else is passed straight through to the
+    wrapped repository.
+    """
+
+    def __init__(self, inner: FlightRepository, journal: BookingJournal, compact_every: int = 10_000):
+        super().__init__()
+        self.inner = inner
+        self.journal = journal
+        self.compact_every = compact_every
+        self._lock = threading.Lock()
+        self._compacting = threading.Lock()
+        self._local = threading.local()
+        self.replayed = 0
+        self.replay_skipped = 0
+        # Replayed bookings that could not be applied, as journaled; compaction carries them over.
+        self.orphans: Dict[str, Dict[str, Any]] = {}
+        self._recover()
+
+    def _recover(self) -> None:
+        for op, data in self.journal.replay():
+            if op == "book":
+                booking = Bookings.model_validate(data)
+                if self.inner.get_booking(booking.booking_id) is not None:
+                    applied = False
+                elif self.inner.create_booking(booking):
+                    applied = True
+                else:
+                    # Its flight is gone from the inventory (or full); keep it rather than lose it.
+                    self.orphans[booking.booking_id] = data
+                    applied = False
+            else:
+                applied = self.inner.cancel_booking(data) is not None or self.orphans.pop(data, None) is not None
+            if applied:
+                self.replayed += 1
+            else:
+                self.replay_skipped += 1
+        if self.orphans:
+            logger.warning(
+                "%d journaled bookings could not be applied (unknown flight or not enough seats); "
+                "they stay in the journal and are retried on the next start",
+                len(self.orphans),
+            )
+
+    def add_change_listener(self, callback) -> None:
+        self.inner.add_change_listener(callback)
+
+    def add_reload_listener(self, callback) -> None:
+        self.inner.add_reload_listener(callback)
+
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        return self.inner.get_flight(flight_id)
+
+    def list_flights(self) -> Iterator[Flight]:
+        return self.inner.list_flights()
+
+    def count_flights(self) -> int:
+        return self.inner.count_flights()
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        return self.inner.page_flights(offset, limit)
+
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        return self.inner.search_flights(origin, destination, departure_date, min_seats)
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        return self.inner.top_flights(origin, destination, departure_date, min_seats, sort_by, limit, filters)
+
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        return self.inner.add_flights(flights)
+
+    def base_prices(self) -> Dict[str, float]:
+        return self.inner.base_prices()
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        return self.inner.set_prices(prices)
+
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        return self.inner.reserve_seats(flight_id, num_seats)
+
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        return self.inner.release_seats(flight_id, num_seats)
+
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        return self.inner.get_booking(booking_id)
+
+    def list_bookings(self) -> Iterator[Bookings]:
+        return self.inner.list_bookings()
+
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.inner.bookings_for_passenger(passenger_name, offset, limit)
+
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.inner.bookings_for_flight(flight_id, offset, limit)
+
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        # The lock keeps journal order identical to the order changes were applied in. Held seats
+        # are not journaled, so replaying the booking takes its seats again, as it should.
+        with self._lock:
+            if not self.inner.create_booking(booking, seats_reserved):
+                return False
+            undo = lambda: self._unbook(booking, seats_reserved)
+            seq = self._append(undo, "book", booking.model_dump(mode="json"))
+        self._commit(seq, undo)
+        return True
+
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        with self._lock:
+            booking = self.inner.cancel_booking(booking_id)
+            if booking is None:
+                return None
+            undo = lambda: self._rebook(booking)
+            seq = self._append(undo, "cancel", booking_id)
+        self._commit(seq, undo)
+        return booking
+
+    def _append(self, undo: Callable[[], None], op: str, data: Any) -> int:
+        try:
+            return self.journal.append(op, data)
+        except Exception:
+            undo()
+            raise
+
+    def _unbook(self, booking: Bookings, seats_reserved: bool) -> None:
+        self.inner.cancel_booking(booking.booking_id)
+        if seats_reserved:
+            # The seats go back to the hold they came from; its owner releases them.
+            self.inner.reserve_seats(booking.flight_id, booking.num_seats)
+
+    def _rebook(self, booking: Bookings) -> None:
+        if not self.inner.create_booking(booking):
+            # Its seats were taken meanwhile; the booking is still live on disk, so keep it anyway.
+            logger.error("Restored booking %s without free seats on flight %s", booking.booking_id, booking.flight_id)
+            self.inner.create_booking(booking, seats_reserved=True)
+
+    @contextmanager
+    def batch(self):
+        """Defer durability waits inside the block to one wait for its last event on exit."""
+        if getattr(self._local, "deferred", None) is not None:
+            yield
+            return
+        self._local.deferred = []
+        try:
+            yield
+        finally:
+            deferred, self._local.deferred = self._local.deferred, None
+            if deferred:
+                self._wait(deferred)
+
+    def _commit(self, seq: int, undo: Callable[[], None]) -> None:
+        deferred = getattr(self._local, "deferred", None)
+        if deferred is not None:
+            deferred.append((seq, undo))
+            return
+        self._wait([(seq, undo)])
+        if self.journal.events_since_compaction >= self.compact_every and self._compacting.acquire(blocking=False):
+            threading.Thread(target=self._compact_and_release, name="booking-journal-compact", daemon=True).start()
+
+    def _wait(self, changes: List[Tuple[int, Callable[[], None]]]) -> None:
+        """Wait until the last of `changes` is durable; if the journal failed, undo every change
+        that did not reach the disk so memory never holds a booking the journal does not."""
+        try:
+            self.journal.wait(changes[-1][0])
+        except OSError:
+            with self._lock:
+                durable = self.journal.durable_seq
+                for seq, undo in reversed(changes):
+                    if seq > durable:
+                        undo()
+            raise
+
+    def compact(self) -> None:
+        """Checkpoint the live bookings and shrink the journal."""
+        with self._compacting:
+            self._compact()
+
+    def _compact_and_release(self) -> None:
+        try:
+            self._compact()
+        finally:
+            self._compacting.release()
+
+    def _compact(self) -> None:
+        with self._lock:
+            seq = self.journal.last_seq
+            bookings = [booking.model_dump(mode="json") for booking in self.inner.list_bookings()]
+            bookings.extend(self.orphans.values())
+        self.journal.compact(seq, bookings)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(
+            self.journal.stats(), replayed=self.replayed, replay_skipped=self.replay_skipped, orphaned=len(self.orphans)
+        )
@@ -0,0 +1,167 @@
+# DB/loader.py
+import argparse
+import csv
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+
+from schemas.Flight1 import Flight
+from DB.repository import FlightRepository
+
+FlightBatch = TypeAdapter(List[Flight])
+
+# Namespace for the ids derived for schedule rows that carry no flight_id.
+SCHEDULE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "flights-booking-server/schedule")
+
+
+@dataclass
+class LoadStats:
+    rows: int = 0
+    loaded: int = 0
+    rejected: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "loaded": self.loaded,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+        }
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Cannot tell schedule format from extension: {path!r} (use .csv or .jsonl)")
+
+
+def iter_rows(path: str, fmt: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield raw flight rows one at a time without reading the whole file."""
+    fmt = fmt or detect_format(path)
+    with open(path, newline="", encoding="utf-8") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+        elif fmt == "jsonl":
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise ValueError(f"Unsupported schedule format: {fmt!r}")
+
+
+def iter_batches(rows: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def schedule_flight_id(row: Dict[str, Any]) -> str:
+    """Derive a flight_id from airline, flight number and departure time.
+
+    The same row gets the same id on every load, so reloading a schedule updates its flights
+    instead of adding copies, and journaled bookings still find them after a restart.
+    """
+    departure = str(row.get("departure_time") or "").strip()
+    try:
+        departure = datetime.fromisoformat(departure).isoformat()
+    except ValueError:
+        pass  # left as is; validation rejects the row
+    key = "|".join((str(row.get("airline") or "").strip(), str(row.get("flight_number") or "").strip(), departure))
+    return str(uuid.uuid5(SCHEDULE_ID_NAMESPACE, key))
+
+
+def validate_batch(rows: List[Dict[str, Any]]) -> List[Flight]:
+    """Validate a whole batch in one pass; fall back to row-by-row only when the batch has bad rows."""
+    for row in rows:
+        if not row.get("flight_id"):
+            row["flight_id"] = schedule_flight_id(row)
+    try:
+        return FlightBatch.validate_python(rows)
+    except ValidationError:
+        flights = []
+        for row in rows:
+            try:
+                flights.append(Flight.model_validate(row))
+            except ValidationError:
+                pass
+        return flights
+
+
+def iter_flights(path: str, batch_size: int = 10_000, fmt: Optional[str] = None) -> Iterator[Flight]:
+    """Validated flights from a schedule file, read and validated one batch at a time."""
+    for rows in iter_batches(iter_rows(path, fmt), batch_size):
+        yield from validate_batch(rows)
+
+
+def load_flights(
+    path: str,
+    repository: FlightRepository,
+    batch_size: int = 10_000,
+    fmt: Optional[str] = None,
+    on_batch: Optional[Callable[[LoadStats], None]] = None,
+) -> LoadStats:
+    """Stream a CSV/JSONL schedule into `repository` in batches.
+
+    Only one batch is held in memory at a time, and each batch is indexed as soon as it is
+    written, so the repository is searchable while a large file is still loading.
+    """
+    stats = LoadStats()
+    start = time.perf_counter()
+    for rows in iter_batches(iter_rows(path, fmt), batch_size):
+        flights = validate_batch(rows)
+        stats.rows += len(rows)
+        stats.loaded += repository.add_flights(flights)
+        stats.rejected += len(rows) - len(flights)
+        stats.batches += 1
+        stats.seconds = time.perf_counter() - start
+        if on_batch:
+            on_batch(stats)
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def main():
+    from DB.flights_DB import create_repository
+
+    parser = argparse.ArgumentParser(description="Load a flight schedule file into the configured store.")
+    parser.add_argument("path", help="schedule file (.csv or .jsonl)")
+    parser.add_argument("--backend", default=None, help="memory or sqlite (default: FLIGHT_DB_BACKEND)")
+    parser.add_argument("--db-path", default=None, help="SQLite file (default: FLIGHT_DB_PATH)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # Open the store without the mock flights: a seeded store is no longer empty, so a server
+    # started later with FLIGHT_SCHEDULE_PATH would skip its schedule.
+    repository = create_repository(args.backend, args.db_path, schedule_path="", seed_mock=False)
+    stats = load_flights(
+        args.path,
+        repository,
+        batch_size=args.batch_size,
+        on_batch=lambda s: print(f"  {s.rows:>10,} rows  {s.rows_per_second:>10,.0f} rows/sec"),
+    )
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# DB/pricing.py
+import logging
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from DB.columnar_store import SECONDS_PER_DAY, to_epoch
+from DB.repository import FlightRepository
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PricingPolicy:
+    """Fare = base fare x load-factor multiplier x time-to-departure multiplier.
+
+    The load multiplier grows with the share of seats sold, slowly at first (load ** load_curve)
+    up to 1 + load_weight for a full flight. The time multiplier rises by an equal step for
+    each whole day inside the last late_days before departure, up to 1 + late_weight on the
+    day itself; fares therefore only move on bookings and once a day per flight.
+    """
+    load_weight: float = 1.0
+    load_curve: float = 2.0
+    late_weight: float = 0.5
+    late_days: int = 14
+
+    def fares(self, base: np.ndarray, capacity: np.ndarray, seats: np.ndarray, departure: np.ndarray, now: int) -> np.ndarray:
+        load = np.clip(1.0 - seats / np.maximum(capacity, 1), 0.0, 1.0)
+        days_left = np.maximum((departure - now) // SECONDS_PER_DAY, 0)
+        late = np.clip(self.late_days - days_left, 0, self.late_days) / self.late_days
+        return np.round(base * (1.0 + self.load_weight * load ** self.load_curve) * (1.0 + self.late_weight * late), 2)
+
+
+class PricingTable:
+    """Parallel arrays over the inventory: what each fare is computed from, and the fare applied."""
+
+    def __init__(self, repository: FlightRepository):
+        flights = list(repository.list_flights())
+        booked = Counter()
+        for booking in repository.list_bookings():
+            booked[booking.flight_id] += booking.num_seats
+        base_fares = repository.base_prices()
+        self.flight_ids: List[str] = [flight.flight_id for flight in flights]
+        self.rows: Dict[str, int] = {fid: row for row, fid in enumerate(self.flight_ids)}
+        self.base = np.array([base_fares.get(f.flight_id, f.price) for f in flights], dtype=np.float64)
+        self.seats = np.array([f.available_seats for f in flights], dtype=np.int64)
+        # Seats taken before the table was built still count towards the flight's capacity.
+        self.capacity = self.seats + np.array([booked[fid] for fid in self.flight_ids], dtype=np.int64)
+        self.departure = np.array([to_epoch(f.departure_time) for f in flights], dtype=np.int64)
+        self.price = np.array([f.price for f in flights], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.flight_ids)
+
+
+class PricingEngine:
+    """Keeps every stored fare equal to the policy's price for the flight's current state.
+
+    reprice_all() evaluates the policy over the whole inventory in one vectorized pass and
+    writes only the fares that moved; it runs on a schedule (and soon after the inventory is
+    reloaded) to apply the time-to-departure steps. A seat change reprices just that flight
+    from its change notification. Fares are written into the repository with set_prices(),
+    so searches, the fare calendar and the route graph read them like any other field and
+    no request ever computes a price.
+    """
+
+    def __init__(self, repository: FlightRepository, policy: PricingPolicy = PricingPolicy()):
+        self.repository = repository
+        self.policy = policy
+        # Re-entrant: set_prices() notifies our own change listener on the same thread.
+        self._lock = threading.RLock()
+        self._table: Optional[PricingTable] = None
+        self._writing = False
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.passes = 0
+        self.repriced = 0
+        self.incremental = 0
+        self.last_pass_ms: Optional[float] = None
+        repository.add_change_listener(self._on_change)
+        repository.add_reload_listener(self._on_reload)
+
+    def _on_reload(self) -> None:
+        with self._lock:
+            self._table = None
+        # Batched loads reload many times in a row; let the scheduler thread catch up once.
+        self._wake.set()
+
+    def _on_change(self, flight_id: str) -> None:
+        if self._table is None:
+            return
+        with self._lock:
+            table = self._table
+            row = table.rows.get(flight_id) if table is not None else None
+            if row is None or self._writing:
+                # Unknown flight, or the echo of a fare we are writing ourselves.
+                return
+            flight = self.repository.get_flight(flight_id)
+            if flight is None:
+                return
+            table.seats[row] = flight.available_seats
+            span = slice(row, row + 1)
+            price = float(self.policy.fares(
+                table.base[span], table.capacity[span], table.seats[span], table.departure[span],
+                to_epoch(datetime.now()),
+            )[0])
+            if price == table.price[row]:
+                return
+            table.price[row] = price
+            self.incremental += 1
+            self._write({flight_id: price})
+
+    def _write(self, prices: Dict[str, float]) -> None:
+        self._writing = True
+        try:
+            self.repository.set_prices(prices)
+        finally:
+            self._writing = False
+
+    def reprice_all(self, now: Optional[datetime] = None) -> int:
+        """Reprice the whole inventory; returns how many fares changed."""
+        started = time.perf_counter()
+        with self._lock:
+            table = self._table
+            if table is None:
+                table = self._table = PricingTable(self.repository)
+            fares = self.policy.fares(
+                table.base, table.capacity, table.seats, table.departure, to_epoch(now or datetime.now())
+            )
+            changed = np.flatnonzero(fares != table.price)
+            table.price[changed] = fares[changed]
+            flight_ids = table.flight_ids
+            self._write({flight_ids[row]: price for row, price in zip(changed.tolist(), fares[changed].tolist())})
+            self.passes += 1
+            self.repriced += len(changed)
+            self.last_pass_ms = round((time.perf_counter() - started) * 1000, 2)
+        return len(changed)
+
+    def start(self, interval: float = 60.0) -> None:
+        """Reprice now, then every `interval` seconds on a daemon thread (idempotent)."""
+        if self._thread is not None:
+            return
+        self.reprice_all()
+
+        def run():
+            while True:
+                self._wake.wait(interval)
+                self._wake.clear()
+                try:
+                    self.reprice_all()
+                except Exception:
+                    logger.exception("Repricing pass failed; retrying on the next one")
+
+        self._thread = threading.Thread(target=run, name="flight-pricing", daemon=True)
+        self._thread.start()
+
+    def stats(self) -> Dict[str, Any]:
+        table = self._table
+        return {
+            "flights": len(table) if table is not None else 0,
+            "passes": self.passes,
+            "repriced": self.repriced,
+            "incremental": self.incremental,
+            "last_pass_ms": self.last_pass_ms,
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def start_pricing(repository: FlightRepository, interval: float = 60.0) -> PricingEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PricingEngine(repository)
+            _engine.start(interval)
+    return _engine
+
+
+def pricing_stats() -> Optional[Dict[str, Any]]:
+    """Pricing engine counters, or None when fares are static."""
+    return _engine.stats() if _engine is not None else None
@@ -0,0 +1,185 @@
+# DB/rebooking.py
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from schemas.Flight1 import Flight, Bookings
+from DB.repository import FlightRepository
+from DB.route_graph import Itinerary, RouteGraph
+
+PRIORITIES = ("booking_time", "party_size")
+
+# One rebooking run at a time, so two calls for the same flight cannot both move a passenger.
+_rebook_lock = threading.Lock()
+
+
+def _affected_bookings(repository: FlightRepository, flight_id: str, page_size: int = 500) -> List[Bookings]:
+    bookings: List[Bookings] = []
+    while True:
+        page, total = repository.bookings_for_flight(flight_id, len(bookings), page_size)
+        bookings.extend(page)
+        if not page or len(bookings) >= total:
+            return bookings
+
+
+def _alternatives(
+    graph: RouteGraph,
+    flight: Flight,
+    max_stops: int,
+    min_connection: timedelta,
+    max_delay: timedelta,
+    per_day: int,
+) -> List[Itinerary]:
+    """Itineraries that replace `flight`, best first: arrival closest to the original, then fewest
+    stops, then price. Only departures still ahead and within `max_delay` of the original count."""
+    earliest = max(datetime.now(), flight.departure_time - max_delay)
+    latest = flight.departure_time + max_delay
+    found: List[Itinerary] = []
+    day = earliest.date()
+    while day <= latest.date():
+        for itinerary in graph.search(
+            flight.origin, flight.destination, day,
+            max_stops=max_stops, min_connection=min_connection, limit=per_day,
+        ):
+            if flight.flight_id not in itinerary.flight_ids and earliest <= itinerary.departure_time <= latest:
+                found.append(itinerary)
+        day += timedelta(days=1)
+
+    def rank(itinerary: Itinerary) -> Tuple[float, int, float]:
+        delay = (itinerary.arrival_time - flight.arrival_time).total_seconds()
+        return abs(delay), len(itinerary.flight_ids), itinerary.price
+
+    found.sort(key=rank)
+    return found
+
+
+def _place(
+    repository: FlightRepository,
+    booking: Bookings,
+    alternatives: List[Itinerary],
+    seats: Dict[str, int],
+) -> Tuple[Optional[Itinerary], List[Bookings]]:
+    """Book `booking`'s party on every leg of the first alternative with room, or on nothing."""
+
+    def seats_left(flight_id: str) -> int:
+        if flight_id not in seats:
+            leg = repository.get_flight(flight_id)
+            seats[flight_id] = leg.available_seats if leg else 0
+        return seats[flight_id]
+
+    party = booking.num_seats
+    for itinerary in alternatives:
+        if any(seats_left(fid) < party for fid in itinerary.flight_ids):
+            continue
+        legs: List[Bookings] = []
+        for fid in itinerary.flight_ids:
+            leg = Bookings(
+                booking_id=str(uuid.uuid4()),
+                flight_id=fid,
+                passenger_name=booking.passenger_name,
+                num_seats=party,
+                booking_time=datetime.now(),
+                status="confirmed",
+            )
+            if not repository.create_booking(leg):
+                # Someone else took the seats; re-read the count next time it is needed.
+                seats.pop(fid, None)
+                break
+            seats[fid] -= party
+            legs.append(leg)
+        else:
+            return itinerary, legs
+        _undo(repository, legs, seats)
+    return None, []
+
+
+def _undo(repository: FlightRepository, legs: List[Bookings], seats: Dict[str, int]) -> None:
+    for leg in legs:
+        if repository.cancel_booking(leg.booking_id) is not None and leg.flight_id in seats:
+            seats[leg.flight_id] += leg.num_seats
+
+
+def rebook_flight(
+    repository: FlightRepository,
+    graph: RouteGraph,
+    flight_id: str,
+    priority: str = "booking_time",
+    max_stops: int = 1,
+    min_connection: timedelta = timedelta(minutes=45),
+    max_delay: timedelta = timedelta(hours=24),
+    alternatives_per_day: int = 50,
+) -> Dict[str, Any]:
+    """Move every booking on `flight_id` onto alternative flights or connections.
+
+    Bookings are served in priority order: oldest first ("booking_time"), or largest party
+    first ("party_size", which places the hardest groups while the most seats are left). Each
+    move is all-or-nothing: the party gets seats on every leg of one alternative and the
+    original booking is cancelled, or nothing changes and the booking is reported unplaced.
+    Alternatives are computed once from the route graph and seat counts are tracked locally,
+    so a passenger costs a few dictionary lookups plus the bookings themselves, and the whole
+    run shares one durable commit.
+    """
+    flight = repository.get_flight(flight_id)
+    if flight is None:
+        return {"error": "Flight not found."}
+
+    started = time.perf_counter()
+    with _rebook_lock:
+        affected = _affected_bookings(repository, flight_id)
+        if priority == "party_size":
+            affected.sort(key=lambda booking: (-booking.num_seats, booking.booking_time))
+        else:
+            affected.sort(key=lambda booking: booking.booking_time)
+        alternatives = _alternatives(graph, flight, max_stops, min_connection, max_delay, alternatives_per_day)
+
+        seats: Dict[str, int] = {}
+        rebooked, unplaced = [], []
+        with repository.batch():
+            for booking in affected:
+                itinerary, legs = _place(repository, booking, alternatives, seats)
+                if itinerary is None:
+                    reason = "No alternative with enough seats." if alternatives else "No alternative flights found."
+                elif repository.cancel_booking(booking.booking_id) is None:
+                    _undo(repository, legs, seats)
+                    itinerary, reason = None, "Booking was cancelled during rebooking."
+                if itinerary is None:
+                    unplaced.append({
+                        "booking_id": booking.booking_id,
+                        "passenger_name": booking.passenger_name,
+                        "num_seats": booking.num_seats,
+                        "reason": reason,
+                    })
+                    continue
+                rebooked.append({
+                    "original_booking_id": booking.booking_id,
+                    "passenger_name": booking.passenger_name,
+                    "num_seats": booking.num_seats,
+                    "stops": len(itinerary.flight_ids) - 1,
+                    "total_price": round(itinerary.price, 2),
+                    "departure_time": itinerary.departure_time.isoformat(),
+                    "arrival_time": itinerary.arrival_time.isoformat(),
+                    "delay_minutes": int((itinerary.arrival_time - flight.arrival_time).total_seconds() // 60),
+                    "bookings": [leg.model_dump(mode="json") for leg in legs],
+                })
+    elapsed = time.perf_counter() - started
+
+    moved = sum(entry["num_seats"] for entry in rebooked)
+    if not unplaced:
+        status = "completed"
+    else:
+        status = "partial" if rebooked else "failed"
+    return {
+        "flight_id": flight_id,
+        "status": status,
+        "affected_bookings": len(affected),
+        "affected_passengers": sum(booking.num_seats for booking in affected),
+        "rebooked_passengers": moved,
+        "unplaced_passengers": sum(entry["num_seats"] for entry in unplaced),
+        "alternatives_considered": len(alternatives),
+        "elapsed_ms": round(elapsed * 1000, 2),
+        "passengers_per_second": round(moved / elapsed, 1) if elapsed > 0 else 0.0,
+        "rebooked": rebooked,
+        "unplaced": unplaced,
+    }
@@ -0,0 +1,251 @@
+# DB/repository.py
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from datetime import date
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from schemas.Flight1 import Flight, Bookings
+from DB.booking_index import BookingIndex
+from DB.flight_index import NO_FILTERS, FlightIndex, SearchFilters, flight_sort_key, top_k
+from DB.seat_inventory import SeatInventory
+
+
+def seats_after_reload(loaded: int, previous_loaded: int, previous_available: int) -> int:
+    """Seats left when a stored flight is loaded again with `loaded` seats: whatever its bookings
+    and holds took out of the previous load stays taken."""
+    return max(loaded - (previous_loaded - previous_available), 0)
+
+
+class FlightRepository(ABC):
+    """Storage interface used by the MCP tools and resources for flights and bookings.
+
+    Listeners registered with add_change_listener are told the flight_id whenever a flight's
+    seats or price change; add_reload_listener callbacks run after flights are added or replaced.
+    """
+
+    def __init__(self):
+        self._change_listeners: List[Callable[[str], None]] = []
+        self._reload_listeners: List[Callable[[], None]] = []
+
+    def add_change_listener(self, callback: Callable[[str], None]) -> None:
+        self._change_listeners.append(callback)
+
+    def add_reload_listener(self, callback: Callable[[], None]) -> None:
+        self._reload_listeners.append(callback)
+
+    def _notify_changed(self, flight_id: str) -> None:
+        for callback in self._change_listeners:
+            callback(flight_id)
+
+    def _notify_reloaded(self) -> None:
+        for callback in self._reload_listeners:
+            callback()
+
+    @abstractmethod
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        ...
+
+    @abstractmethod
+    def list_flights(self) -> Iterator[Flight]:
+        ...
+
+    @abstractmethod
+    def count_flights(self) -> int:
+        ...
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        """Flights in stable storage order, `limit` at a time starting at `offset`."""
+        return list(islice(self.list_flights(), offset, offset + limit))
+
+    @abstractmethod
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        """Flights on the route/day with at least `min_seats` seats, cheapest first."""
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        """The best `limit` flights (all if 0) on the route/day within `filters`, ordered by
+        price, departure or duration. Backends override this to select over their own index."""
+        flights = self.search_flights(origin, destination, departure_date, min_seats)
+        matches = (flight for flight in flights if filters.matches(flight.price, flight.departure_time))
+        return top_k(matches, flight_sort_key(sort_by), limit)
+
+    @abstractmethod
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        """Insert or replace flights; return how many were written.
+
+        A replaced flight keeps the seats already taken on it (seats_after_reload), so
+        reloading a schedule never frees seats that live bookings or holds still occupy.
+        """
+
+    @abstractmethod
+    def base_prices(self) -> Dict[str, float]:
+        """The fare each flight was loaded with, by flight_id, before any repricing."""
+
+    @abstractmethod
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        """Replace the current fare of the given flights; return how many actually changed.
+
+        Unknown flights are skipped. Every changed flight is reported to the change listeners;
+        add_flights() resets both the base and the current fare to the loaded price.
+        """
+
+    @abstractmethod
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        """Atomically take seats; return the seats left, or None if unknown flight / not enough seats."""
+
+    @abstractmethod
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        """Atomically give seats back; return the seats left, or None if the flight is unknown."""
+
+    @abstractmethod
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        ...
+
+    @abstractmethod
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        """Reserve the booking's seats and store it in one step; False if the seats are not available.
+
+        With seats_reserved=True the seats were already taken with reserve_seats() (a seat hold)
+        and only the booking is stored.
+        """
+
+    @abstractmethod
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        """Remove the booking and return its seats in one step; None if there was no such booking."""
+
+    @abstractmethod
+    def list_bookings(self) -> Iterator[Bookings]:
+        """Every stored booking, in no particular order."""
+
+    @abstractmethod
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        """A page of the passenger's bookings, oldest first, and their total count.
+
+        Names match ignoring case and repeated whitespace (booking_index.passenger_key).
+        """
+
+    @abstractmethod
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        """A page of the flight's bookings, oldest first, and their total count."""
+
+    def batch(self):
+        """Group several booking writes; durable repositories may commit them together on exit."""
+        return nullcontext()
+
+
+class InMemoryRepository(FlightRepository):
+    """Process-local repository over plain dicts, indexed by route/day."""
+
+    def __init__(self, flights: Optional[Dict[str, Flight]] = None, bookings: Optional[Dict[str, Bookings]] = None):
+        super().__init__()
+        self.flights = flights if flights is not None else {}
+        self.bookings = bookings if bookings is not None else {}
+        self.booking_index = BookingIndex(self.bookings)
+        self.index = FlightIndex()
+        self.seats = SeatInventory(self.flights, self.index)
+        self.base_fares = {flight_id: flight.price for flight_id, flight in self.flights.items()}
+        self.base_seats = {flight_id: flight.available_seats for flight_id, flight in self.flights.items()}
+        for flight in self.flights.values():
+            self.index.add(flight)
+
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        return self.flights.get(flight_id)
+
+    def list_flights(self) -> Iterator[Flight]:
+        return iter(list(self.flights.values()))
+
+    def count_flights(self) -> int:
+        return len(self.flights)
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        return list(islice(self.flights.values(), offset, offset + limit))
+
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        flights = self.flights
+        return [flights[fid] for fid in self.index.search(origin, destination, departure_date, min_seats)]
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        flights = self.flights
+        return [flights[fid] for fid in self.index.top(origin, destination, departure_date, min_seats, sort_by, limit, filters)]
+
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        count = 0
+        for flight in flights:
+            flight_id, loaded = flight.flight_id, flight.available_seats
+            with self.seats.lock_for(flight_id):
+                current = self.flights.get(flight_id)
+                if current is not None:
+                    available = seats_after_reload(loaded, self.base_seats[flight_id], current.available_seats)
+                    flight = flight.model_copy(update={"available_seats": available})
+                self.flights[flight_id] = flight
+                self.base_fares[flight_id] = flight.price
+                self.base_seats[flight_id] = loaded
+                self.index.add(flight)
+            count += 1
+        self._notify_reloaded()
+        return count
+
+    def base_prices(self) -> Dict[str, float]:
+        return dict(self.base_fares)
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        changed = [flight_id for flight_id, price in prices.items() if self.seats.set_price(flight_id, price)]
+        for flight_id in changed:
+            self._notify_changed(flight_id)
+        return len(changed)
+
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        remaining = self.seats.reserve(flight_id, num_seats)
+        if remaining is not None:
+            self._notify_changed(flight_id)
+        return remaining
+
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        remaining = self.seats.release(flight_id, num_seats)
+        if remaining is not None:
+            self._notify_changed(flight_id)
+        return remaining
+
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        return self.bookings.get(booking_id)
+
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        if not seats_reserved and self.reserve_seats(booking.flight_id, booking.num_seats) is None:
+            return False
+        self.bookings[booking.booking_id] = booking
+        self.booking_index.add(booking)
+        return True
+
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        booking = self.bookings.pop(booking_id, None)
+        if booking is not None:
+            self.booking_index.remove(booking)
+            self.release_seats(booking.flight_id, booking.num_seats)
+        return booking
+
+    def list_bookings(self) -> Iterator[Bookings]:
+        return iter(list(self.bookings.values()))
+
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_passenger(passenger_name, offset, limit)
+
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_flight(flight_id, offset, limit)
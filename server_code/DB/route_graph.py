@@ -0,0 +1,204 @@
+# DB/route_graph.py
+import heapq
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from DB.repository import FlightRepository
+
+
+@dataclass
+class Departures:
+    """All flights leaving one airport, sorted by departure time."""
+    times: List[datetime] = field(default_factory=list)
+    legs: List[Tuple[datetime, datetime, float, str, str]] = field(default_factory=list)
+
+
+@dataclass
+class Itinerary:
+    flight_ids: List[str]
+    price: float
+    departure_time: datetime
+    arrival_time: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.arrival_time - self.departure_time
+
+
+class RouteGraph:
+    """Time-ordered departure lists per airport, searched best-first for 0-2 stop connections.
+
+    The graph is built from the repository on first use and rebuilt after the inventory is
+    reloaded; seat counts and fares are mirrored from change notifications so searches never
+    need to touch the repository until the winning itineraries are materialized.
+    """
+
+    def __init__(self, repository: FlightRepository):
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._departures: Optional[Dict[str, Departures]] = None
+        self._inbound: Dict[str, Set[str]] = {}
+        self._cheapest_inbound: Dict[str, float] = {}
+        self._shortest_inbound: Dict[str, float] = {}
+        self._seats: Dict[str, int] = {}
+        repository.add_change_listener(self._on_change)
+        repository.add_reload_listener(self._on_reload)
+
+    def _on_change(self, flight_id: str) -> None:
+        departures = self._departures
+        if departures is None or flight_id not in self._seats:
+            return
+        flight = self.repository.get_flight(flight_id)
+        if flight is None:
+            return
+        self._seats[flight_id] = flight.available_seats
+        table = departures.get(flight.origin.lower())
+        if table is None:
+            return
+        with self._lock:
+            i = bisect_left(table.times, flight.departure_time)
+            while i < len(table.legs) and table.legs[i][0] == flight.departure_time:
+                leg = table.legs[i]
+                if leg[3] == flight_id:
+                    if leg[2] != flight.price:
+                        # Repriced: swap the leg in place (its position depends only on the time).
+                        table.legs[i] = (leg[0], leg[1], flight.price, flight_id, leg[4])
+                        destination = leg[4]
+                        # The inbound bound only has to stay a lower bound, so only a drop moves it.
+                        if flight.price < self._cheapest_inbound.get(destination, float("inf")):
+                            self._cheapest_inbound[destination] = flight.price
+                    break
+                i += 1
+
+    def _on_reload(self) -> None:
+        with self._lock:
+            self._departures = None
+
+    def _build(self) -> Dict[str, Departures]:
+        departures = self._departures
+        if departures is not None:
+            return departures
+        with self._lock:
+            if self._departures is not None:
+                return self._departures
+            legs: Dict[str, List[Tuple[datetime, datetime, float, str, str]]] = {}
+            inbound: Dict[str, Set[str]] = {}
+            cheapest: Dict[str, float] = {}
+            shortest: Dict[str, float] = {}
+            seats: Dict[str, int] = {}
+            for flight in self.repository.list_flights():
+                origin, destination = flight.origin.lower(), flight.destination.lower()
+                legs.setdefault(origin, []).append(
+                    (flight.departure_time, flight.arrival_time, flight.price, flight.flight_id, destination)
+                )
+                inbound.setdefault(destination, set()).add(origin)
+                if flight.price < cheapest.get(destination, float("inf")):
+                    cheapest[destination] = flight.price
+                flight_seconds = (flight.arrival_time - flight.departure_time).total_seconds()
+                if flight_seconds < shortest.get(destination, float("inf")):
+                    shortest[destination] = flight_seconds
+                seats[flight.flight_id] = flight.available_seats
+            departures = {}
+            for origin, entries in legs.items():
+                entries.sort()
+                departures[origin] = Departures([entry[0] for entry in entries], entries)
+            self._inbound, self._seats = inbound, seats
+            self._cheapest_inbound, self._shortest_inbound = cheapest, shortest
+            self._departures = departures
+            return departures
+
+    def airports(self) -> Set[str]:
+        """Lower-cased codes of every airport with a departing or arriving flight."""
+        self._build()
+        return set(self._departures or ()) | set(self._inbound)
+
+    def _window(self, departures: Dict[str, Departures], airport: str, earliest: datetime, latest: datetime):
+        table = departures.get(airport)
+        if table is None:
+            return ()
+        return table.legs[bisect_left(table.times, earliest):bisect_right(table.times, latest)]
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        passengers: int = 1,
+        max_stops: int = 2,
+        min_connection: timedelta = timedelta(minutes=45),
+        max_duration: timedelta = timedelta(hours=24),
+        sort_by: str = "price",
+        limit: int = 10,
+    ) -> List[Itinerary]:
+        """Best `limit` itineraries leaving on `departure_date`, ranked by price or total duration.
+
+        Partial itineraries are expanded best-first, A*-style: the cheapest (or shortest, plus
+        the minimum connection) flight into the destination bounds what is still to come, so
+        the search stops as soon as `limit` complete itineraries have been popped.
+        """
+        departures = self._build()
+        seats = self._seats
+        origin, destination = origin.lower(), destination.lower()
+        one_stop = self._inbound.get(destination, set())
+        two_stop = set().union(*(self._inbound.get(airport, ()) for airport in one_stop))
+        price_bound = self._cheapest_inbound.get(destination, 0.0)
+        time_bound = self._shortest_inbound.get(destination, 0.0) + min_connection.total_seconds()
+        by_duration = sort_by == "duration"
+
+        def can_finish(airport: str, stops_left: int) -> bool:
+            return (
+                airport == destination
+                or (stops_left >= 1 and airport in one_stop)
+                or (stops_left >= 2 and airport in two_stop)
+            )
+
+        def priority(price: float, departure: datetime, arrival: datetime, airport: str) -> Tuple[float, float]:
+            elapsed = (arrival - departure).total_seconds()
+            if airport == destination:
+                return (elapsed, price) if by_duration else (price, elapsed)
+            return (elapsed + time_bound, price) if by_duration else (price + price_bound, elapsed)
+
+        day_start = datetime.combine(departure_date, datetime.min.time())
+        day_end = day_start + timedelta(days=1) - timedelta(microseconds=1)
+        heap = []
+        for dep, arr, price, fid, stop in self._window(departures, origin, day_start, day_end):
+            if seats.get(fid, 0) >= passengers and arr - dep <= max_duration and stop != origin and can_finish(stop, max_stops):
+                heap.append((priority(price, dep, arr, stop), len(heap), price, dep, arr, stop, (fid,), (origin, stop)))
+        heapq.heapify(heap)
+        counter = len(heap)
+
+        found: List[Itinerary] = []
+        while heap and len(found) < limit:
+            _, _, price, dep1, arrival, airport, flight_ids, visited = heapq.heappop(heap)
+            if airport == destination:
+                found.append(Itinerary(list(flight_ids), price, dep1, arrival))
+                continue
+            stops_left = max_stops - len(flight_ids)
+            deadline = dep1 + max_duration
+            for dep, arr, leg_price, fid, stop in self._window(departures, airport, arrival + min_connection, deadline):
+                if arr > deadline or stop in visited or seats.get(fid, 0) < passengers or not can_finish(stop, stops_left):
+                    continue
+                total = price + leg_price
+                counter += 1
+                heapq.heappush(heap, (
+                    priority(total, dep1, arr, stop), counter, total, dep1, arr, stop,
+                    flight_ids + (fid,), visited + (stop,),
+                ))
+        return found
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_route_graph() -> RouteGraph:
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                from DB.flights_DB import get_repository
+                _graph = RouteGraph(get_repository())
+    return _graph
@@ -0,0 +1,56 @@
+# DB/seat_inventory.py
+import threading
+from typing import Dict, Optional
+
+from schemas.Flight1 import Flight
+from DB.flight_index import FlightIndex
+
+
+class SeatInventory:
+    """Atomic reserve/release of seats (and fare changes) on individual flights.
+
+    Seat counts are guarded by a fixed pool of striped locks hashed on flight_id, so bookings on
+    different flights proceed in parallel while every check-and-update on one flight is serialized.
+    """
+
+    def __init__(self, flights: Dict[str, Flight], index: FlightIndex, stripes: int = 1024):
+        self._flights = flights
+        self._index = index
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def lock_for(self, flight_id: str) -> threading.Lock:
+        return self._locks[hash(flight_id) % len(self._locks)]
+
+    def reserve(self, flight_id: str, num_seats: int) -> Optional[int]:
+        """Take `num_seats` seats; return the seats left, or None if the flight cannot fit them."""
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self.lock_for(flight_id):
+            flight = self._flights.get(flight_id)
+            if flight is None or flight.available_seats < num_seats:
+                return None
+            flight.available_seats -= num_seats
+            self._index.update_seats(flight_id, flight.available_seats)
+            return flight.available_seats
+
+    def release(self, flight_id: str, num_seats: int) -> Optional[int]:
+        """Give back `num_seats` seats; return the seats left, or None if the flight is unknown."""
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self.lock_for(flight_id):
+            flight = self._flights.get(flight_id)
+            if flight is None:
+                return None
+            flight.available_seats += num_seats
+            self._index.update_seats(flight_id, flight.available_seats)
+            return flight.available_seats
+
+    def set_price(self, flight_id: str, price: float) -> bool:
+        """Change the flight's fare; False if the flight is unknown or already at that price."""
+        with self.lock_for(flight_id):
+            flight = self._flights.get(flight_id)
+            if flight is None or flight.price == price:
+                return False
+            flight.price = price
+            self._index.update_price(flight_id, price)
+            return True
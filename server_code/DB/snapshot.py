@@ -0,0 +1,447 @@
+# DB/snapshot.py
+"""Fixed-width binary snapshots of the flight inventory, read through mmap.
+
+File layout (little-endian, every section 64-byte aligned):
+
+    header    magic, version, id/number field widths, flight count, route count, meta length
+    meta      JSON: airport and airline names, indexed by the codes in the records
+    records   one fixed-width record per flight, sorted by (origin, destination, departure)
+    routes    (origin, destination, start, stop) row ranges, one per route
+    ids       flight ids sorted bytewise, for binary search
+    id_rows   record row of each sorted id
+
+Because records are grouped by route and ordered by departure, a search is a dictionary lookup
+for the route followed by a binary search on a zero-copy view of the departure column.
+"""
+import argparse
+import itertools
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from schemas.Flight1 import Flight, Bookings
+from DB.booking_index import BookingIndex
+from DB.flight_index import NO_FILTERS, SearchFilters
+from DB.repository import FlightRepository
+from DB.loader import FlightBatch, iter_flights
+from DB.columnar_store import SECONDS_PER_DAY, StringTable, day_start, from_epoch, select_rows, to_epoch
+
+MAGIC = b"FLTSNAP1"
+VERSION = 1
+ALIGN = 64
+# magic, version, id width, flight number width, reserved, flights, routes, meta bytes
+HEADER = struct.Struct("<8sIIIIQQQ")
+ROUTE = np.dtype([("origin", "<i4"), ("destination", "<i4"), ("start", "<i8"), ("stop", "<i8")])
+
+
+def record_dtype(id_width: int, number_width: int) -> np.dtype:
+    return np.dtype([
+        ("flight_id", f"S{id_width}"),
+        ("flight_number", f"S{number_width}"),
+        ("departure", "<i8"),
+        ("arrival", "<i8"),
+        ("origin", "<i4"),
+        ("destination", "<i4"),
+        ("airline", "<i4"),
+        ("price", "<f4"),
+        ("seats", "<i4"),
+    ], align=True)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def _field_width(longest: int) -> int:
+    # Multiples of 8 keep the int64 fields that follow the strings naturally aligned.
+    return max(8, -(-longest // 8) * 8)
+
+
+def write_snapshot(flights: Iterable[Flight], path: str) -> int:
+    """Write `flights` as a snapshot at `path` and return how many were written.
+
+    Later flights replace earlier ones with the same flight_id. The file is written to a fresh
+    temporary file next to `path` and renamed over it, so processes that still map the old file
+    keep a consistent view, and two writers never share a temporary file.
+    """
+    airports, airlines = StringTable(), StringTable()
+    rows: Dict[str, tuple] = {}
+    for flight in flights:
+        rows[flight.flight_id] = (
+            flight.flight_id.encode(),
+            flight.flight_number.encode(),
+            to_epoch(flight.departure_time),
+            to_epoch(flight.arrival_time),
+            airports.intern(flight.origin),
+            airports.intern(flight.destination),
+            airlines.intern(flight.airline),
+            flight.price,
+            flight.available_seats,
+        )
+    values = list(rows.values())
+    id_width = _field_width(max((len(row[0]) for row in values), default=0))
+    number_width = _field_width(max((len(row[1]) for row in values), default=0))
+    records = np.array(values, dtype=record_dtype(id_width, number_width))
+    records = records[np.lexsort((records["departure"], records["destination"], records["origin"]))]
+
+    keys = (records["origin"].astype(np.int64) << 32) | records["destination"]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(records) else np.empty(0, dtype=np.int64)
+    routes = np.empty(len(starts), dtype=ROUTE)
+    routes["origin"] = records["origin"][starts]
+    routes["destination"] = records["destination"][starts]
+    routes["start"] = starts
+    routes["stop"] = np.r_[starts[1:], len(records)]
+
+    id_order = np.argsort(records["flight_id"], kind="stable")
+    meta = json.dumps({"airports": airports.names, "airlines": airlines.names}).encode()
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, VERSION, id_width, number_width, 0, len(records), len(routes), len(meta)))
+            fh.write(meta)
+            for section in (records, routes, records["flight_id"][id_order], id_order.astype("<i8")):
+                fh.write(b"\0" * (_aligned(fh.tell()) - fh.tell()))
+                fh.write(section.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates the file private to its owner
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(records)
+
+
+def _file_identity(stat: os.stat_result) -> Tuple[int, int, int, int]:
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+class FlightSnapshot:
+    """Read-only, memory-mapped snapshot; every column is a view into the shared mapping."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._identity = _file_identity(os.fstat(fh.fileno()))
+        magic, version, id_width, number_width, _, count, route_count, meta_size = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path!r} is not a version {VERSION} flight snapshot")
+        meta = json.loads(self._mmap[HEADER.size:HEADER.size + meta_size])
+        self.airports: List[str] = meta["airports"]
+        self.airlines: List[str] = meta["airlines"]
+        self._airport_codes = {name.lower(): code for code, name in enumerate(self.airports)}
+
+        offset = HEADER.size + meta_size
+        self.records, offset = self._section(record_dtype(id_width, number_width), count, offset)
+        routes, offset = self._section(ROUTE, route_count, offset)
+        self.ids, offset = self._section(np.dtype(f"S{id_width}"), count, offset)
+        self.id_rows, offset = self._section(np.dtype("<i8"), count, offset)
+        self.departure = self.records["departure"]
+        self.price = self.records["price"]
+        self.routes: Dict[Tuple[int, int], Tuple[int, int]] = {
+            (origin, destination): (start, stop) for origin, destination, start, stop in routes.tolist()
+        }
+
+    def _section(self, dtype: np.dtype, count: int, offset: int) -> Tuple[np.ndarray, int]:
+        offset = _aligned(offset)
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=offset), offset + dtype.itemsize * count
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def is_current(self) -> bool:
+        """Whether `path` still holds the file this snapshot mapped (no rewrite replaced it)."""
+        try:
+            return _file_identity(os.stat(self.path)) == self._identity
+        except FileNotFoundError:
+            return False
+
+    def row_of(self, flight_id: str) -> Optional[int]:
+        key = flight_id.encode()
+        if len(key) > self.ids.dtype.itemsize:
+            return None
+        i = int(np.searchsorted(self.ids, key))
+        if i < len(self.ids) and self.ids[i] == key:
+            return int(self.id_rows[i])
+        return None
+
+    def route(self, origin: str, destination: str) -> Optional[Tuple[int, int]]:
+        o, d = self._airport_codes.get(origin.lower()), self._airport_codes.get(destination.lower())
+        if o is None or d is None:
+            return None
+        return self.routes.get((o, d))
+
+    def day_rows(self, origin: str, destination: str, departure_date: date) -> np.ndarray:
+        """Rows on the route departing on `departure_date`, in departure order."""
+        span = self.route(origin, destination)
+        if span is None:
+            return np.empty(0, dtype=np.int64)
+        start, stop = span
+        day = day_start(departure_date)
+        lo, hi = np.searchsorted(self.departure[start:stop], (day, day + SECONDS_PER_DAY))
+        return np.arange(start + lo, start + hi)
+
+
+@dataclass(frozen=True)
+class SnapshotState:
+    """A mapped snapshot together with this process's seat and fare columns for its rows.
+
+    add_flights publishes a new state with one assignment. Readers take `repository.state`
+    once per call, so the rows they look up, the seats they filter on and the fares they
+    return all belong to the same file, even while a rewrite swaps it.
+    """
+    snapshot: FlightSnapshot
+    seats: np.ndarray
+    prices: np.ndarray
+
+    @classmethod
+    def loaded(cls, snapshot: FlightSnapshot, copy: bool = True) -> "SnapshotState":
+        """The file's own seat counts and base fares (copied, so they can be changed in place)."""
+        if not copy:
+            return cls(snapshot, snapshot.records["seats"], snapshot.price)
+        return cls(snapshot, np.array(snapshot.records["seats"], dtype=np.int32), np.array(snapshot.price, dtype=np.float32))
+
+
+class SnapshotRepository(FlightRepository):
+    """Repository over a memory-mapped snapshot file.
+
+    Flight data is read straight from the mapping, so every server process that opens the same
+    file shares one copy through the page cache. Only the seat and price columns are copied
+    into process memory, where bookings and repricing change them; seat counts and current
+    fares are therefore per process, as with the memory and columnar backends. The mapped
+    price column keeps the base fares.
+
+    add_flights rewrites the file. Other processes keep serving the file they mapped, and
+    rewrites are not coordinated between processes, so refresh from one process at a time.
+    """
+
+    def __init__(self, path: str, bookings: Optional[Dict[str, Bookings]] = None, stripes: int = 1024):
+        super().__init__()
+        self.path = path
+        self.state = SnapshotState.loaded(FlightSnapshot(path))
+        self.bookings = bookings if bookings is not None else {}
+        self.booking_index = BookingIndex(self.bookings)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def _materialize(state: SnapshotState, rows) -> List[Flight]:
+        snapshot, prices, seats = state.snapshot, state.prices, state.seats
+        rows = np.asarray(rows, dtype=np.int64)
+        records = snapshot.records[rows]
+        airports, airlines = snapshot.airports, snapshot.airlines
+        columns = zip(
+            records["flight_id"].tolist(),
+            records["flight_number"].tolist(),
+            records["airline"].tolist(),
+            records["origin"].tolist(),
+            records["destination"].tolist(),
+            records["departure"].tolist(),
+            records["arrival"].tolist(),
+            prices[rows].tolist(),
+            seats[rows].tolist(),
+        )
+        return FlightBatch.validate_python([
+            {
+                "flight_id": flight_id.decode(),
+                "airline": airlines[airline],
+                "flight_number": flight_number.decode(),
+                "origin": airports[origin],
+                "destination": airports[destination],
+                "departure_time": from_epoch(departure),
+                "arrival_time": from_epoch(arrival),
+                "price": round(price, 2),
+                "available_seats": seats,
+            }
+            for flight_id, flight_number, airline, origin, destination, departure, arrival, price, seats in columns
+        ])
+
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        state = self.state
+        row = state.snapshot.row_of(flight_id)
+        return self._materialize(state, [row])[0] if row is not None else None
+
+    def list_flights(self) -> Iterator[Flight]:
+        state = self.state
+        count = len(state.snapshot)
+        for start in range(0, count, 1024):
+            yield from self._materialize(state, range(start, min(start + 1024, count)))
+
+    def count_flights(self) -> int:
+        return len(self.state.snapshot)
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        state = self.state
+        return self._materialize(state, range(offset, min(offset + limit, len(state.snapshot))))
+
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        state = self.state
+        snapshot = state.snapshot
+        rows = snapshot.day_rows(origin, destination, departure_date)
+        rows = rows[state.seats[rows] >= min_seats]
+        order = np.lexsort((snapshot.records["flight_id"][rows], snapshot.departure[rows], state.prices[rows]))
+        return self._materialize(state, rows[order])
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        state = self.state
+        snapshot = state.snapshot
+        rows = snapshot.day_rows(origin, destination, departure_date)
+        rows = rows[state.seats[rows] >= min_seats]
+        return self._materialize(state, select_rows(
+            rows, state.prices, snapshot.departure, snapshot.records["arrival"], sort_by, limit, filters,
+            tiebreak=snapshot.records["flight_id"],
+        ))
+
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        """Merge `flights` into a new snapshot file and switch to it (a full rewrite, O(inventory))."""
+        flights = list(flights)
+        with self._write_lock:
+            old = self.state.snapshot
+            # Merge into the file on disk: if another process rewrote it since we mapped it,
+            # its flights are kept. The file only ever holds loaded seat counts and base fares;
+            # this process's bookings stay in its own arrays, and repricing resumes after the reload.
+            base = SnapshotState.loaded(old if old.is_current() else FlightSnapshot(self.path), copy=False)
+            count = len(base.snapshot)
+            current = (
+                flight
+                for start in range(0, count, 1024)
+                for flight in self._materialize(base, range(start, min(start + 1024, count)))
+            )
+            write_snapshot(itertools.chain(current, flights), self.path)
+            state = SnapshotState.loaded(FlightSnapshot(self.path))
+            # Find each flight we had mapped in the new file (all of them, unless the file was
+            # replaced from outside with a different schedule).
+            ids = old.records["flight_id"]
+            at = np.minimum(np.searchsorted(state.snapshot.ids, ids), max(len(state.snapshot) - 1, 0))
+            found = state.snapshot.ids[at] == ids if len(state.snapshot) else np.zeros(len(ids), dtype=bool)
+            moved = state.snapshot.id_rows[at[found]]
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                # Carry over the seats bookings and holds took here, as of the swap (seats_after_reload).
+                taken = (old.records["seats"] - self.state.seats)[found]
+                state.seats[moved] = np.maximum(state.seats[moved] - taken, 0)
+                self.state = state
+            finally:
+                for lock in self._locks:
+                    lock.release()
+        self._notify_reloaded()
+        return len(flights)
+
+    def _lock_for(self, flight_id: str) -> threading.Lock:
+        return self._locks[hash(flight_id) % len(self._locks)]
+
+    def base_prices(self) -> Dict[str, float]:
+        snapshot = self.state.snapshot
+        return {
+            flight_id.decode(): round(price, 2)
+            for flight_id, price in zip(snapshot.records["flight_id"].tolist(), snapshot.price.tolist())
+        }
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        changed = []
+        for flight_id, price in prices.items():
+            with self._lock_for(flight_id):
+                state = self.state  # stable while a stripe lock is held
+                row = state.snapshot.row_of(flight_id)
+                if row is None or round(float(state.prices[row]), 2) == price:
+                    continue
+                state.prices[row] = price
+            changed.append(flight_id)
+        for flight_id in changed:
+            self._notify_changed(flight_id)
+        return len(changed)
+
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self._lock_for(flight_id):
+            state = self.state
+            row = state.snapshot.row_of(flight_id)
+            if row is None or state.seats[row] < num_seats:
+                return None
+            state.seats[row] -= num_seats
+            remaining = int(state.seats[row])
+        self._notify_changed(flight_id)
+        return remaining
+
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self._lock_for(flight_id):
+            state = self.state
+            row = state.snapshot.row_of(flight_id)
+            if row is None:
+                return None
+            state.seats[row] += num_seats
+            remaining = int(state.seats[row])
+        self._notify_changed(flight_id)
+        return remaining
+
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        return self.bookings.get(booking_id)
+
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        if not seats_reserved and self.reserve_seats(booking.flight_id, booking.num_seats) is None:
+            return False
+        self.bookings[booking.booking_id] = booking
+        self.booking_index.add(booking)
+        return True
+
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        booking = self.bookings.pop(booking_id, None)
+        if booking is not None:
+            self.booking_index.remove(booking)
+            self.release_seats(booking.flight_id, booking.num_seats)
+        return booking
+
+    def list_bookings(self) -> Iterator[Bookings]:
+        return iter(list(self.bookings.values()))
+
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_passenger(passenger_name, offset, limit)
+
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self.booking_index.for_flight(flight_id, offset, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a flight schedule file as a memory-mappable snapshot.")
+    parser.add_argument("schedule", help="schedule file (.csv or .jsonl)")
+    parser.add_argument("snapshot", help="snapshot file to write")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = write_snapshot(iter_flights(args.schedule, args.batch_size), args.snapshot)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        "flights": count,
+        "bytes": os.path.getsize(args.snapshot),
+        "seconds": round(seconds, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,561 @@
+# DB/sqlite_repository.py
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from schemas.Flight1 import Flight, Bookings
+from DB.booking_index import passenger_key
+from DB.flight_index import NO_FILTERS, SearchFilters
+from DB.repository import FlightRepository
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    flight_id TEXT PRIMARY KEY,
+    airline TEXT NOT NULL,
+    flight_number TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    origin_key TEXT NOT NULL,
+    destination_key TEXT NOT NULL,
+    departure_date TEXT NOT NULL,
+    departure_time TEXT NOT NULL,
+    arrival_time TEXT NOT NULL,
+    price REAL NOT NULL,
+    available_seats INTEGER NOT NULL CHECK (available_seats >= 0),
+    base_price REAL,
+    base_seats INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_flights_route_date
+    ON flights (origin_key, destination_key, departure_date, price);
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id TEXT PRIMARY KEY,
+    flight_id TEXT NOT NULL REFERENCES flights (flight_id),
+    passenger_name TEXT NOT NULL,
+    num_seats INTEGER NOT NULL,
+    booking_time TEXT NOT NULL,
+    status TEXT NOT NULL,
+    passenger_key TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_flight ON bookings (flight_id);
+CREATE TABLE IF NOT EXISTS seat_holds (
+    hold_id TEXT PRIMARY KEY,
+    flight_id TEXT NOT NULL REFERENCES flights (flight_id),
+    num_seats INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_seat_holds_expiry ON seat_holds (expires_at);
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    operation TEXT NOT NULL,
+    key TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    token TEXT NOT NULL,
+    result TEXT,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (operation, key)
+);
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expiry ON idempotency_keys (expires_at);
+CREATE TABLE IF NOT EXISTS flight_changes (
+    seq INTEGER PRIMARY KEY,
+    flight_id TEXT
+);
+CREATE TRIGGER IF NOT EXISTS trg_flight_seats AFTER UPDATE OF available_seats ON flights
+    WHEN OLD.available_seats <> NEW.available_seats
+BEGIN
+    INSERT INTO flight_changes (flight_id) VALUES (NEW.flight_id);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_flight_price AFTER UPDATE OF price ON flights
+    WHEN OLD.price <> NEW.price
+BEGIN
+    INSERT INTO flight_changes (flight_id) VALUES (NEW.flight_id);
+END;
+"""
+
+FLIGHT_COLUMNS = (
+    "flight_id, airline, flight_number, origin, destination, "
+    "departure_time, arrival_time, price, available_seats"
+)
+SELECT_FLIGHT = f"SELECT {FLIGHT_COLUMNS} FROM flights WHERE flight_id = ?"
+SELECT_ALL_FLIGHTS = f"SELECT {FLIGHT_COLUMNS} FROM flights ORDER BY rowid"
+SELECT_FLIGHT_PAGE = f"SELECT {FLIGHT_COLUMNS} FROM flights ORDER BY rowid LIMIT ? OFFSET ?"
+ROUTE_DAY_FILTER = "origin_key = ? AND destination_key = ? AND departure_date = ? AND available_seats >= ?"
+SEARCH_FLIGHTS = f"SELECT {FLIGHT_COLUMNS} FROM flights WHERE {ROUTE_DAY_FILTER} ORDER BY price, departure_time, flight_id"
+# ORDER BY ... LIMIT makes SQLite keep only the best `limit` rows while scanning the route/day.
+TOP_FLIGHTS_ORDER = {
+    "price": "price, departure_time, flight_id",
+    "departure": "departure_time, price, flight_id",
+    "duration": "strftime('%s', arrival_time) - strftime('%s', departure_time), price, flight_id",
+}
+UPSERT_FLIGHT = (
+    "INSERT INTO flights (flight_id, airline, flight_number, origin, destination, "
+    "origin_key, destination_key, departure_date, departure_time, arrival_time, price, available_seats, "
+    "base_price, base_seats) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (flight_id) DO UPDATE SET airline = excluded.airline, flight_number = excluded.flight_number, "
+    "origin = excluded.origin, destination = excluded.destination, origin_key = excluded.origin_key, "
+    "destination_key = excluded.destination_key, departure_date = excluded.departure_date, "
+    "departure_time = excluded.departure_time, arrival_time = excluded.arrival_time, "
+    "price = excluded.price, base_price = excluded.base_price, "
+    # Seats taken out of the previous load (bookings and holds, from any process) stay taken.
+    "available_seats = MAX(excluded.available_seats - (flights.base_seats - flights.available_seats), 0), "
+    "base_seats = excluded.base_seats"
+)
+TAKE_SEATS = "UPDATE flights SET available_seats = available_seats - ? WHERE flight_id = ? AND available_seats >= ?"
+GIVE_SEATS = "UPDATE flights SET available_seats = available_seats + ? WHERE flight_id = ?"
+SELECT_SEATS = "SELECT available_seats FROM flights WHERE flight_id = ?"
+# Conditional, so workers writing the same fare do not each add a change-feed entry.
+SET_PRICE = "UPDATE flights SET price = ? WHERE flight_id = ? AND price <> ?"
+SELECT_BASE_PRICES = "SELECT flight_id, COALESCE(base_price, price) FROM flights"
+BOOKING_COLUMNS = "booking_id, flight_id, passenger_name, num_seats, booking_time, status"
+SELECT_BOOKING = f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE booking_id = ?"
+SELECT_PASSENGER_BOOKINGS = (
+    f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE passenger_key = ? "
+    "ORDER BY booking_time, booking_id LIMIT ? OFFSET ?"
+)
+COUNT_PASSENGER_BOOKINGS = "SELECT COUNT(*) FROM bookings WHERE passenger_key = ?"
+SELECT_FLIGHT_BOOKINGS = (
+    f"SELECT {BOOKING_COLUMNS} FROM bookings WHERE flight_id = ? "
+    "ORDER BY booking_time, booking_id LIMIT ? OFFSET ?"
+)
+COUNT_FLIGHT_BOOKINGS = "SELECT COUNT(*) FROM bookings WHERE flight_id = ?"
+SELECT_ALL_BOOKINGS = f"SELECT {BOOKING_COLUMNS} FROM bookings"
+INSERT_BOOKING = (
+    "INSERT INTO bookings (booking_id, flight_id, passenger_name, num_seats, booking_time, status, passenger_key) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+DELETE_BOOKING = "DELETE FROM bookings WHERE booking_id = ?"
+# Seat holds; expires_at is wall-clock epoch seconds, so every process reads the same deadline.
+INSERT_HOLD = "INSERT INTO seat_holds (hold_id, flight_id, num_seats, expires_at) VALUES (?, ?, ?, ?)"
+SELECT_HOLD = "SELECT flight_id, num_seats, expires_at FROM seat_holds WHERE hold_id = ?"
+DELETE_LIVE_HOLD = "DELETE FROM seat_holds WHERE hold_id = ? AND expires_at > ?"
+SELECT_DUE_HOLDS = "SELECT hold_id, flight_id, num_seats FROM seat_holds WHERE expires_at <= ?"
+DELETE_DUE_HOLDS = "DELETE FROM seat_holds WHERE expires_at <= ?"
+NEXT_HOLD_EXPIRY = "SELECT MIN(expires_at) FROM seat_holds"
+HOLD_TOTALS = "SELECT COUNT(*), COALESCE(SUM(num_seats), 0) FROM seat_holds"
+# Idempotency keys; result is NULL while the first call runs, and an expired row may be claimed again.
+CLAIM_KEY = (
+    "INSERT INTO idempotency_keys (operation, key, arguments, token, result, expires_at) VALUES (?, ?, ?, ?, NULL, ?) "
+    "ON CONFLICT (operation, key) DO UPDATE SET arguments = excluded.arguments, token = excluded.token, "
+    "result = NULL, expires_at = excluded.expires_at WHERE idempotency_keys.expires_at <= ?"
+)
+SELECT_KEY = "SELECT arguments, result FROM idempotency_keys WHERE operation = ? AND key = ?"
+FINISH_KEY = "UPDATE idempotency_keys SET result = ?, expires_at = ? WHERE operation = ? AND key = ? AND token = ?"
+DROP_KEY = "DELETE FROM idempotency_keys WHERE operation = ? AND key = ? AND token = ?"
+DELETE_EXPIRED_KEYS = "DELETE FROM idempotency_keys WHERE expires_at <= ?"
+# Oldest finished keys beyond the size bound; keys whose first call is still running are kept.
+EVICT_KEYS = (
+    "DELETE FROM idempotency_keys WHERE rowid IN (SELECT rowid FROM idempotency_keys WHERE result IS NOT NULL "
+    "ORDER BY expires_at LIMIT MAX(0, (SELECT COUNT(*) FROM idempotency_keys) - ?))"
+)
+COUNT_KEYS = "SELECT COUNT(*) FROM idempotency_keys"
+# A NULL flight_id in the change feed means "flights were added or replaced".
+RECORD_RELOAD = "INSERT INTO flight_changes (flight_id) VALUES (NULL)"
+SELECT_CHANGES = "SELECT seq, flight_id FROM flight_changes WHERE seq > ? ORDER BY seq LIMIT ?"
+PRUNE_CHANGES = "DELETE FROM flight_changes WHERE seq <= ?"
+
+
+def _row_to_flight(row) -> Flight:
+    return Flight.model_construct(
+        flight_id=row[0],
+        airline=row[1],
+        flight_number=row[2],
+        origin=row[3],
+        destination=row[4],
+        departure_time=datetime.fromisoformat(row[5]),
+        arrival_time=datetime.fromisoformat(row[6]),
+        price=row[7],
+        available_seats=row[8],
+    )
+
+
+def _row_to_booking(row) -> Bookings:
+    return Bookings.model_construct(
+        booking_id=row[0],
+        flight_id=row[1],
+        passenger_name=row[2],
+        num_seats=row[3],
+        booking_time=datetime.fromisoformat(row[4]),
+        status=row[5],
+    )
+
+
+def _flight_params(flight: Flight) -> tuple:
+    return (
+        flight.flight_id,
+        flight.airline,
+        flight.flight_number,
+        flight.origin,
+        flight.destination,
+        flight.origin.lower(),
+        flight.destination.lower(),
+        flight.departure_time.date().isoformat(),
+        flight.departure_time.isoformat(),
+        flight.arrival_time.isoformat(),
+        flight.price,
+        flight.available_seats,
+        flight.price,
+        flight.available_seats,
+    )
+
+
+class SQLiteRepository(FlightRepository):
+    """Repository backed by one SQLite file in WAL mode, shareable by several server processes.
+
+    Each thread gets its own connection; all SQL is fixed text so sqlite3's per-connection
+    statement cache keeps it prepared. Seat changes are conditional UPDATEs, so concurrent
+    writers in any process can never drive a flight below zero seats.
+
+    Seat changes, fare changes and reloads are also appended to a `flight_changes` feed (by trigger, so
+    writes from other processes are captured too); `poll_changes` replays the feed into the
+    change/reload listeners so per-process caches stay coherent across server workers.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000, change_log_size: int = 100_000):
+        super().__init__()
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.change_log_size = change_log_size
+        self._local = threading.local()
+        self._poll_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        self._last_change = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM flight_changes").fetchone()[0]
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Bring stores created by older versions up to the current schema."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(bookings)")}
+        flight_columns = {row[1] for row in conn.execute("PRAGMA table_info(flights)")}
+        with self._transaction() as txn:
+            if "base_price" not in flight_columns:
+                # Stores from before repricing only ever held the loaded fares.
+                txn.execute("ALTER TABLE flights ADD COLUMN base_price REAL")
+                txn.execute("UPDATE flights SET base_price = price")
+            if "base_seats" not in flight_columns:
+                # Best estimate of the loaded seat count: what is left plus what bookings took.
+                txn.execute("ALTER TABLE flights ADD COLUMN base_seats INTEGER")
+                txn.execute(
+                    "UPDATE flights SET base_seats = available_seats + COALESCE("
+                    "(SELECT SUM(num_seats) FROM bookings WHERE bookings.flight_id = flights.flight_id), 0)"
+                )
+            if "passenger_key" not in columns:
+                txn.execute("ALTER TABLE bookings ADD COLUMN passenger_key TEXT NOT NULL DEFAULT ''")
+            # Python's casefold/whitespace rules are not expressible in SQL, so backfill here.
+            rows = txn.execute("SELECT booking_id, passenger_name FROM bookings WHERE passenger_key = ''").fetchall()
+            txn.executemany(
+                "UPDATE bookings SET passenger_key = ? WHERE booking_id = ?",
+                [(passenger_key(name), booking_id) for booking_id, name in rows],
+            )
+            txn.execute("CREATE INDEX IF NOT EXISTS idx_bookings_passenger ON bookings (passenger_key, booking_time)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, cached_statements=256, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def seed(self, flights: Iterable[Flight]) -> int:
+        """Load `flights` only if the store is still empty, so concurrent workers seed it once."""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM flights LIMIT 1").fetchone():
+                return 0
+            count = self._insert(conn, flights)
+        self._notify_reloaded()
+        return count
+
+    def get_flight(self, flight_id: str) -> Optional[Flight]:
+        row = self._connect().execute(SELECT_FLIGHT, (flight_id,)).fetchone()
+        return _row_to_flight(row) if row else None
+
+    def list_flights(self) -> Iterator[Flight]:
+        for row in self._connect().execute(SELECT_ALL_FLIGHTS):
+            yield _row_to_flight(row)
+
+    def count_flights(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM flights").fetchone()[0]
+
+    def page_flights(self, offset: int, limit: int) -> List[Flight]:
+        return [_row_to_flight(row) for row in self._connect().execute(SELECT_FLIGHT_PAGE, (limit, offset))]
+
+    def search_flights(self, origin: str, destination: str, departure_date: date, min_seats: int = 1) -> List[Flight]:
+        rows = self._connect().execute(
+            SEARCH_FLIGHTS, (origin.lower(), destination.lower(), departure_date.isoformat(), min_seats)
+        )
+        return [_row_to_flight(row) for row in rows]
+
+    def top_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        min_seats: int = 1,
+        sort_by: str = "price",
+        limit: int = 0,
+        filters: SearchFilters = NO_FILTERS,
+    ) -> List[Flight]:
+        conditions = [ROUTE_DAY_FILTER]
+        params = [origin.lower(), destination.lower(), departure_date.isoformat(), min_seats]
+        if filters.min_price is not None:
+            conditions.append("price >= ?")
+            params.append(filters.min_price)
+        if filters.max_price is not None:
+            conditions.append("price <= ?")
+            params.append(filters.max_price)
+        if filters.depart_after is not None:
+            conditions.append("departure_time >= ?")
+            params.append(datetime.combine(departure_date, filters.depart_after).isoformat())
+        if filters.depart_before is not None:
+            conditions.append("departure_time <= ?")
+            params.append(datetime.combine(departure_date, filters.depart_before).isoformat())
+        query = (
+            f"SELECT {FLIGHT_COLUMNS} FROM flights WHERE {' AND '.join(conditions)} "
+            f"ORDER BY {TOP_FLIGHTS_ORDER.get(sort_by, TOP_FLIGHTS_ORDER['price'])} LIMIT ?"
+        )
+        rows = self._connect().execute(query, (*params, limit or -1))
+        return [_row_to_flight(row) for row in rows]
+
+    def add_flights(self, flights: Iterable[Flight]) -> int:
+        with self._transaction() as conn:
+            count = self._insert(conn, flights)
+        self._notify_reloaded()
+        return count
+
+    def base_prices(self) -> Dict[str, float]:
+        return dict(self._connect().execute(SELECT_BASE_PRICES).fetchall())
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        changed = []
+        with self._transaction() as conn:
+            for flight_id, price in prices.items():
+                if conn.execute(SET_PRICE, (price, flight_id, price)).rowcount:
+                    changed.append(flight_id)
+        for flight_id in changed:
+            self._notify_changed(flight_id)
+        return len(changed)
+
+    def _insert(self, conn: sqlite3.Connection, flights: Iterable[Flight]) -> int:
+        params = [_flight_params(flight) for flight in flights]
+        conn.executemany(UPSERT_FLIGHT, params)
+        conn.execute(RECORD_RELOAD)
+        return len(params)
+
+    def poll_changes(self, batch_size: int = 10_000) -> int:
+        """Notify listeners of every change in the feed since the last poll; returns how many.
+
+        Changes made through this process are replayed as well, which costs a redundant cache
+        invalidation but never a stale read. If the feed was pruned past the last seen entry,
+        listeners get a reload instead.
+        """
+        with self._poll_lock:
+            conn = self._connect()
+            oldest = conn.execute("SELECT MIN(seq) FROM flight_changes").fetchone()[0]
+            if oldest is not None and oldest > self._last_change + 1:
+                self._last_change = conn.execute("SELECT MAX(seq) FROM flight_changes").fetchone()[0]
+                self._notify_reloaded()
+                return 1
+            rows = conn.execute(SELECT_CHANGES, (self._last_change, batch_size)).fetchall()
+            if not rows:
+                return 0
+            self._last_change = rows[-1][0]
+            changed = {fid for _, fid in rows}
+            if None in changed:
+                self._notify_reloaded()
+            else:
+                for flight_id in changed:
+                    self._notify_changed(flight_id)
+            if oldest is not None and self._last_change - oldest >= 2 * self.change_log_size:
+                with self._transaction() as txn:
+                    txn.execute(PRUNE_CHANGES, (self._last_change - self.change_log_size,))
+            return len(rows)
+
+    def watch_changes(self, interval: float = 1.0) -> None:
+        """Poll the change feed every `interval` seconds on a daemon thread (idempotent)."""
+        if self._watcher is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.poll_changes()
+                except sqlite3.OperationalError:
+                    pass
+
+        self._watcher = threading.Thread(target=run, name="sqlite-change-feed", daemon=True)
+        self._watcher.start()
+
+    def reserve_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self._transaction() as conn:
+            if conn.execute(TAKE_SEATS, (num_seats, flight_id, num_seats)).rowcount == 0:
+                return None
+            remaining = conn.execute(SELECT_SEATS, (flight_id,)).fetchone()[0]
+        self._notify_changed(flight_id)
+        return remaining
+
+    def release_seats(self, flight_id: str, num_seats: int) -> Optional[int]:
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self._transaction() as conn:
+            if conn.execute(GIVE_SEATS, (num_seats, flight_id)).rowcount == 0:
+                return None
+            remaining = conn.execute(SELECT_SEATS, (flight_id,)).fetchone()[0]
+        self._notify_changed(flight_id)
+        return remaining
+
+    def place_hold(self, hold_id: str, flight_id: str, num_seats: int, expires_at: float) -> Optional[int]:
+        """Take the seats and record the hold in one transaction; the seats left, or None."""
+        if num_seats < 1:
+            raise ValueError("num_seats must be at least 1")
+        with self._transaction() as conn:
+            if conn.execute(TAKE_SEATS, (num_seats, flight_id, num_seats)).rowcount == 0:
+                return None
+            conn.execute(INSERT_HOLD, (hold_id, flight_id, num_seats, expires_at))
+            remaining = conn.execute(SELECT_SEATS, (flight_id,)).fetchone()[0]
+        self._notify_changed(flight_id)
+        return remaining
+
+    def get_hold(self, hold_id: str) -> Optional[Tuple[str, int, float]]:
+        """(flight_id, num_seats, expires_at) of a stored hold, expired or not."""
+        return self._connect().execute(SELECT_HOLD, (hold_id,)).fetchone()
+
+    def confirm_hold(self, hold_id: str, booking: Bookings, now: float) -> bool:
+        """Turn a live hold into `booking` over its seats, atomically; False if it is gone or expired."""
+        with self._transaction() as conn:
+            if conn.execute(DELETE_LIVE_HOLD, (hold_id, now)).rowcount == 0:
+                return False
+            conn.execute(INSERT_BOOKING, (
+                booking.booking_id,
+                booking.flight_id,
+                booking.passenger_name,
+                booking.num_seats,
+                booking.booking_time.isoformat(),
+                booking.status,
+                passenger_key(booking.passenger_name),
+            ))
+        return True
+
+    def release_hold(self, hold_id: str, now: float) -> bool:
+        """Drop a live hold and give its seats back; False if it is gone or expired."""
+        with self._transaction() as conn:
+            row = conn.execute(SELECT_HOLD, (hold_id,)).fetchone()
+            if row is None or conn.execute(DELETE_LIVE_HOLD, (hold_id, now)).rowcount == 0:
+                return False
+            conn.execute(GIVE_SEATS, (row[1], row[0]))
+        self._notify_changed(row[0])
+        return True
+
+    def expire_holds(self, now: float) -> int:
+        """Drop every hold due by `now` and give its seats back; returns how many."""
+        with self._transaction() as conn:
+            due = conn.execute(SELECT_DUE_HOLDS, (now,)).fetchall()
+            if not due:
+                return 0
+            conn.execute(DELETE_DUE_HOLDS, (now,))
+            conn.executemany(GIVE_SEATS, [(num_seats, flight_id) for _, flight_id, num_seats in due])
+        for flight_id in {flight_id for _, flight_id, _ in due}:
+            self._notify_changed(flight_id)
+        return len(due)
+
+    def next_hold_expiry(self) -> Optional[float]:
+        return self._connect().execute(NEXT_HOLD_EXPIRY).fetchone()[0]
+
+    def hold_totals(self) -> Tuple[int, int]:
+        """(live holds, seats they take) across every process sharing the store."""
+        return tuple(self._connect().execute(HOLD_TOTALS).fetchone())
+
+    def claim_idempotency_key(
+        self, operation: str, key: str, arguments: str, token: str, lease_until: float, now: float
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """Claim the key for a call about to run (None), or return the live row's (arguments, result)."""
+        with self._transaction() as conn:
+            if conn.execute(CLAIM_KEY, (operation, key, arguments, token, lease_until, now)).rowcount:
+                return None
+            return conn.execute(SELECT_KEY, (operation, key)).fetchone()
+
+    def finish_idempotency_key(self, operation: str, key: str, token: str, result: str, expires_at: float) -> None:
+        with self._transaction() as conn:
+            conn.execute(FINISH_KEY, (result, expires_at, operation, key, token))
+
+    def drop_idempotency_key(self, operation: str, key: str, token: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(DROP_KEY, (operation, key, token))
+
+    def trim_idempotency_keys(self, now: float, max_keys: int) -> Tuple[int, int]:
+        """Delete expired keys, then the oldest finished ones beyond `max_keys`; (expired, evicted)."""
+        with self._transaction() as conn:
+            expired = conn.execute(DELETE_EXPIRED_KEYS, (now,)).rowcount
+            evicted = conn.execute(EVICT_KEYS, (max_keys,)).rowcount
+        return expired, evicted
+
+    def count_idempotency_keys(self) -> int:
+        return self._connect().execute(COUNT_KEYS).fetchone()[0]
+
+    def get_booking(self, booking_id: str) -> Optional[Bookings]:
+        row = self._connect().execute(SELECT_BOOKING, (booking_id,)).fetchone()
+        return _row_to_booking(row) if row else None
+
+    def list_bookings(self) -> Iterator[Bookings]:
+        for row in self._connect().execute(SELECT_ALL_BOOKINGS):
+            yield _row_to_booking(row)
+
+    def bookings_for_passenger(self, passenger_name: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self._booking_page(SELECT_PASSENGER_BOOKINGS, COUNT_PASSENGER_BOOKINGS, passenger_key(passenger_name), offset, limit)
+
+    def bookings_for_flight(self, flight_id: str, offset: int = 0, limit: int = 50) -> Tuple[List[Bookings], int]:
+        return self._booking_page(SELECT_FLIGHT_BOOKINGS, COUNT_FLIGHT_BOOKINGS, flight_id, offset, limit)
+
+    def _booking_page(self, select: str, count: str, key: str, offset: int, limit: int) -> Tuple[List[Bookings], int]:
+        conn = self._connect()
+        page = [_row_to_booking(row) for row in conn.execute(select, (key, limit, offset))]
+        return page, conn.execute(count, (key,)).fetchone()[0]
+
+    def create_booking(self, booking: Bookings, seats_reserved: bool = False) -> bool:
+        with self._transaction() as conn:
+            if not seats_reserved and conn.execute(
+                TAKE_SEATS, (booking.num_seats, booking.flight_id, booking.num_seats)
+            ).rowcount == 0:
+                return False
+            conn.execute(INSERT_BOOKING, (
+                booking.booking_id,
+                booking.flight_id,
+                booking.passenger_name,
+                booking.num_seats,
+                booking.booking_time.isoformat(),
+                booking.status,
+                passenger_key(booking.passenger_name),
+            ))
+        if not seats_reserved:
+            self._notify_changed(booking.flight_id)
+        return True
+
+    def cancel_booking(self, booking_id: str) -> Optional[Bookings]:
+        with self._transaction() as conn:
+            row = conn.execute(SELECT_BOOKING, (booking_id,)).fetchone()
+            if row is None:
+                return None
+            booking = _row_to_booking(row)
+            conn.execute(DELETE_BOOKING, (booking_id,))
+            conn.execute(GIVE_SEATS, (booking.num_seats, booking.flight_id))
+        self._notify_changed(booking.flight_id)
+        return booking
@@ -0,0 +1,316 @@
+# holds.py
+import asyncio
+import atexit
+import heapq
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+
+from DB.flights_DB import get_repository
+from DB.repository import FlightRepository
+from DB.sqlite_repository import SQLiteRepository
+from schemas.Flight1 import Bookings
+
+logger = logging.getLogger(__name__)
+
+MAX_HOLD_TTL = int(os.environ.get("SEAT_HOLD_MAX_TTL", "1800"))
+
+
+@dataclass
+class Hold:
+    hold_id: str
+    flight_id: str
+    num_seats: int
+    expires_at: datetime
+    deadline: float  # time.monotonic() at expiry
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "hold_id": self.hold_id,
+            "flight_id": self.flight_id,
+            "num_seats": self.num_seats,
+            "expires_at": self.expires_at.isoformat(),
+            "expires_in_seconds": max(0, round(self.deadline - time.monotonic())),
+        }
+
+
+class HoldManager:
+    """Seat holds that expire unless they are confirmed or released first.
+
+    A hold takes its seats with reserve_seats() at once, so searches, the fare calendar and
+    other bookers see them as gone; confirm() stores a booking over the held seats without
+    taking them again, and release() or expiry gives them back. Deadlines live in a min-heap,
+    so placing a hold and reaping the next one to expire are both O(log n). Confirmed and
+    released holds leave their heap entry behind; it is skipped when it reaches the top.
+    """
+
+    def __init__(self, repository: FlightRepository):
+        self.repository = repository
+        self._lock = threading.Lock()
+        self._holds: Dict[str, Hold] = {}
+        self._deadlines: List[Tuple[float, str]] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self.placed = 0
+        self.confirmed = 0
+        self.released = 0
+        self.expired = 0
+
+    def hold(self, flight_id: str, num_seats: int, ttl_seconds: float) -> Optional[Hold]:
+        """Take `num_seats` on the flight for `ttl_seconds`; None if they are not available."""
+        if self.repository.reserve_seats(flight_id, num_seats) is None:
+            return None
+        hold = Hold(
+            hold_id=str(uuid.uuid4()),
+            flight_id=flight_id,
+            num_seats=num_seats,
+            expires_at=datetime.now() + timedelta(seconds=ttl_seconds),
+            deadline=time.monotonic() + ttl_seconds,
+        )
+        with self._lock:
+            self._holds[hold.hold_id] = hold
+            heapq.heappush(self._deadlines, (hold.deadline, hold.hold_id))
+            self.placed += 1
+        return hold
+
+    def _take(self, hold_id: str) -> Optional[Hold]:
+        with self._lock:
+            hold = self._holds.pop(hold_id, None)
+        if hold is not None and hold.deadline <= time.monotonic():
+            # Expired but not reaped yet: it is too late to use it.
+            self.repository.release_seats(hold.flight_id, hold.num_seats)
+            with self._lock:
+                self.expired += 1
+            return None
+        return hold
+
+    def confirm(self, hold_id: str, passenger_name: str) -> Optional[Bookings]:
+        """Book the held seats for `passenger_name`; None if the hold is unknown or has expired."""
+        hold = self._take(hold_id)
+        if hold is None:
+            return None
+        booking = Bookings(
+            booking_id=str(uuid.uuid4()),
+            flight_id=hold.flight_id,
+            passenger_name=passenger_name,
+            num_seats=hold.num_seats,
+            booking_time=datetime.now(),
+            status="confirmed",
+        )
+        try:
+            self.repository.create_booking(booking, seats_reserved=True)
+        except Exception:
+            self.repository.release_seats(hold.flight_id, hold.num_seats)
+            raise
+        with self._lock:
+            self.confirmed += 1
+        return booking
+
+    def release(self, hold_id: str) -> Optional[Hold]:
+        """Give the held seats back; None if the hold is unknown or has expired."""
+        hold = self._take(hold_id)
+        if hold is None:
+            return None
+        self.repository.release_seats(hold.flight_id, hold.num_seats)
+        with self._lock:
+            self.released += 1
+        return hold
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Release every hold whose deadline has passed; returns how many expired."""
+        now = time.monotonic() if now is None else now
+        due = []
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, hold_id = heapq.heappop(self._deadlines)
+                hold = self._holds.pop(hold_id, None)
+                if hold is not None:
+                    due.append(hold)
+        for hold in due:
+            self.repository.release_seats(hold.flight_id, hold.num_seats)
+        with self._lock:
+            self.expired += len(due)
+        return len(due)
+
+    def release_all(self) -> int:
+        """Give back the seats of every live hold (at shutdown)."""
+        with self._lock:
+            holds = list(self._holds.values())
+            self._holds.clear()
+            self._deadlines.clear()
+        for hold in holds:
+            self.repository.release_seats(hold.flight_id, hold.num_seats)
+        return len(holds)
+
+    def next_deadline(self) -> Optional[float]:
+        deadlines = self._deadlines
+        return deadlines[0][0] if deadlines else None
+
+    async def run_reaper(self, max_sleep: float = 1.0) -> None:
+        """Expire holds as their deadlines pass, sleeping until the next one (at most max_sleep)."""
+        while True:
+            deadline = self.next_deadline()
+            delay = max_sleep if deadline is None else min(max_sleep, max(0.0, deadline - time.monotonic()))
+            await asyncio.sleep(delay)
+            deadline = self.next_deadline()
+            if deadline is None or deadline > time.monotonic():
+                continue
+            try:
+                # Releasing seats may wait on the store (SQLite locks); keep the event loop free.
+                await anyio.to_thread.run_sync(self.expire)
+            except Exception:
+                logger.exception("Seat hold reaper failed; retrying")
+
+    def ensure_reaper(self) -> None:
+        """Start the reaper on the running event loop unless it is already running there."""
+        loop = asyncio.get_running_loop()
+        task = self._reaper
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._reaper = loop.create_task(self.run_reaper())
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": len(self._holds),
+                "held_seats": sum(hold.num_seats for hold in self._holds.values()),
+                "heap_entries": len(self._deadlines),
+                "placed": self.placed,
+                "confirmed": self.confirmed,
+                "released": self.released,
+                "expired": self.expired,
+            }
+
+
+def _wall_clock(deadline: float) -> float:
+    """Epoch seconds for a time.monotonic() deadline."""
+    return time.time() + (deadline - time.monotonic())
+
+
+class SharedHoldManager(HoldManager):
+    """Seat holds kept in the SQLite store's seat_holds table instead of process memory.
+
+    Every worker sharing the database file sees the same holds: any of them can confirm or
+    release a hold another placed, and any worker's reaper expires holds that are due, so a
+    worker that exits or dies leaves no seats stranded. Taking the seats and recording the
+    hold, or dropping it and booking or giving the seats back, happen in one transaction.
+    Deadlines are stored as wall-clock times; the counters (placed, confirmed, ...) are this
+    process's own, while active and held_seats cover the whole store.
+    """
+
+    repository: SQLiteRepository
+
+    def hold(self, flight_id: str, num_seats: int, ttl_seconds: float) -> Optional[Hold]:
+        hold = Hold(
+            hold_id=str(uuid.uuid4()),
+            flight_id=flight_id,
+            num_seats=num_seats,
+            expires_at=datetime.now() + timedelta(seconds=ttl_seconds),
+            deadline=time.monotonic() + ttl_seconds,
+        )
+        if self.repository.place_hold(hold.hold_id, flight_id, num_seats, _wall_clock(hold.deadline)) is None:
+            return None
+        with self._lock:
+            self.placed += 1
+        return hold
+
+    def _stored(self, hold_id: str) -> Optional[Hold]:
+        row = self.repository.get_hold(hold_id)
+        if row is None:
+            return None
+        flight_id, num_seats, expires_at = row
+        return Hold(
+            hold_id=hold_id,
+            flight_id=flight_id,
+            num_seats=num_seats,
+            expires_at=datetime.fromtimestamp(expires_at),
+            deadline=time.monotonic() + (expires_at - time.time()),
+        )
+
+    def confirm(self, hold_id: str, passenger_name: str) -> Optional[Bookings]:
+        hold = self._stored(hold_id)
+        if hold is None:
+            return None
+        booking = Bookings(
+            booking_id=str(uuid.uuid4()),
+            flight_id=hold.flight_id,
+            passenger_name=passenger_name,
+            num_seats=hold.num_seats,
+            booking_time=datetime.now(),
+            status="confirmed",
+        )
+        if not self.repository.confirm_hold(hold_id, booking, time.time()):
+            return None
+        with self._lock:
+            self.confirmed += 1
+        return booking
+
+    def release(self, hold_id: str) -> Optional[Hold]:
+        hold = self._stored(hold_id)
+        if hold is None or not self.repository.release_hold(hold_id, time.time()):
+            return None
+        with self._lock:
+            self.released += 1
+        return hold
+
+    def expire(self, now: Optional[float] = None) -> int:
+        expired = self.repository.expire_holds(time.time() if now is None else _wall_clock(now))
+        with self._lock:
+            self.expired += expired
+        return expired
+
+    def release_all(self) -> int:
+        # Holds outlive this process; another worker confirms, releases or expires them.
+        return 0
+
+    def next_deadline(self) -> Optional[float]:
+        expires_at = self.repository.next_hold_expiry()
+        return None if expires_at is None else time.monotonic() + (expires_at - time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        active, held_seats = self.repository.hold_totals()
+        with self._lock:
+            return {
+                "active": active,
+                "held_seats": held_seats,
+                "placed": self.placed,
+                "confirmed": self.confirmed,
+                "released": self.released,
+                "expired": self.expired,
+            }
+
+
+def create_hold_manager(repository: FlightRepository) -> HoldManager:
+    """Holds in the SQLite store when the repository is one, so every worker shares them."""
+    if isinstance(repository, SQLiteRepository):
+        manager = SharedHoldManager(repository)
+        # Holds left behind by a worker that has since gone away.
+        manager.expire()
+        return manager
+    manager = HoldManager(repository)
+    # Holds only live in this process; hand their seats back when it exits.
+    atexit.register(manager.release_all)
+    return manager
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_hold_manager() -> HoldManager:
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = create_hold_manager(get_repository())
+    return _manager
+
+
+def hold_stats() -> Optional[Dict[str, Any]]:
+    """Hold counters, or None before the first hold (never blocks on the inventory load)."""
+    return _manager.stats() if _manager is not None else None
@@ -0,0 +1,45 @@
+# http_app.py
+"""ASGI app for the HTTP transports, importable by uvicorn worker processes as "http_app:app".
+
+Settings come from the environment so that every worker builds the same app:
+MCP_TRANSPORT ("streamable-http" or "sse") and MCP_STATELESS_HTTP ("1" to create a fresh
+transport per request, which lets any worker answer any request).
+"""
+import os
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+
+from mcp_instance import mcp
+from metrics import registry
+from DB.flights_DB import inventory_status, start_background_load
+import tools
+import resources
+import promts
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    # Counters are per worker process; each scrape reports the worker that answered it.
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request: Request) -> JSONResponse:
+    # 503 until this worker's inventory is loaded, so load balancers hold traffic back.
+    status = inventory_status()
+    return JSONResponse(status, status_code=200 if status["state"] == "ready" else 503)
+
+
+def create_app(transport: str = None):
+    transport = transport or os.environ.get("MCP_TRANSPORT", "streamable-http")
+    if transport == "sse":
+        return mcp.sse_app()
+    if transport == "streamable-http":
+        mcp.settings.stateless_http = os.environ.get("MCP_STATELESS_HTTP", "0") == "1"
+        return mcp.streamable_http_app()
+    raise ValueError(f"Unknown HTTP transport: {transport!r}")
+
+
+app = create_app()
+start_background_load()
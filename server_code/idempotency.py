@@ -0,0 +1,226 @@
+# idempotency.py
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from DB.flights_DB import get_repository
+from DB.repository import FlightRepository
+from DB.sqlite_repository import SQLiteRepository
+
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "100000"))
+IDEMPOTENCY_LEASE = float(os.environ.get("IDEMPOTENCY_LEASE", "60"))
+MAX_KEY_LENGTH = 255
+# Shared keys: how often a waiting retry re-reads the row, and how often expired rows are deleted.
+POLL_INTERVAL = 0.02
+SWEEP_INTERVAL = 1.0
+
+
+@dataclass
+class _Entry:
+    arguments: Tuple
+    expires: float
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[Dict[str, Any]] = None
+
+
+class IdempotencyCache:
+    """Results of side-effecting tool calls, keyed by operation and the caller's idempotency key.
+
+    The first call with a key runs; a retry with the same key and arguments gets the stored
+    result back without running again, and one that arrives while the first is still running
+    waits for it. Only successful results are kept: a call that returned an error changed
+    nothing, so its retry simply runs again. Every entry lives for the same TTL, so insertion
+    order is expiry order and both expiry and the size bound pop from the front in O(1). An
+    entry whose call is still running is never dropped, or a retry would run it a second time.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self.executed = 0
+        self.deduplicated = 0
+        self.conflicts = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _trim(self, now: float) -> None:
+        entries = self._entries
+        excess = len(entries) - self.max_entries
+        stale = []
+        for scope, entry in entries.items():
+            if entry.expires > now and len(stale) >= excess:
+                break
+            # A call still running stays: its retry must find the entry and wait for it.
+            if entry.done.is_set():
+                stale.append((scope, entry.expires <= now))
+        for scope, expired in stale:
+            del entries[scope]
+            if expired:
+                self.expired += 1
+            else:
+                self.evicted += 1
+
+    def _forget(self, scope: Tuple[str, str], entry: _Entry) -> None:
+        with self._lock:
+            if self._entries.get(scope) is entry:
+                del self._entries[scope]
+
+    def run(self, operation: str, key: str, arguments: Tuple, call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return `call()`'s result, or the stored result of an earlier call with the same key."""
+        scope = (operation, key)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._trim(now)
+                entry = self._entries.get(scope)
+                if entry is None:
+                    entry = self._entries[scope] = _Entry(arguments, now + self.ttl)
+                    break
+                if entry.arguments != arguments:
+                    self.conflicts += 1
+                    return {"error": "This idempotency key was already used with different arguments."}
+            entry.done.wait()
+            if entry.result is not None:
+                with self._lock:
+                    self.deduplicated += 1
+                return entry.result
+            # The first call failed without taking effect; run this one instead.
+
+        try:
+            result = call()
+        except BaseException:
+            self._forget(scope, entry)
+            entry.done.set()
+            raise
+        with self._lock:
+            self.executed += 1
+        if "error" in result:
+            self._forget(scope, entry)
+        else:
+            entry.result = result
+        entry.done.set()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+                "conflicts": self.conflicts,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+class SharedIdempotencyCache(IdempotencyCache):
+    """Idempotency keys kept in the SQLite store's idempotency_keys table, shared by every worker.
+
+    The first call claims its key with a row whose result is NULL; a retry on any worker that
+    finds the row waits (polling) for the result, or claims the key itself if that call failed.
+    A claim is a lease of IDEMPOTENCY_LEASE seconds, so a worker that dies mid-call does not
+    block its key until the TTL; finishing stores the result for the TTL. Expired rows are
+    deleted, and the table trimmed to max_entries, at most once per SWEEP_INTERVAL.
+    """
+
+    def __init__(
+        self,
+        repository: SQLiteRepository,
+        ttl: float = IDEMPOTENCY_TTL,
+        max_entries: int = IDEMPOTENCY_MAX_KEYS,
+        lease: float = IDEMPOTENCY_LEASE,
+    ):
+        super().__init__(ttl, max_entries)
+        self.repository = repository
+        self.lease = lease
+        self._next_sweep = 0.0
+
+    def _sweep(self, now: float) -> None:
+        with self._lock:
+            if now < self._next_sweep:
+                return
+            self._next_sweep = now + SWEEP_INTERVAL
+        expired, evicted = self.repository.trim_idempotency_keys(now, self.max_entries)
+        with self._lock:
+            self.expired += expired
+            self.evicted += evicted
+
+    def run(self, operation: str, key: str, arguments: Tuple, call: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        stored_arguments = json.dumps(arguments)
+        token = uuid.uuid4().hex
+        while True:
+            now = time.time()
+            self._sweep(now)
+            row = self.repository.claim_idempotency_key(
+                operation, key, stored_arguments, token, now + self.lease, now
+            )
+            if row is None:
+                break
+            if row[0] != stored_arguments:
+                with self._lock:
+                    self.conflicts += 1
+                return {"error": "This idempotency key was already used with different arguments."}
+            if row[1] is not None:
+                with self._lock:
+                    self.deduplicated += 1
+                return json.loads(row[1])
+            # The first call is still running, here or on another worker.
+            time.sleep(POLL_INTERVAL)
+
+        try:
+            result = call()
+        except BaseException:
+            self.repository.drop_idempotency_key(operation, key, token)
+            raise
+        with self._lock:
+            self.executed += 1
+        if "error" in result:
+            self.repository.drop_idempotency_key(operation, key, token)
+        else:
+            self.repository.finish_idempotency_key(operation, key, token, json.dumps(result), time.time() + self.ttl)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        keys = self.repository.count_idempotency_keys()
+        with self._lock:
+            return {
+                "keys": keys,
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+                "conflicts": self.conflicts,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+def create_idempotency_cache(repository: FlightRepository) -> IdempotencyCache:
+    """Keys in the SQLite store when the repository is one, so a retry may reach any worker."""
+    if isinstance(repository, SQLiteRepository):
+        return SharedIdempotencyCache(repository)
+    return IdempotencyCache()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_idempotency_cache() -> IdempotencyCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_idempotency_cache(get_repository())
+    return _cache
+
+
+def idempotency_stats() -> Optional[Dict[str, Any]]:
+    """Deduplication counters, or None before the first keyed call."""
+    return _cache.stats() if _cache is not None else None
@@ -1,4 +1,62 @@
 # mcp_instance.py
+from typing import Any
+
+from mcp import types
 from mcp.server.fastmcp import FastMCP
 
-mcp = FastMCP("Flight Booking Server")
\ No newline at end of file
+from metrics import instrument, registry
+from serialization import encode_tool_result
+
+
+class InstrumentedFastMCP(FastMCP):
+    """FastMCP whose tool, resource and prompt decorators record per-handler metrics.
+
+    It also registers resource subscription handlers, which FastMCP does not expose, and
+    advertises the `subscribe` capability once they are registered.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        server = self._mcp_server
+        get_capabilities = server.get_capabilities
+
+        def capabilities(notification_options, experimental_capabilities) -> types.ServerCapabilities:
+            result = get_capabilities(notification_options, experimental_capabilities)
+            if result.resources is not None and types.SubscribeRequest in server.request_handlers:
+                result.resources.subscribe = True
+            return result
+
+        server.get_capabilities = capabilities
+
+    def subscribe_resource(self):
+        return self._mcp_server.subscribe_resource()
+
+    def unsubscribe_resource(self):
+        return self._mcp_server.unsubscribe_resource()
+
+    def tool(self, name: str | None = None, *args, **kwargs):
+        register = super().tool(name, *args, **kwargs)
+        # Tool payloads are measured from the serialized content in call_tool below.
+        return lambda fn: register(instrument("tool", name or fn.__name__, fn, measure_payload=False))
+
+    def resource(self, uri: str, **kwargs):
+        register = super().resource(uri, **kwargs)
+        return lambda fn: register(instrument("resource", uri, fn))
+
+    def prompt(self, name: str | None = None, *args, **kwargs):
+        register = super().prompt(name, *args, **kwargs)
+        return lambda fn: register(instrument("prompt", name or fn.__name__, fn))
+
+    async def call_tool(self, name: str, arguments: dict[str, Any]):
+        # FastMCP.call_tool with convert_result=False: the tool manager still does the lookup,
+        # argument validation and error wrapping, and the raw value is encoded here instead.
+        # tests/test_serialization.py checks the encoding against convert_result for every tool.
+        raw = await self._tool_manager.call_tool(name, arguments, context=self.get_context(), convert_result=False)
+        result = encode_tool_result(self._tool_manager.get_tool(name).fn_metadata, raw)
+        content = result[0] if isinstance(result, tuple) else result
+        if isinstance(content, (list, tuple)):
+            registry.observe_payload("tool", name, sum(len(getattr(block, "text", "") or "") for block in content))
+        return result
+
+
+mcp = InstrumentedFastMCP("Flight Booking Server")
\ No newline at end of file
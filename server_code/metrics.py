@@ -0,0 +1,225 @@
+# metrics.py
+import functools
+import inspect
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Latency histogram bucket upper bounds, in seconds (Prometheus style, +Inf implied).
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class HandlerStats:
+    __slots__ = ("calls", "errors", "error_responses", "latency_sum", "buckets", "payload_bytes", "max_payload_bytes")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.error_responses = 0
+        self.latency_sum = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.payload_bytes = 0
+        self.max_payload_bytes = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the histogram bucket holding the q-th quantile."""
+        if not self.calls:
+            return None
+        rank = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Call counts, latency histograms, payload sizes and error counts per MCP handler."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[Tuple[str, str], HandlerStats] = {}
+        self.started_at = time.time()
+
+    def _stats(self, kind: str, name: str) -> HandlerStats:
+        stats = self._handlers.get((kind, name))
+        if stats is None:
+            stats = self._handlers.setdefault((kind, name), HandlerStats())
+        return stats
+
+    def observe(self, kind: str, name: str, seconds: float, error: bool = False, error_response: bool = False) -> None:
+        with self._lock:
+            stats = self._stats(kind, name)
+            stats.calls += 1
+            stats.latency_sum += seconds
+            stats.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if error:
+                stats.errors += 1
+            if error_response:
+                stats.error_responses += 1
+
+    def observe_payload(self, kind: str, name: str, size: int) -> None:
+        with self._lock:
+            stats = self._stats(kind, name)
+            stats.payload_bytes += size
+            if size > stats.max_payload_bytes:
+                stats.max_payload_bytes = size
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            handlers = {}
+            for (kind, name), stats in sorted(self._handlers.items()):
+                calls = stats.calls
+                handlers[f"{kind}:{name}"] = {
+                    "kind": kind,
+                    "name": name,
+                    "calls": calls,
+                    "errors": stats.errors,
+                    "error_responses": stats.error_responses,
+                    "error_rate": round((stats.errors + stats.error_responses) / calls, 4) if calls else 0.0,
+                    "latency_mean_ms": round(stats.latency_sum / calls * 1000, 3) if calls else None,
+                    "latency_p50_ms_le": _ms(stats.quantile(0.50)),
+                    "latency_p95_ms_le": _ms(stats.quantile(0.95)),
+                    "latency_p99_ms_le": _ms(stats.quantile(0.99)),
+                    "payload_bytes_total": stats.payload_bytes,
+                    "payload_bytes_mean": round(stats.payload_bytes / calls) if calls else None,
+                    "payload_bytes_max": stats.max_payload_bytes,
+                }
+        return {"uptime_seconds": round(time.time() - self.started_at, 1), "handlers": handlers}
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = [
+            "# HELP mcp_handler_calls_total Handler invocations.",
+            "# TYPE mcp_handler_calls_total counter",
+        ]
+        with self._lock:
+            items = sorted(self._handlers.items())
+            for (kind, name), stats in items:
+                lines.append(f'mcp_handler_calls_total{{kind="{kind}",name="{_label(name)}"}} {stats.calls}')
+            lines += ["# HELP mcp_handler_errors_total Handler calls that raised.", "# TYPE mcp_handler_errors_total counter"]
+            for (kind, name), stats in items:
+                lines.append(f'mcp_handler_errors_total{{kind="{kind}",name="{_label(name)}"}} {stats.errors}')
+            lines += [
+                "# HELP mcp_handler_error_responses_total Handler calls that returned an error payload.",
+                "# TYPE mcp_handler_error_responses_total counter",
+            ]
+            for (kind, name), stats in items:
+                lines.append(f'mcp_handler_error_responses_total{{kind="{kind}",name="{_label(name)}"}} {stats.error_responses}')
+            lines += ["# HELP mcp_handler_payload_bytes_total Response payload bytes.", "# TYPE mcp_handler_payload_bytes_total counter"]
+            for (kind, name), stats in items:
+                lines.append(f'mcp_handler_payload_bytes_total{{kind="{kind}",name="{_label(name)}"}} {stats.payload_bytes}')
+            lines += ["# HELP mcp_handler_latency_seconds Handler latency.", "# TYPE mcp_handler_latency_seconds histogram"]
+            for (kind, name), stats in items:
+                labels = f'kind="{kind}",name="{_label(name)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), stats.buckets):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'mcp_handler_latency_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"mcp_handler_latency_seconds_sum{{{labels}}} {stats.latency_sum}")
+                lines.append(f"mcp_handler_latency_seconds_count{{{labels}}} {stats.calls}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._handlers.clear()
+            self.started_at = time.time()
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    # A quantile in the overflow bucket has no finite bound. It is reported as None, which
+    # stays valid JSON; only the Prometheus exposition spells that bucket le="+Inf".
+    if seconds is None or seconds == float("inf"):
+        return None
+    return round(seconds * 1000, 3)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def is_error_response(result: Any) -> bool:
+    if isinstance(result, str):
+        return result.startswith('{"error"')
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, list) and len(result) == 1 and isinstance(result[0], dict):
+        return "error" in result[0]
+    return False
+
+
+def payload_size(result: Any) -> int:
+    # Characters rather than encoded bytes for text: payloads are JSON, almost all ASCII, and
+    # encoding a large resource again just to measure it would double its cost.
+    if isinstance(result, str):
+        return len(result)
+    if isinstance(result, bytes):
+        return len(result)
+    return len(json.dumps(result, default=str))
+
+
+registry = MetricsRegistry()
+
+
+def instrument(kind: str, name: str, fn: Callable, measure_payload: bool = True) -> Callable:
+    """Wrap an MCP handler so every call is timed and counted under (kind, name).
+
+    functools.wraps keeps the original signature visible to FastMCP, so argument schemas and
+    structured output are generated exactly as for the undecorated function.
+    """
+    def record(start: float, result: Any) -> None:
+        registry.observe(kind, name, time.perf_counter() - start, error_response=is_error_response(result))
+        if measure_payload:
+            registry.observe_payload(kind, name, payload_size(result))
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception:
+                registry.observe(kind, name, time.perf_counter() - start, error=True)
+                raise
+            record(start, result)
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            registry.observe(kind, name, time.perf_counter() - start, error=True)
+            raise
+        record(start, result)
+        return result
+    return wrapper
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_prometheus_exporter(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve the registry in Prometheus text format at http://host:port/metrics on a daemon thread."""
+    server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+    threading.Thread(target=server.serve_forever, name="prometheus-exporter", daemon=True).start()
+    return server
@@ -35,9 +35,9 @@ async def handle_disruption(flight_id: str, reason: str) -> str:
     return f"""A passenger's flight {flight_id} has been disrupted due to: {reason}
 
 Please help resolve this by:
-1. Understanding the passenger's situation
-2. Finding alternative flight options using search_flights
-3. Providing clear rebooking steps
+1. Understanding the passenger's situation (bookings_for_flight lists everyone booked on {flight_id})
+2. Rebooking everyone affected with rebook_disrupted_flight, or finding options for one passenger with search_flights
+3. Providing clear rebooking steps, including for anyone left unplaced
 4. Offering appropriate compensation if applicable
 
 Be empathetic and solution-focused in your response."""
\ No newline at end of file
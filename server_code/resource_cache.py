@@ -0,0 +1,118 @@
+# resource_cache.py
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from DB.flights_DB import get_repository
+from DB.repository import FlightRepository
+
+
+class FlightPayloadCache:
+    """Pre-serialized JSON for the flight resources.
+
+    Each flight's JSON text is cached, and the inventory is cut into fixed-size pages whose
+    bodies are cached too. A seat change drops only that flight's text and the one page holding
+    it; adding or replacing flights drops everything, since page boundaries may have moved.
+    """
+
+    def __init__(self, repository: FlightRepository, page_size: int = 500):
+        self.repository = repository
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._flights: Dict[str, str] = {}
+        self._pages: Dict[int, str] = {}
+        self._page_of: Dict[str, int] = {}
+        self._inventory: Optional[str] = None
+        self._generation = 0
+        repository.add_change_listener(self.invalidate)
+        repository.add_reload_listener(self.clear)
+
+    def invalidate(self, flight_id: str) -> None:
+        with self._lock:
+            self._generation += 1
+            self._flights.pop(flight_id, None)
+            page = self._page_of.get(flight_id)
+            if page is not None:
+                self._pages.pop(page, None)
+                self._inventory = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._flights.clear()
+            self._pages.clear()
+            self._page_of.clear()
+            self._inventory = None
+
+    def flight(self, flight_id: str) -> Optional[str]:
+        text = self._flights.get(flight_id)
+        if text is not None:
+            return text
+        generation = self._generation
+        flight = self.repository.get_flight(flight_id)
+        if flight is None:
+            return None
+        text = flight.model_dump_json()
+        with self._lock:
+            if generation == self._generation:
+                self._flights[flight_id] = text
+        return text
+
+    def _page_body(self, page: int) -> str:
+        """Comma-joined `"flight_id": {...}` members for one page of the inventory."""
+        body = self._pages.get(page)
+        if body is not None:
+            return body
+        generation = self._generation
+        flights = self.repository.page_flights(page * self.page_size, self.page_size)
+        cached = self._flights
+        members: List[Tuple[str, str]] = []
+        for flight in flights:
+            text = cached.get(flight.flight_id) or flight.model_dump_json()
+            members.append((flight.flight_id, text))
+        body = ",".join(f"{json.dumps(fid)}:{text}" for fid, text in members)
+        with self._lock:
+            if generation == self._generation:
+                self._pages[page] = body
+                for fid, text in members:
+                    self._flights[fid] = text
+                    self._page_of[fid] = page
+        return body
+
+    def page(self, cursor: str) -> str:
+        """One page of flights as JSON, with the cursor of the next page (null on the last one)."""
+        page = int(cursor or 0)
+        if page < 0:
+            raise ValueError("cursor must be a non-negative page number")
+        total = self.repository.count_flights()
+        next_cursor = str(page + 1) if (page + 1) * self.page_size < total else None
+        return (
+            f'{{"flights":{{{self._page_body(page)}}},'
+            f'"next_cursor":{json.dumps(next_cursor)},"total":{total}}}'
+        )
+
+    def inventory(self) -> str:
+        """All flights as one JSON object, stitched together from the cached pages."""
+        text = self._inventory
+        if text is not None:
+            return text
+        generation = self._generation
+        pages = -(-self.repository.count_flights() // self.page_size)
+        text = "{" + ",".join(body for body in map(self._page_body, range(pages)) if body) + "}"
+        with self._lock:
+            if generation == self._generation:
+                self._inventory = text
+        return text
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_payload_cache() -> FlightPayloadCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FlightPayloadCache(get_repository())
+    return _cache
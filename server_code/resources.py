@@ -1,16 +1,84 @@
 # resources.py
+import json
+import time
+
+import anyio
+from mcp.shared.exceptions import McpError
+from mcp.types import INVALID_PARAMS, ErrorData
+from pydantic import AnyUrl
+
 from mcp_instance import mcp
-from DB.flights_DB import mock_flights
+from DB.route_graph import get_route_graph
+from resource_cache import get_payload_cache
+from holds import hold_stats
+from idempotency import idempotency_stats
+from search_cache import get_search_cache
+from subscriptions import FLIGHT_DETAILS, INVENTORY, get_subscription_hub, resource_key, subscription_stats
+from metrics import registry
+from DB.flights_DB import await_inventory, inventory_status
+
+@mcp.resource("file://flights", mime_type="application/json")
+async def total_flights() -> str:
+    return (await await_inventory(get_payload_cache)).inventory()
 
-@mcp.resource("file://flights")
-async def total_flights() -> dict:
-    return {fid: flight.dict() for fid, flight in mock_flights.items()}
+@mcp.resource("file://flights/page/{cursor}", mime_type="application/json")
+async def flights_page(cursor: str) -> str:
+    cache = await await_inventory(get_payload_cache)
+    try:
+        return cache.page(cursor)
+    except ValueError:
+        return json.dumps({"error": "Invalid cursor. Use 0 for the first page, then next_cursor."})
 
-@mcp.resource("file://flight_details/{flight_id}")
-async def flight_details(flight_id: str) -> dict:
-    flight = mock_flights.get(flight_id)
-    return flight.dict() if flight else {"error": "Flight not found."}
+@mcp.resource("file://flight_details/{flight_id}", mime_type="application/json")
+async def flight_details(flight_id: str) -> str:
+    flight = (await await_inventory(get_payload_cache)).flight(flight_id)
+    return flight if flight is not None else json.dumps({"error": "Flight not found."})
 
 @mcp.resource("file://airports")
 async def available_airports() -> list[str]:
-    return ["NYC", "LAX", "SFO", "ORD", "DFW", "ATL", "DEN"]
\ No newline at end of file
+    # The first call builds the route graph from the inventory; keep the event loop free meanwhile.
+    codes = await anyio.to_thread.run_sync(lambda: get_route_graph().airports())
+    return sorted(code.upper() for code in codes)
+
+@mcp.resource("file://search_cache_stats")
+async def search_cache_stats() -> dict:
+    return (await await_inventory(get_search_cache)).stats()
+
+@mcp.resource("file://metrics")
+async def server_metrics() -> dict:
+    return registry.snapshot()
+
+@mcp.resource("file://status")
+async def server_status() -> dict:
+    return {
+        "inventory": inventory_status(),
+        "holds": hold_stats(),
+        "idempotency": idempotency_stats(),
+        "subscriptions": subscription_stats(),
+        "uptime_seconds": round(time.time() - registry.started_at, 1),
+    }
+
+
+def _check_subscribable(uri: str) -> None:
+    key = resource_key(uri)
+    if key == INVENTORY:
+        return
+    if key.startswith(FLIGHT_DETAILS) and get_payload_cache().flight(key[len(FLIGHT_DETAILS):]) is not None:
+        return
+    message = (
+        "Flight not found." if key.startswith(FLIGHT_DETAILS)
+        else f"Only {INVENTORY} and {FLIGHT_DETAILS}{{flight_id}} can be subscribed to."
+    )
+    raise McpError(ErrorData(code=INVALID_PARAMS, message=message))
+
+@mcp.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl) -> None:
+    # Both may wait for the inventory to finish loading.
+    await anyio.to_thread.run_sync(_check_subscribable, str(uri))
+    hub = await anyio.to_thread.run_sync(get_subscription_hub)
+    hub.subscribe(mcp.get_context().session, uri)
+
+@mcp.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl) -> None:
+    hub = await anyio.to_thread.run_sync(get_subscription_hub)
+    hub.unsubscribe(mcp.get_context().session, uri)
@@ -1,8 +1,81 @@
 # main.py
+import argparse
+import os
+import sys
+
 from mcp_instance import mcp
+from metrics import start_prometheus_exporter
+from DB.flights_DB import start_background_load
 import tools
 import resources
 import promts
 
+SERVER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(description="Flight Booking MCP Server")
+    parser.add_argument("--transport", choices=("stdio", "sse", "streamable-http"), default=env("MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=env("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(env("MCP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(env("MCP_WORKERS", "1")),
+                        help="worker processes behind the port (streamable-http only when > 1)")
+    parser.add_argument("--max-concurrency", type=int, default=int(env("MCP_MAX_CONCURRENCY", "0")) or None,
+                        help="per-worker cap on open connections and in-flight requests; excess gets HTTP 503")
+    parser.add_argument("--backlog", type=int, default=int(env("MCP_BACKLOG", "2048")),
+                        help="pending TCP connections queued by the listening socket")
+    parser.add_argument("--stateless", action="store_true", default=env("MCP_STATELESS_HTTP") == "1",
+                        help="serve each streamable-http request without a server-side session (implied by --workers > 1)")
+    args = parser.parse_args(argv)
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1:
+        if args.transport == "stdio":
+            parser.error("--workers needs an HTTP transport")
+        if args.transport == "sse":
+            parser.error("SSE sessions live in one process; use --transport streamable-http for several workers")
+        # Workers are separate processes, so they can only share inventory through one SQLite file.
+        backend = env("FLIGHT_DB_BACKEND", "sqlite").lower()
+        if backend != "sqlite":
+            parser.error(f"FLIGHT_DB_BACKEND={backend} is per process; several workers need FLIGHT_DB_BACKEND=sqlite")
+        os.environ["FLIGHT_DB_BACKEND"] = "sqlite"
+        args.stateless = True
+    return args
+
+
+def serve_http(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    # Worker processes import http_app afresh, so its settings travel through the environment.
+    os.environ["MCP_TRANSPORT"] = args.transport
+    os.environ["MCP_STATELESS_HTTP"] = "1" if args.stateless else "0"
+    if args.workers > 1:
+        # Seed the shared store once, before the workers start and race to do it.
+        from DB.flights_DB import create_repository
+        create_repository()
+    uvicorn.run(
+        "http_app:app",
+        app_dir=SERVER_DIR,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        limit_concurrency=args.max_concurrency,
+        backlog=args.backlog,
+        log_level=os.environ.get("MCP_LOG_LEVEL", "info").lower(),
+    )
+
+
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    args = parse_args()
+    if args.transport == "stdio":
+        if os.environ.get("METRICS_PORT"):
+            start_prometheus_exporter(int(os.environ["METRICS_PORT"]), os.environ.get("METRICS_HOST", "127.0.0.1"))
+        # initialize/list_tools are answered while the inventory loads; data calls wait for it.
+        start_background_load()
+        mcp.run(transport="stdio")
+    else:
+        if os.environ.get("METRICS_PORT"):
+            print("METRICS_PORT is ignored for HTTP transports; scrape /metrics on the server port instead", file=sys.stderr)
+        serve_http(args)
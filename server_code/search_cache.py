@@ -0,0 +1,133 @@
+# search_cache.py
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Set, Tuple
+
+from DB.flight_index import RouteKey, route_key
+from DB.flights_DB import get_repository
+from DB.repository import FlightRepository
+
+# (origin, destination, date, passengers, search options); the first three are the route/day.
+QueryKey = Tuple[str, str, date, int, tuple]
+
+
+class SearchCache:
+    """LRU cache of search_flights results with a TTL.
+
+    Entries are grouped by route/day, and any seat change on a flight drops every cached query
+    for that flight's route/day, so a cached answer never hides a booking or cancellation.
+    """
+
+    def __init__(self, repository: FlightRepository, max_entries: int = 4096, ttl_seconds: float = 30.0):
+        self.repository = repository
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[QueryKey, Tuple[float, Any]]" = OrderedDict()
+        self._by_route: Dict[RouteKey, Set[QueryKey]] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        repository.add_change_listener(self.invalidate_flight)
+        repository.add_reload_listener(self.clear)
+
+    def get_or_compute(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: date,
+        passenger: int,
+        compute: Callable[[], Any],
+        options: tuple = (),
+    ) -> Any:
+        key = (origin.lower(), destination.lower(), departure_date, passenger, options)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                self._drop(key)
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl_seconds, value)
+                self._by_route.setdefault(key[:3], set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+        return value
+
+    def _drop(self, key: QueryKey) -> None:
+        self._entries.pop(key, None)
+        keys = self._by_route.get(key[:3])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_route[key[:3]]
+
+    def invalidate_flight(self, flight_id: str) -> None:
+        if not self._entries:
+            with self._lock:
+                self._generation += 1
+            return
+        flight = self.repository.get_flight(flight_id)
+        with self._lock:
+            self._generation += 1
+            if flight is None:
+                return
+            keys = self._by_route.pop(route_key(flight.origin, flight.destination, flight.departure_time.date()), ())
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_route.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(
+                    get_repository(),
+                    max_entries=int(os.environ.get("SEARCH_CACHE_SIZE", "4096")),
+                    ttl_seconds=float(os.environ.get("SEARCH_CACHE_TTL", "30")),
+                )
+    return _cache
@@ -0,0 +1,56 @@
+# serialization.py
+"""JSON-ready tool payloads built with precompiled pydantic serializers.
+
+The TypeAdapters compile their serializers once. dump_python(mode="json") then turns a whole
+list of models into plain dicts with ISO datetimes in a single call, instead of running the
+deprecated .dict() per row and leaving datetimes for FastMCP to convert a second time.
+encode_tool_result() renders those payloads into MCP content directly, skipping FastMCP's
+re-validation of data that is already JSON-ready.
+"""
+from typing import Any, Dict, Iterable, List
+
+import pydantic_core
+from mcp.server.fastmcp.utilities.func_metadata import FuncMetadata
+from mcp.types import TextContent
+from pydantic import TypeAdapter
+
+from schemas.Flight1 import Flight, Bookings
+
+_flights = TypeAdapter(List[Flight])
+_bookings = TypeAdapter(List[Bookings])
+
+
+def dump_flights(flights: Iterable[Flight]) -> List[Dict[str, Any]]:
+    return _flights.dump_python(flights if isinstance(flights, list) else list(flights), mode="json")
+
+
+def dump_bookings(bookings: Iterable[Bookings]) -> List[Dict[str, Any]]:
+    return _bookings.dump_python(bookings if isinstance(bookings, list) else list(bookings), mode="json")
+
+
+def dump_booking(booking: Bookings) -> Dict[str, Any]:
+    return booking.model_dump(mode="json")
+
+
+def _text(value: Any) -> TextContent:
+    return TextContent(type="text", text=pydantic_core.to_json(value, fallback=str, indent=2).decode())
+
+
+def encode_tool_result(metadata: FuncMetadata, result: Any) -> Any:
+    """Convert a tool's return value to what FastMCP's convert_result() would produce.
+
+    The unstructured content is identical (one indented JSON text block per list item, or one
+    for a dict). Structured content is taken straight from the value rather than validated
+    through the generated output model and dumped again; the low-level server still checks it
+    against the tool's output schema. Anything but a dict or a list of dicts goes through FastMCP.
+    """
+    if isinstance(result, dict):
+        content = [_text(result)]
+    elif isinstance(result, list) and all(isinstance(item, dict) for item in result):
+        content = [_text(item) for item in result]
+    else:
+        return metadata.convert_result(result)
+    if metadata.output_schema is None:
+        return content
+    structured = {"result": result} if metadata.wrap_output else result
+    return content, pydantic_core.to_jsonable_python(structured, fallback=str)
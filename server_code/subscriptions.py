@@ -0,0 +1,166 @@
+# subscriptions.py
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+from weakref import WeakKeyDictionary
+
+from pydantic import AnyUrl
+
+from DB.flights_DB import get_repository
+from DB.repository import FlightRepository
+
+logger = logging.getLogger(__name__)
+
+RESOURCE_UPDATE_INTERVAL = float(os.environ.get("RESOURCE_UPDATE_INTERVAL_MS", "100")) / 1000
+
+FLIGHT_DETAILS = "file://flight_details/"
+INVENTORY = "file://flights"
+
+
+def resource_key(uri: str) -> str:
+    """Subscription key of a resource URI (URL parsing may add a trailing slash)."""
+    return str(uri).rstrip("/")
+
+
+class SubscriptionHub:
+    """Sends resources/updated to the sessions subscribed to a flight when its seats or fare change.
+
+    Subscriptions map a resource URI to the sessions watching it, held weakly so a closed
+    session drops out on its own. Change notifications arrive on worker threads and only add
+    the flight to a pending set; the first one schedules a single flush on the event loop
+    `interval` seconds later. A burst of bookings on one flight thus becomes one notification
+    per subscriber per interval. The flush groups the URIs each session should hear about and
+    sends them from one task per session, so a slow client never holds up the others and no
+    subscriber polls anything. file://flights subscribers hear about any flight change.
+    """
+
+    def __init__(self, repository: FlightRepository, interval: float = RESOURCE_UPDATE_INTERVAL):
+        self.repository = repository
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, "WeakKeyDictionary[Any, AnyUrl]"] = {}
+        self._pending: Set[str] = set()
+        self._reloaded = False
+        self._scheduled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.changes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.sent = 0
+        self.failed = 0
+        repository.add_change_listener(self._on_change)
+        repository.add_reload_listener(self._on_reload)
+
+    def subscribe(self, session: Any, uri: AnyUrl) -> None:
+        """Watch `uri` for `session`; must be called on the event loop that serves the session."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers.setdefault(resource_key(uri), WeakKeyDictionary())[session] = uri
+
+    def unsubscribe(self, session: Any, uri: AnyUrl) -> None:
+        with self._lock:
+            self._drop(session, resource_key(uri))
+
+    def _drop(self, session: Any, key: str) -> None:
+        sessions = self._subscribers.get(key)
+        if sessions is not None:
+            sessions.pop(session, None)
+            if not sessions:
+                del self._subscribers[key]
+
+    def _on_change(self, flight_id: str) -> None:
+        if not self._subscribers:
+            return
+        with self._lock:
+            self.changes += 1
+            if flight_id in self._pending:
+                self.coalesced += 1
+                return
+            self._pending.add(flight_id)
+            self._schedule()
+
+    def _on_reload(self) -> None:
+        if not self._subscribers:
+            return
+        with self._lock:
+            self._reloaded = True
+            self._schedule()
+
+    def _schedule(self) -> None:
+        # Called with the lock held, possibly from a worker thread.
+        loop = self._loop
+        if self._scheduled or loop is None or loop.is_closed():
+            return
+        self._scheduled = True
+        loop.call_soon_threadsafe(loop.call_later, self.interval, self._flush)
+
+    def _flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            reloaded, self._reloaded = self._reloaded, False
+            self._scheduled = False
+            if reloaded:
+                keys: List[str] = list(self._subscribers)
+            else:
+                keys = [FLIGHT_DETAILS + flight_id for flight_id in pending]
+                if pending:
+                    keys.append(INVENTORY)
+            outbox: Dict[Any, List[AnyUrl]] = {}
+            for key in keys:
+                sessions = self._subscribers.get(key)
+                if sessions:
+                    for session, uri in sessions.items():
+                        outbox.setdefault(session, []).append(uri)
+            self.flushes += 1
+        for session, uris in outbox.items():
+            task = asyncio.ensure_future(self._send(session, uris))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, session: Any, uris: List[AnyUrl]) -> None:
+        try:
+            for uri in uris:
+                await session.send_resource_updated(uri)
+        except Exception:
+            # The session is gone (closed stream, disconnected client); forget all it watched.
+            logger.debug("Dropping subscriber after a failed resources/updated send", exc_info=True)
+            with self._lock:
+                self.failed += 1
+                for key in list(self._subscribers):
+                    self._drop(session, key)
+            return
+        with self._lock:
+            self.sent += len(uris)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resources": len(self._subscribers),
+                "subscriptions": sum(len(sessions) for sessions in self._subscribers.values()),
+                "changes": self.changes,
+                "coalesced": self.coalesced,
+                "flushes": self.flushes,
+                "sent": self.sent,
+                "failed": self.failed,
+            }
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_subscription_hub() -> SubscriptionHub:
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = SubscriptionHub(get_repository())
+    return _hub
+
+
+def subscription_stats() -> Optional[Dict[str, Any]]:
+    """Subscription counters, or None before the first subscription."""
+    return _hub.stats() if _hub is not None else None
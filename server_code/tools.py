@@ -1,40 +1,211 @@
 # tools.py
 from mcp_instance import mcp
-from DB.flights_DB import mock_flights, mock_Booking
-from schemas.Flight1 import Bookings
-from typing import List, Dict, Any
-from datetime import datetime
+from DB.airport_index import get_airport_index
+from DB.fare_calendar import get_fare_calendar
+from DB.flight_index import NO_FILTERS, SORT_KEYS, SearchFilters
+from DB.flights_DB import await_inventory, get_repository
+from DB.rebooking import PRIORITIES, rebook_flight
+from DB.route_graph import get_route_graph
+from holds import MAX_HOLD_TTL, get_hold_manager
+from idempotency import MAX_KEY_LENGTH, get_idempotency_cache
+from search_cache import get_search_cache
+from serialization import dump_booking, dump_bookings, dump_flights
+from schemas.Flight1 import Flight, Bookings, Search_flights, BookingFlight
+from typing import List, Dict, Any, Optional
+from datetime import datetime, time, timedelta
 import uuid
 
-@mcp.tool(description="Search for flights by origin, destination, and date.")
-async def search_flights(origin: str, destination: str, departure_date: str, passenger: int = 1) -> List[Dict[str, Any]]:
+import anyio
+
+
+def _time_of_day(value: str) -> Optional[time]:
+    return time.fromisoformat(value) if value else None
+
+
+@mcp.tool(description=(
+    "Search for flights by origin, destination, and date. Optionally sort_by 'price' (default), 'departure' "
+    "or 'duration' and return only the best `limit` flights (0 = all); filter by min_price/max_price and "
+    "by departure time of day with depart_after/depart_before (HH:MM); and pass `fields` to return only "
+    "those flight fields, e.g. ['flight_id', 'price', 'departure_time']. origin and destination are airport "
+    "codes; use resolve_airport first to turn a city or airport name into a code."
+))
+async def search_flights(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    passenger: int = 1,
+    sort_by: str = "price",
+    limit: int = 0,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    depart_after: str = "",
+    depart_before: str = "",
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
     try:
         parsed_date = datetime.fromisoformat(departure_date).date()
     except ValueError:
         return [{"error": "Invalid date format. Use YYYY-MM-DD."}]
+    if sort_by not in SORT_KEYS:
+        return [{"error": "sort_by must be 'price', 'departure' or 'duration'."}]
+    if limit < 0:
+        return [{"error": "limit must be 0 (all flights) or more."}]
+    try:
+        filters = SearchFilters(min_price, max_price, _time_of_day(depart_after), _time_of_day(depart_before))
+    except ValueError:
+        return [{"error": "depart_after and depart_before must be times of day like 09:30."}]
+    unknown = sorted(set(fields or ()) - set(Flight.model_fields))
+    if unknown:
+        return [{"error": f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(Flight.model_fields)}."}]
 
-    results = []
-    for flight in mock_flights.values():
-        if (
-            flight.origin.lower() == origin.lower()
-            and flight.destination.lower() == destination.lower()
-            and flight.departure_time.date() == parsed_date
-            and flight.available_seats >= passenger
-        ):
-            results.append(flight.dict())
+    cache = await await_inventory(get_search_cache)
+    repository = await await_inventory()
+    flights = cache.get_or_compute(
+        origin, destination, parsed_date, passenger,
+        lambda: dump_flights(repository.top_flights(
+            origin, destination, parsed_date, passenger, sort_by, limit, filters,
+        )),
+        options=(sort_by, limit, filters),
+    )
+    if fields:
+        return [{name: flight[name] for name in fields} for flight in flights]
+    return flights
+
+
+@mcp.tool(description=(
+    "Resolve a city, airport name or airport code, possibly misspelled (e.g. 'san fransisco', 'Heathrow', "
+    "'nyc'), to airport codes for search_flights. Best matches first; served=true means flights use that code."
+))
+async def resolve_airport(query: str, limit: int = 5) -> Dict[str, Any]:
+    if not query.strip():
+        return {"error": "query must not be empty."}
+    if limit < 1:
+        return {"error": "limit must be at least 1."}
+    return await anyio.to_thread.run_sync(_resolve_airport, query, limit)
+
+
+def _resolve_airport(query: str, limit: int) -> Dict[str, Any]:
+    index = get_airport_index()
+    served = {code.upper() for code in get_route_graph().airports()}
+    matches = []
+    code = query.strip().upper()
+    if code in served and index.get(code) is None:
+        # An inventory airport missing from the reference data still resolves by its code.
+        matches.append({"code": code, "kind": "airport", "match": "code", "score": 1.0, "served": True})
+    for airport, match, score in index.resolve(query, limit - len(matches), prefer=served):
+        entry = airport.as_dict()
+        if airport.kind == "metro":
+            entry["airports"] = index.members(airport.code)
+        entry.update(match=match, score=score, served=airport.code in served)
+        matches.append(entry)
+    return {"query": query, "matches": matches}
+
+
+@mcp.tool(description=(
+    "Search direct and connecting itineraries (up to 2 stops) from origin to destination on a date. "
+    "sort_by is 'price' or 'duration'; at most 50 results are returned."
+))
+async def search_itineraries(
+    origin: str,
+    destination: str,
+    departure_date: str,
+    passenger: int = 1,
+    max_stops: int = 2,
+    min_connection_minutes: int = 45,
+    max_duration_hours: float = 24,
+    sort_by: str = "price",
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    try:
+        parsed_date = datetime.fromisoformat(departure_date).date()
+    except ValueError:
+        return [{"error": "Invalid date format. Use YYYY-MM-DD."}]
+    if sort_by not in ("price", "duration"):
+        return [{"error": "sort_by must be 'price' or 'duration'."}]
+    if not 0 <= max_stops <= 2:
+        return [{"error": "max_stops must be between 0 and 2."}]
+    limit = max(1, min(limit, 50))
 
+    # The first call builds the route graph over the whole inventory; keep the event loop free meanwhile.
+    return await anyio.to_thread.run_sync(lambda: _search_itineraries(
+        origin, destination, parsed_date, passenger, max_stops,
+        timedelta(minutes=min_connection_minutes), timedelta(hours=max_duration_hours), sort_by, limit,
+    ))
+
+
+def _search_itineraries(
+    origin: str,
+    destination: str,
+    departure_date,
+    passenger: int,
+    max_stops: int,
+    min_connection: timedelta,
+    max_duration: timedelta,
+    sort_by: str,
+    limit: int,
+) -> List[Dict[str, Any]]:
+    itineraries = get_route_graph().search(
+        origin, destination, departure_date,
+        passengers=passenger,
+        max_stops=max_stops,
+        min_connection=min_connection,
+        max_duration=max_duration,
+        sort_by=sort_by,
+        limit=limit,
+    )
+    repository = get_repository()
+    results = []
+    for itinerary in itineraries:
+        results.append({
+            "stops": len(itinerary.flight_ids) - 1,
+            "total_price": round(itinerary.price, 2),
+            "total_duration_minutes": int(itinerary.duration.total_seconds() // 60),
+            "departure_time": itinerary.departure_time.isoformat(),
+            "arrival_time": itinerary.arrival_time.isoformat(),
+            "legs": dump_flights(repository.get_flight(fid) for fid in itinerary.flight_ids),
+        })
     return results
 
 
-@mcp.tool(description="Book a flight for a passenger.")
-async def book_flight(flight_id: str, passenger_name: str, num_seats: int) -> Dict[str, Any]:
-    flight = mock_flights.get(flight_id)
+@mcp.tool(description=(
+    "Lowest fare and seat availability per day for a route over a date range (at most 92 days), "
+    "e.g. to find the cheapest day to fly. Dates are YYYY-MM-DD and both ends are included."
+))
+async def fare_calendar(origin: str, destination: str, start_date: str, end_date: str, passenger: int = 1) -> Dict[str, Any]:
+    try:
+        start = datetime.fromisoformat(start_date).date()
+        end = datetime.fromisoformat(end_date).date()
+    except ValueError:
+        return {"error": "Invalid date format. Use YYYY-MM-DD."}
+    if end < start:
+        return {"error": "end_date must not be before start_date."}
+    if (end - start).days >= 92:
+        return {"error": "The date range can span at most 92 days."}
+    if passenger < 1:
+        return {"error": "passenger must be at least 1."}
+
+    # The first call builds the calendar over the whole inventory; keep the event loop free meanwhile.
+    days = await anyio.to_thread.run_sync(
+        lambda: get_fare_calendar().calendar(origin, destination, start, end, passenger)
+    )
+    priced = [day for day in days if day["min_price"] is not None]
+    cheapest = min(priced, key=lambda day: (day["min_price"], day["date"])) if priced else None
+    return {
+        "origin": origin,
+        "destination": destination,
+        "passenger": passenger,
+        "days": days,
+        "cheapest_day": {"date": cheapest["date"], "price": cheapest["min_price"]} if cheapest else None,
+    }
+
+
+def _book(repository, flight_id: str, passenger_name: str, num_seats: int) -> Dict[str, Any]:
+    if num_seats < 1:
+        return {"error": "Number of seats must be at least 1."}
+    flight = repository.get_flight(flight_id)
     if not flight:
         return {"error": "Flight not found."}
-    if flight.available_seats < num_seats:
-        return {"error": "Not enough available seats."}
 
-    flight.available_seats -= num_seats
     booking_id = str(uuid.uuid4())
     new_booking = Bookings(
         booking_id=booking_id,
@@ -44,20 +215,231 @@ async def book_flight(flight_id: str, passenger_name: str, num_seats: int) -> Di
         booking_time=datetime.now(),
         status="confirmed"
     )
-    mock_Booking[booking_id] = new_booking
-    return new_booking.dict()
+    if not repository.create_booking(new_booking):
+        return {"error": "Not enough available seats."}
+    return dump_booking(new_booking)
+
+
+def _idempotent(operation: str, key: Optional[str], arguments: tuple, call) -> Dict[str, Any]:
+    if key is None:
+        return call()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        return {"error": f"idempotency_key must be 1-{MAX_KEY_LENGTH} characters."}
+    return get_idempotency_cache().run(operation, key, arguments, call)
 
 
-@mcp.tool(description="Cancel an existing booking.")
-async def cancel_booking(booking_id: str) -> Dict[str, Any]:
-    booking = mock_Booking.get(booking_id)
+@mcp.tool(description=(
+    "Book a flight for a passenger. Pass the same idempotency_key when retrying a call that timed out: "
+    "a repeat returns the original booking instead of booking again."
+))
+async def book_flight(
+    flight_id: str, passenger_name: str, num_seats: int, idempotency_key: Optional[str] = None
+) -> Dict[str, Any]:
+    repository = await await_inventory()
+    # Booking writes may wait on disk (journal group commit, SQLite locks); keep the event loop free meanwhile.
+    return await anyio.to_thread.run_sync(
+        _idempotent, "book_flight", idempotency_key, (flight_id, passenger_name, num_seats),
+        lambda: _book(repository, flight_id, passenger_name, num_seats),
+    )
+
+
+@mcp.tool(description=(
+    "Cancel an existing booking. A retry with the same idempotency_key returns the original cancellation."
+))
+async def cancel_booking(booking_id: str, idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    repository = await await_inventory()
+    return await anyio.to_thread.run_sync(
+        _idempotent, "cancel_booking", idempotency_key, (booking_id,), lambda: _cancel(repository, booking_id),
+    )
+
+
+def _cancel(repository, booking_id: str) -> Dict[str, Any]:
+    booking = repository.get_booking(booking_id)
     if not booking:
         return {"error": "Booking not found."}
 
-    flight = mock_flights.get(booking.flight_id)
+    flight = repository.get_flight(booking.flight_id)
     if not flight:
         return {"error": "Flight not found for this booking."}
 
-    flight.available_seats += booking.num_seats
-    cancelled = mock_Booking.pop(booking_id)
-    return {"status": "cancelled", "booking": cancelled.dict()}
\ No newline at end of file
+    cancelled = repository.cancel_booking(booking_id)
+    if cancelled is None:
+        return {"error": "Booking not found."}
+    return {"status": "cancelled", "booking": dump_booking(cancelled)}
+
+
+@mcp.tool(description=(
+    "Hold seats on a flight for ttl_seconds (default 600) while the passenger decides, without booking them. "
+    "Held seats are off sale at once; confirm_hold books them, release_hold gives them back, and a hold "
+    "that is neither expires on its own."
+))
+async def hold_seats(flight_id: str, num_seats: int, ttl_seconds: int = 600) -> Dict[str, Any]:
+    if num_seats < 1:
+        return {"error": "Number of seats must be at least 1."}
+    if not 1 <= ttl_seconds <= MAX_HOLD_TTL:
+        return {"error": f"ttl_seconds must be between 1 and {MAX_HOLD_TTL}."}
+    if (await await_inventory()).get_flight(flight_id) is None:
+        return {"error": "Flight not found."}
+    manager = await await_inventory(get_hold_manager)
+    manager.ensure_reaper()
+    hold = await anyio.to_thread.run_sync(manager.hold, flight_id, num_seats, ttl_seconds)
+    if hold is None:
+        return {"error": "Not enough available seats."}
+    return hold.as_dict()
+
+
+@mcp.tool(description="Turn a seat hold into a confirmed booking for a passenger.")
+async def confirm_hold(hold_id: str, passenger_name: str) -> Dict[str, Any]:
+    manager = await await_inventory(get_hold_manager)
+    manager.ensure_reaper()
+    booking = await anyio.to_thread.run_sync(manager.confirm, hold_id, passenger_name)
+    if booking is None:
+        return {"error": "Hold not found. It may have expired, been released or already been confirmed."}
+    return dump_booking(booking)
+
+
+@mcp.tool(description="Release a seat hold and put its seats back on sale.")
+async def release_hold(hold_id: str) -> Dict[str, Any]:
+    manager = await await_inventory(get_hold_manager)
+    manager.ensure_reaper()
+    hold = await anyio.to_thread.run_sync(manager.release, hold_id)
+    if hold is None:
+        return {"error": "Hold not found. It may have expired, been released or already been confirmed."}
+    return {"status": "released", "hold": hold.as_dict()}
+
+
+def _booking_page(find, key: str, cursor: str, limit: int) -> Dict[str, Any]:
+    try:
+        offset = int(cursor or 0)
+    except ValueError:
+        offset = -1
+    if offset < 0:
+        return {"error": "cursor must be a non-negative number from next_cursor."}
+    limit = max(1, min(limit, 200))
+    bookings, total = find(key, offset, limit)
+    next_offset = offset + len(bookings)
+    return {
+        "bookings": dump_bookings(bookings),
+        "next_cursor": str(next_offset) if bookings and next_offset < total else None,
+        "total": total,
+    }
+
+
+@mcp.tool(description=(
+    "List a passenger's bookings, oldest first. The name is matched ignoring case and extra spaces. "
+    "Pass next_cursor from the previous page as cursor to continue; limit is at most 200."
+))
+async def list_bookings(passenger_name: str, cursor: str = "", limit: int = 50) -> Dict[str, Any]:
+    if not passenger_name.strip():
+        return {"error": "passenger_name must not be empty."}
+    repository = await await_inventory()
+    return _booking_page(repository.bookings_for_passenger, passenger_name, cursor, limit)
+
+
+@mcp.tool(description=(
+    "List the bookings on a flight, oldest first, e.g. to find the passengers affected by a disruption. "
+    "Pass next_cursor from the previous page as cursor to continue; limit is at most 200."
+))
+async def bookings_for_flight(flight_id: str, cursor: str = "", limit: int = 50) -> Dict[str, Any]:
+    repository = await await_inventory()
+    if repository.get_flight(flight_id) is None:
+        return {"error": "Flight not found."}
+    return _booking_page(repository.bookings_for_flight, flight_id, cursor, limit)
+
+
+@mcp.tool(description=(
+    "Rebook every passenger on a disrupted flight in one call onto the alternative flights or connections "
+    "arriving closest to the original. priority is 'booking_time' (oldest booking first) or 'party_size' "
+    "(largest group first). Each passenger is moved completely or not at all; unplaced passengers keep "
+    "their original booking and are listed with the reason."
+))
+async def rebook_disrupted_flight(
+    flight_id: str,
+    priority: str = "booking_time",
+    max_stops: int = 1,
+    min_connection_minutes: int = 45,
+    max_delay_hours: float = 24,
+) -> Dict[str, Any]:
+    if priority not in PRIORITIES:
+        return {"error": "priority must be 'booking_time' or 'party_size'."}
+    if not 0 <= max_stops <= 2:
+        return {"error": "max_stops must be between 0 and 2."}
+    # The first call builds the route graph, and both may wait for the inventory load.
+    return await anyio.to_thread.run_sync(lambda: rebook_flight(
+        get_repository(), get_route_graph(), flight_id, priority, max_stops,
+        timedelta(minutes=min_connection_minutes), timedelta(hours=max_delay_hours),
+    ))
+
+
+@mcp.tool(description="Run several flight searches in one call. Returns one result list per query, in order.")
+async def search_flights_batch(queries: List[Search_flights]) -> List[Dict[str, Any]]:
+    # One route/day lookup per distinct (origin, destination, date), for the smallest party in
+    # the group; each query then keeps the flights with enough seats for its own party. The
+    # lookups share search_flights' cache entries.
+    groups: Dict[tuple, List[Search_flights]] = {}
+    days = {}
+    for query in queries:
+        try:
+            days[id(query)] = day = datetime.fromisoformat(query.departure_date).date()
+        except ValueError:
+            continue
+        groups.setdefault((query.origin.lower(), query.destination.lower(), day), []).append(query)
+
+    cache = await await_inventory(get_search_cache)
+    repository = await await_inventory()
+    found: Dict[tuple, List[Dict[str, Any]]] = {}
+    for (origin, destination, day), group in groups.items():
+        fewest = min(query.passenger for query in group)
+        found[origin, destination, day] = cache.get_or_compute(
+            origin, destination, day, fewest,
+            lambda: dump_flights(repository.top_flights(origin, destination, day, fewest)),
+            options=("price", 0, NO_FILTERS),
+        )
+
+    results = []
+    for query in queries:
+        day = days.get(id(query))
+        if day is None:
+            flights = [{"error": "Invalid date format. Use YYYY-MM-DD."}]
+        else:
+            flights = found[query.origin.lower(), query.destination.lower(), day]
+            flights = [flight for flight in flights if flight["available_seats"] >= query.passenger]
+        results.append({"query": query.model_dump(), "flights": flights})
+    return results
+
+
+@mcp.tool(description=(
+    "Book several flights or passengers in one call. With all_or_nothing=true, "
+    "either every booking is confirmed or none are."
+))
+async def book_flights_batch(bookings: List[BookingFlight], all_or_nothing: bool = False) -> Dict[str, Any]:
+    repository = await await_inventory()
+    return await anyio.to_thread.run_sync(_book_batch, repository, bookings, all_or_nothing)
+
+
+def _book_batch(repository, bookings: List[BookingFlight], all_or_nothing: bool) -> Dict[str, Any]:
+    results = []
+    # One durable commit for the whole batch, including any rollback.
+    with repository.batch():
+        for request in bookings:
+            result = _book(repository, request.flight_id, request.passenger_name, request.num_seats)
+            results.append(result)
+            if all_or_nothing and "error" in result:
+                break
+
+        failed = sum(1 for result in results if "error" in result)
+        if all_or_nothing and failed:
+            for i, result in enumerate(results):
+                if "error" not in result:
+                    repository.cancel_booking(result["booking_id"])
+                    results[i] = {"error": "Rolled back because another booking in the batch failed."}
+    if all_or_nothing and failed:
+        results.extend(
+            {"error": "Not attempted because another booking in the batch failed."}
+            for _ in range(len(bookings) - len(results))
+        )
+        return {"status": "failed", "confirmed": 0, "failed": len(bookings), "results": results}
+
+    confirmed = len(results) - failed
+    status = "confirmed" if not failed else ("partial" if confirmed else "failed")
+    return {"status": status, "confirmed": confirmed, "failed": failed, "results": results}
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# The server modules import each other as top-level modules (`from DB.flights_DB import ...`).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server_code"))
+
+from schemas.Flight1 import Flight, Bookings  # noqa: E402
+
+DEPARTURE = datetime.combine(datetime.now().date() + timedelta(days=3), datetime.min.time()).replace(hour=9)
+
+
+def make_flight(flight_id: str, seats: int = 100, price: float = 200.0, origin: str = "NYC", destination: str = "LAX") -> Flight:
+    return Flight(
+        flight_id=flight_id,
+        airline="AirSwift",
+        flight_number=f"AS{flight_id}",
+        origin=origin,
+        destination=destination,
+        departure_time=DEPARTURE,
+        arrival_time=DEPARTURE + timedelta(hours=5),
+        price=price,
+        available_seats=seats,
+    )
+
+
+def make_booking(flight_id: str, num_seats: int, booking_id: str = None) -> Bookings:
+    return Bookings(
+        booking_id=booking_id or f"B-{flight_id}-{num_seats}-{datetime.now().timestamp()}",
+        flight_id=flight_id,
+        passenger_name="Ada Lovelace",
+        num_seats=num_seats,
+        booking_time=datetime.now(),
+        status="confirmed",
+    )
+
+
+@pytest.fixture
+def flights():
+    return [make_flight("F1", seats=100), make_flight("F2", seats=80, price=150.0), make_flight("F3", seats=50)]
@@ -0,0 +1,26 @@
+import asyncio
+from datetime import date, timedelta
+
+from schemas.Flight1 import Search_flights
+from tools import search_flights, search_flights_batch
+
+
+def test_batch_matches_one_search_per_query():
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    queries = [
+        Search_flights(origin="NYC", destination="LAX", departure_date=tomorrow, passenger=1),
+        Search_flights(origin="nyc", destination="lax", departure_date=tomorrow, passenger=101),
+        Search_flights(origin="NYC", destination="LAX", departure_date=tomorrow, passenger=90),
+        Search_flights(origin="SFO", destination="ORD", departure_date=tomorrow, passenger=2),
+        Search_flights(origin="NYC", destination="LAX", departure_date="next week", passenger=1),
+    ]
+
+    async def run():
+        batch = await search_flights_batch(queries)
+        single = [await search_flights(q.origin, q.destination, q.departure_date, q.passenger) for q in queries]
+        return batch, single
+
+    batch, single = asyncio.run(run())
+    assert [result["flights"] for result in batch] == single
+    assert [len(flights) for flights in single] == [1, 0, 1, 1, 1]
+    assert "error" in single[4][0]
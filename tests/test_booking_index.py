@@ -0,0 +1,22 @@
+from DB.booking_index import BookingIndex
+from tests.conftest import make_booking
+
+
+def test_pages_follow_booking_order():
+    bookings = {}
+    index = BookingIndex(bookings)
+    for i in range(7):
+        booking = make_booking("F1" if i % 2 else "F2", 1, f"B{i}")
+        booking.passenger_name = "  ada   LOVELACE " if i < 5 else "Grace Hopper"
+        bookings[booking.booking_id] = booking
+        index.add(booking)
+
+    page, total = index.for_passenger("Ada Lovelace", offset=1, limit=2)
+    assert ([booking.booking_id for booking in page], total) == (["B1", "B2"], 5)
+    page, total = index.for_flight("F1", offset=2, limit=10)
+    assert ([booking.booking_id for booking in page], total) == (["B5"], 3)
+
+    index.remove(bookings.pop("B1"))
+    page, total = index.for_passenger("ada lovelace", offset=0, limit=3)
+    assert ([booking.booking_id for booking in page], total) == (["B0", "B2", "B3"], 4)
+    assert index.for_flight("F9") == ([], 0)
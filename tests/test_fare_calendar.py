@@ -0,0 +1,21 @@
+import asyncio
+from datetime import date, timedelta
+
+from tools import fare_calendar
+
+
+def test_calendar_lists_each_day_and_the_cheapest():
+    today = date.today()
+    calendar = asyncio.run(fare_calendar("NYC", "LAX", today.isoformat(), (today + timedelta(days=3)).isoformat()))
+    prices = {day["date"]: day["min_price"] for day in calendar["days"]}
+    assert len(prices) == 4
+    assert prices[(today + timedelta(days=1)).isoformat()] == 250.0
+    assert prices[(today + timedelta(days=2)).isoformat()] == 270.0
+    assert prices[today.isoformat()] is None
+    assert calendar["cheapest_day"] == {"date": (today + timedelta(days=1)).isoformat(), "price": 250.0}
+
+
+def test_party_larger_than_any_flight_has_no_fares():
+    today = date.today().isoformat()
+    calendar = asyncio.run(fare_calendar("NYC", "LAX", today, today, passenger=500))
+    assert calendar["cheapest_day"] is None
@@ -0,0 +1,18 @@
+from DB.flight_index import FlightIndex
+from tests.conftest import DEPARTURE, make_flight
+
+
+def test_clear_leaves_searches_in_flight_undisturbed(flights):
+    index = FlightIndex()
+    for flight in flights:
+        index.add(flight)
+    bucket = index._buckets[next(iter(index._buckets))]
+
+    index.clear()
+    assert len(index) == 0
+    assert index.search("NYC", "LAX", DEPARTURE.date()) == []
+    # A search that picked the bucket up before the clear still iterates all of it.
+    assert [fid for _, _, fid in bucket] == ["F2", "F1", "F3"]
+
+    index.add(make_flight("F4"))
+    assert index.search("NYC", "LAX", DEPARTURE.date()) == ["F4"]
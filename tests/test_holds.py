@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+import pytest
+
+from DB.repository import InMemoryRepository
+from holds import HoldManager, create_hold_manager
+
+
+@pytest.fixture
+def repository(flights):
+    return InMemoryRepository({flight.flight_id: flight for flight in flights}, {})
+
+
+def seats(repository, flight_id="F1"):
+    return repository.get_flight(flight_id).available_seats
+
+
+def test_hold_takes_seats_until_it_expires(repository):
+    manager = HoldManager(repository)
+    hold = manager.hold("F1", 4, ttl_seconds=60)
+    assert seats(repository) == 96
+    assert manager.expire(now=hold.deadline - 1) == 0
+
+    assert manager.expire(now=hold.deadline) == 1
+    assert seats(repository) == 100
+    assert manager.confirm(hold.hold_id, "Ada Lovelace") is None
+    assert manager.stats()["expired"] == 1
+
+
+def test_confirmed_hold_keeps_its_seats(repository):
+    manager = HoldManager(repository)
+    hold = manager.hold("F1", 4, ttl_seconds=60)
+    booking = manager.confirm(hold.hold_id, "Ada Lovelace")
+    assert repository.get_booking(booking.booking_id).num_seats == 4
+    assert manager.expire(now=hold.deadline + 1) == 0
+    assert seats(repository) == 96
+
+
+def test_hold_past_its_deadline_cannot_be_confirmed(repository):
+    manager = HoldManager(repository)
+    hold = manager.hold("F1", 4, ttl_seconds=0)
+    assert manager.confirm(hold.hold_id, "Ada Lovelace") is None
+    assert seats(repository) == 100
+    assert list(repository.list_bookings()) == []
+
+
+def test_hold_fails_without_enough_seats(repository):
+    manager = HoldManager(repository)
+    assert manager.hold("F3", 51, ttl_seconds=60) is None
+    assert seats(repository, "F3") == 50
+
+
+def test_reaper_releases_expired_holds(repository):
+    manager = HoldManager(repository)
+
+    async def run():
+        reaper = asyncio.ensure_future(manager.run_reaper(max_sleep=0.01))
+        manager.hold("F1", 4, ttl_seconds=0.05)
+        deadline = time.monotonic() + 2
+        while seats(repository) != 100 and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        reaper.cancel()
+
+    asyncio.run(run())
+    assert seats(repository) == 100
+    assert manager.stats()["active"] == 0
+
+
+@pytest.fixture
+def store(tmp_path, flights):
+    from DB.sqlite_repository import SQLiteRepository
+
+    repository = SQLiteRepository(str(tmp_path / "flights.db"))
+    repository.seed(flights)
+    return repository
+
+
+def test_sqlite_holds_are_shared_between_workers(store):
+    from DB.sqlite_repository import SQLiteRepository
+
+    placed_by = create_hold_manager(store)
+    other = create_hold_manager(SQLiteRepository(store.path))
+    hold = placed_by.hold("F1", 4, ttl_seconds=60)
+    assert seats(store) == 96
+    assert other.stats()["active"] == 1
+
+    booking = other.confirm(hold.hold_id, "Ada Lovelace")
+    assert store.get_booking(booking.booking_id).num_seats == 4
+    assert placed_by.confirm(hold.hold_id, "Ada Lovelace") is None
+    assert placed_by.release(hold.hold_id) is None
+    assert seats(store) == 96
+
+
+def test_sqlite_holds_are_reaped_by_any_worker(store):
+    from DB.sqlite_repository import SQLiteRepository
+
+    hold = create_hold_manager(store).hold("F1", 4, ttl_seconds=60)
+    other = create_hold_manager(SQLiteRepository(store.path))
+    assert other.release_all() == 0
+    assert other.expire(now=hold.deadline - 1) == 0
+    assert other.expire(now=hold.deadline + 1) == 1
+    assert seats(store) == 100
+    assert other.stats()["active"] == 0
+
+
+def test_sqlite_hold_past_its_deadline_cannot_be_confirmed(store):
+    manager = create_hold_manager(store)
+    hold = manager.hold("F1", 4, ttl_seconds=0)
+    assert manager.confirm(hold.hold_id, "Ada Lovelace") is None
+    assert manager.release(hold.hold_id) is None
+    assert manager.hold("F3", 51, ttl_seconds=60) is None
+    # A new manager sweeps holds that expired while nobody was reaping.
+    create_hold_manager(store)
+    assert seats(store) == 100
+    assert list(store.list_bookings()) == []
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from DB.sqlite_repository import SQLiteRepository
+from idempotency import IdempotencyCache, SharedIdempotencyCache
+
+
+def booked(value):
+    calls = []
+
+    def call():
+        calls.append(value)
+        return {"booking_id": value}
+
+    return call, calls
+
+
+def test_retry_returns_the_stored_result():
+    cache = IdempotencyCache()
+    call, calls = booked("B1")
+    assert cache.run("book_flight", "k", ("F1", 1), call) == {"booking_id": "B1"}
+    assert cache.run("book_flight", "k", ("F1", 1), call) == {"booking_id": "B1"}
+    assert "error" in cache.run("book_flight", "k", ("F1", 2), call)
+    assert calls == ["B1"]
+
+
+def test_size_bound_never_drops_a_running_call():
+    cache = IdempotencyCache(max_entries=1)
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        finish.wait()
+        return {"booking_id": "B1"}
+
+    first = threading.Thread(target=cache.run, args=("book_flight", "slow", (), slow))
+    first.start()
+    started.wait()
+    # Going over the bound evicts finished keys, not the one still running.
+    cache.run("book_flight", "a", (), booked("B2")[0])
+    cache.run("book_flight", "b", (), booked("B3")[0])
+    assert cache.stats()["evicted"] == 1
+
+    results = []
+    retry = threading.Thread(target=lambda: results.append(cache.run("book_flight", "slow", (), slow)))
+    retry.start()
+    finish.set()
+    first.join()
+    retry.join()
+    assert results == [{"booking_id": "B1"}]
+    assert calls == ["slow"]
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "flights.db")
+    SQLiteRepository(path)
+    return path
+
+
+def test_sqlite_keys_are_shared_between_workers(db_path):
+    first = SharedIdempotencyCache(SQLiteRepository(db_path))
+    other = SharedIdempotencyCache(SQLiteRepository(db_path))
+    call, calls = booked("B1")
+    assert first.run("book_flight", "k", ("F1", 1), call) == {"booking_id": "B1"}
+    assert other.run("book_flight", "k", ("F1", 1), call) == {"booking_id": "B1"}
+    assert "error" in other.run("book_flight", "k", ("F1", 2), call)
+    assert calls == ["B1"]
+    assert other.stats()["keys"] == 1
+
+
+def test_sqlite_retry_waits_for_a_call_running_on_another_worker(db_path):
+    first = SharedIdempotencyCache(SQLiteRepository(db_path))
+    other = SharedIdempotencyCache(SQLiteRepository(db_path))
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append("slow")
+        started.set()
+        finish.wait()
+        return {"booking_id": "B1"}
+
+    running = threading.Thread(target=first.run, args=("book_flight", "k", (), slow))
+    running.start()
+    started.wait()
+    results = []
+    retry = threading.Thread(target=lambda: results.append(other.run("book_flight", "k", (), slow)))
+    retry.start()
+    finish.set()
+    running.join()
+    retry.join()
+    assert results == [{"booking_id": "B1"}]
+    assert calls == ["slow"]
+
+
+def test_sqlite_failed_or_abandoned_calls_can_be_retried(db_path):
+    repository = SQLiteRepository(db_path)
+    cache = SharedIdempotencyCache(repository)
+    assert cache.run("book_flight", "k", (), lambda: {"error": "Not enough available seats."})["error"]
+    call, calls = booked("B1")
+    assert cache.run("book_flight", "k", (), call) == {"booking_id": "B1"}
+
+    # A worker that died mid-call leaves a claim; once its lease is over, a retry runs.
+    repository.claim_idempotency_key("book_flight", "dead", "[]", "token", lease_until=0.0, now=0.0)
+    assert cache.run("book_flight", "dead", (), call) == {"booking_id": "B1"}
+    assert calls == ["B1", "B1"]
+
+
+def test_sqlite_keys_are_trimmed_to_the_size_bound(db_path):
+    cache = SharedIdempotencyCache(SQLiteRepository(db_path), max_entries=2)
+    for key in "abc":
+        cache.run("book_flight", key, (), booked(key)[0])
+    cache._next_sweep = 0.0
+    cache._sweep(0.0)
+    assert cache.stats()["keys"] == 2
+    assert cache.stats()["evicted"] == 1
@@ -0,0 +1,17 @@
+import asyncio
+from datetime import date, timedelta
+
+from tools import search_itineraries
+
+
+def test_direct_itinerary_comes_back_with_its_leg():
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    itineraries = asyncio.run(search_itineraries("NYC", "LAX", tomorrow))
+    assert [(itinerary["stops"], itinerary["total_price"]) for itinerary in itineraries] == [(0, 250.0)]
+    assert itineraries[0]["legs"][0]["flight_number"] == "AS101"
+
+
+def test_invalid_arguments_are_reported():
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    assert "error" in asyncio.run(search_itineraries("NYC", "LAX", "soon"))[0]
+    assert "error" in asyncio.run(search_itineraries("NYC", "LAX", tomorrow, max_stops=3))[0]
@@ -0,0 +1,145 @@
+import json
+
+import pytest
+
+import DB.journal as journal_module
+from DB.journal import BookingJournal, JournaledRepository
+from DB.repository import InMemoryRepository
+from tests.conftest import make_booking
+
+
+def open_repository(flights, path, **kwargs):
+    inventory = {flight.flight_id: flight.model_copy() for flight in flights}
+    return JournaledRepository(InMemoryRepository(inventory, {}), BookingJournal(str(path), commit_window=0), **kwargs)
+
+
+def restart(repository, flights, path, **kwargs):
+    repository.journal.close()
+    return open_repository(flights, path, **kwargs)
+
+
+def seats(repository, flight_id):
+    return repository.get_flight(flight_id).available_seats
+
+
+def test_replay_restores_bookings_and_seats(flights, tmp_path):
+    path = tmp_path / "bookings.journal"
+    repository = open_repository(flights, path)
+    kept = make_booking("F1", 30, "kept")
+    repository.create_booking(kept)
+    repository.create_booking(make_booking("F2", 5, "cancelled"))
+    repository.cancel_booking("cancelled")
+
+    repository = restart(repository, flights, path)
+    assert repository.get_booking("kept") == kept
+    assert repository.get_booking("cancelled") is None
+    assert seats(repository, "F1") == 70
+    assert seats(repository, "F2") == 80
+    assert repository.stats()["replayed"] == 3
+
+
+def test_torn_last_line_is_discarded(flights, tmp_path):
+    path = tmp_path / "bookings.journal"
+    repository = open_repository(flights, path)
+    repository.create_booking(make_booking("F1", 2, "whole"))
+    repository.journal.close()
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write('{"seq": 2, "op": "bo')
+
+    repository = open_repository(flights, path)
+    assert repository.get_booking("whole") is not None
+    repository.create_booking(make_booking("F1", 3, "after"))
+    repository = restart(repository, flights, path)
+    assert {booking.booking_id for booking in repository.list_bookings()} == {"whole", "after"}
+
+
+def test_compaction_checkpoints_live_bookings(flights, tmp_path):
+    path = tmp_path / "bookings.journal"
+    repository = open_repository(flights, path)
+    for i in range(5):
+        repository.create_booking(make_booking("F1", 1, f"B{i}"))
+    repository.cancel_booking("B0")
+    repository.compact()
+    repository.create_booking(make_booking("F2", 4, "late"))
+
+    with open(f"{path}.checkpoint", encoding="utf-8") as fh:
+        assert json.loads(fh.readline()) == {"seq": 6}
+        assert sorted(json.loads(line)["booking_id"] for line in fh) == ["B1", "B2", "B3", "B4"]
+    with open(path, encoding="utf-8") as fh:
+        assert [json.loads(line)["seq"] for line in fh] == [7]
+
+    repository = restart(repository, flights, path)
+    assert sorted(booking.booking_id for booking in repository.list_bookings()) == ["B1", "B2", "B3", "B4", "late"]
+    assert seats(repository, "F1") == 96
+    assert seats(repository, "F2") == 76
+
+
+def test_bookings_for_missing_flights_survive_compaction(flights, tmp_path):
+    path = tmp_path / "bookings.journal"
+    repository = open_repository(flights, path)
+    repository.create_booking(make_booking("F3", 2, "orphan"))
+
+    repository = restart(repository, flights[:2], path)
+    assert repository.get_booking("orphan") is None
+    assert repository.stats()["orphaned"] == 1
+    repository.compact()
+
+    repository = restart(repository, flights, path)
+    assert repository.get_booking("orphan") is not None
+    assert seats(repository, "F3") == 48
+    assert repository.stats()["orphaned"] == 0
+
+
+@pytest.fixture
+def failing_fsync(monkeypatch):
+    def fail(fd):
+        raise OSError("disk full")
+    return lambda: monkeypatch.setattr(journal_module, "_fsync", fail)
+
+
+def test_failed_commit_leaves_no_phantom_bookings(flights, tmp_path, failing_fsync):
+    path = tmp_path / "bookings.journal"
+    repository = open_repository(flights, path)
+    repository.create_booking(make_booking("F1", 10, "durable"))
+    failing_fsync()
+
+    for i in range(3):
+        with pytest.raises(OSError):
+            repository.create_booking(make_booking("F1", 10, f"lost{i}"))
+    with pytest.raises(OSError):
+        repository.cancel_booking("durable")
+
+    assert [booking.booking_id for booking in repository.list_bookings()] == ["durable"]
+    assert seats(repository, "F1") == 90
+    # Nothing that failed may come back on the next start either.
+    repository = open_repository(flights, path)
+    assert [booking.booking_id for booking in repository.list_bookings()] == ["durable"]
+
+
+def test_failed_commit_returns_held_seats_to_the_hold(flights, tmp_path, failing_fsync):
+    repository = open_repository(flights, tmp_path / "bookings.journal")
+    repository.reserve_seats("F1", 4)
+    failing_fsync()
+    with pytest.raises(OSError):
+        repository.create_booking(make_booking("F1", 4), seats_reserved=True)
+    assert seats(repository, "F1") == 96
+    assert list(repository.list_bookings()) == []
+
+
+def test_failed_batch_is_undone(flights, tmp_path, failing_fsync):
+    repository = open_repository(flights, tmp_path / "bookings.journal")
+    failing_fsync()
+    with pytest.raises(OSError):
+        with repository.batch():
+            repository.create_booking(make_booking("F1", 1, "a"))
+            repository.create_booking(make_booking("F2", 1, "b"))
+    assert list(repository.list_bookings()) == []
+    assert (seats(repository, "F1"), seats(repository, "F2")) == (100, 80)
+
+
+def test_journal_refuses_mock_inventory(monkeypatch, tmp_path):
+    from DB.flights_DB import create_repository
+
+    monkeypatch.setenv("BOOKING_JOURNAL_PATH", str(tmp_path / "bookings.journal"))
+    with pytest.raises(ValueError, match="FLIGHT_SCHEDULE_PATH"):
+        create_repository("memory", schedule_path="")
@@ -0,0 +1,83 @@
+import csv
+import json
+import sys
+
+import pytest
+
+from DB.loader import detect_format, load_flights, main, schedule_flight_id
+from DB.repository import InMemoryRepository
+from tests.conftest import DEPARTURE, make_flight
+
+
+def write_jsonl(path, flights):
+    path.write_text("".join(flight.model_dump_json() + "\n" for flight in flights))
+    return str(path)
+
+
+def test_jsonl_schedule_loads_in_batches(tmp_path):
+    schedule = write_jsonl(tmp_path / "schedule.jsonl", [make_flight(f"F{i}") for i in range(5)])
+    repository = InMemoryRepository()
+    seen = []
+
+    stats = load_flights(schedule, repository, batch_size=2, on_batch=lambda s: seen.append(s.rows))
+    assert (stats.rows, stats.loaded, stats.rejected, stats.batches) == (5, 5, 0, 3)
+    assert seen == [2, 4, 5]
+    assert len(repository.search_flights("NYC", "LAX", DEPARTURE.date())) == 5
+
+
+def test_csv_schedule_drops_invalid_rows(tmp_path, flights):
+    path = tmp_path / "schedule.csv"
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(flights[0].model_dump()))
+        writer.writeheader()
+        for flight in flights:
+            writer.writerow(flight.model_dump())
+        writer.writerow({**flights[0].model_dump(), "flight_id": "BAD", "price": "not a price"})
+
+    repository = InMemoryRepository()
+    stats = load_flights(str(path), repository)
+    assert (stats.rows, stats.loaded, stats.rejected) == (4, 3, 1)
+    assert repository.get_flight("F2").available_seats == 80
+    assert repository.get_flight("BAD") is None
+
+
+def test_reload_replaces_flights_by_id(tmp_path, flights):
+    repository = InMemoryRepository()
+    load_flights(write_jsonl(tmp_path / "a.jsonl", flights), repository)
+    load_flights(write_jsonl(tmp_path / "b.jsonl", [make_flight("F1", price=99.0)]), repository)
+    assert repository.get_flight("F1").price == 99.0
+    assert len(repository.search_flights("NYC", "LAX", DEPARTURE.date())) == 3
+
+
+def test_unknown_extension_is_rejected():
+    with pytest.raises(ValueError, match="extension"):
+        detect_format("flights.xml")
+
+
+def test_rows_without_ids_keep_the_same_id_across_loads(tmp_path, flights):
+    rows = [flight.model_dump(mode="json", exclude={"flight_id"}) for flight in flights[:2]]
+    rows[1]["flight_number"] = "AS2"
+    path = tmp_path / "schedule.jsonl"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+
+    repository = InMemoryRepository()
+    load_flights(str(path), repository)
+    first = sorted(flight.flight_id for flight in repository.flights.values())
+    assert len(first) == 2
+    load_flights(str(path), repository)
+    assert sorted(flight.flight_id for flight in repository.flights.values()) == first
+
+    # The id follows the departure time, not how the file happens to spell it.
+    respelled = dict(rows[0], departure_time=rows[0]["departure_time"].replace("T", " "))
+    assert schedule_flight_id(respelled) == schedule_flight_id(rows[0])
+
+
+def test_cli_loads_only_the_schedule(tmp_path, flights, monkeypatch):
+    from DB.sqlite_repository import SQLiteRepository
+
+    db_path = str(tmp_path / "flights.db")
+    schedule = write_jsonl(tmp_path / "schedule.jsonl", flights)
+    monkeypatch.setattr(sys, "argv", ["loader", schedule, "--backend", "sqlite", "--db-path", db_path])
+    monkeypatch.setenv("FLIGHT_DB_SYNC_INTERVAL", "0")
+    main()
+    assert SQLiteRepository(db_path).count_flights() == len(flights)
@@ -0,0 +1,25 @@
+import json
+
+from metrics import MetricsRegistry, payload_size
+
+
+def test_overflow_quantile_is_null_in_the_snapshot_and_inf_in_prometheus():
+    registry = MetricsRegistry()
+    registry.observe("tool", "slow", 0.002)
+    registry.observe("tool", "slow", 60.0)
+    registry.observe("tool", "slow", 61.0)
+
+    stats = registry.snapshot()["handlers"]["tool:slow"]
+    assert stats["latency_p50_ms_le"] is None
+    assert stats["latency_p99_ms_le"] is None
+    json.loads(json.dumps(stats, allow_nan=False))
+
+    registry.observe("tool", "fast", 0.002)
+    assert registry.snapshot()["handlers"]["tool:fast"]["latency_p50_ms_le"] == 2.5
+    assert 'mcp_handler_latency_seconds_bucket{kind="tool",name="slow",le="+Inf"} 3' in registry.render_prometheus()
+
+
+def test_payload_size():
+    assert payload_size('{"a": 1}') == 8
+    assert payload_size(b"abc") == 3
+    assert payload_size({"a": 1}) == len(json.dumps({"a": 1}))
@@ -0,0 +1,72 @@
+"""Reloading flights that are already stored must not free seats that bookings or holds occupy."""
+import pytest
+
+from DB.loader import load_flights
+from DB.repository import InMemoryRepository
+from DB.sqlite_repository import SQLiteRepository
+from tests.conftest import make_booking, make_flight
+
+
+def _memory(flights, tmp_path):
+    repository = InMemoryRepository()
+    repository.add_flights(flights)
+    return repository
+
+
+def _columnar(flights, tmp_path):
+    pytest.importorskip("numpy")
+    from DB.columnar_store import ColumnarRepository
+    repository = ColumnarRepository({})
+    repository.add_flights(flights)
+    return repository
+
+
+def _sqlite(flights, tmp_path):
+    repository = SQLiteRepository(str(tmp_path / "flights.db"))
+    repository.seed(flights)
+    return repository
+
+
+def _snapshot(flights, tmp_path):
+    pytest.importorskip("numpy")
+    from DB.snapshot import SnapshotRepository, write_snapshot
+    path = str(tmp_path / "flights.snap")
+    write_snapshot(flights, path)
+    return SnapshotRepository(path, {})
+
+
+BACKENDS = [_memory, _columnar, _sqlite, _snapshot]
+
+
+@pytest.mark.parametrize("open_backend", BACKENDS, ids=lambda factory: factory.__name__.strip("_"))
+def test_reload_keeps_booked_and_held_seats(open_backend, flights, tmp_path):
+    repository = open_backend(flights, tmp_path)
+    assert repository.create_booking(make_booking("F1", 30, "booked"))
+    repository.reserve_seats("F1", 5)  # a seat hold
+
+    repository.add_flights([make_flight("F1", seats=100, price=210.0), make_flight("F4", seats=20)])
+    assert repository.get_flight("F1").available_seats == 65
+    assert repository.get_flight("F1").price == 210.0
+    assert repository.get_flight("F2").available_seats == 80
+    assert repository.get_flight("F4").available_seats == 20
+
+    # A capacity change applies on top of the seats already taken, never below zero.
+    repository.add_flights([make_flight("F1", seats=120)])
+    assert repository.get_flight("F1").available_seats == 85
+    repository.add_flights([make_flight("F1", seats=10)])
+    assert repository.get_flight("F1").available_seats == 0
+    assert repository.get_booking("booked") is not None
+
+
+@pytest.mark.parametrize("open_backend", BACKENDS, ids=lambda factory: factory.__name__.strip("_"))
+def test_refresh_from_schedule_file(open_backend, flights, tmp_path):
+    schedule = tmp_path / "schedule.jsonl"
+    schedule.write_text("".join(flight.model_dump_json() + "\n" for flight in flights))
+    repository = open_backend(flights, tmp_path)
+    repository.create_booking(make_booking("F2", 8))
+
+    stats = load_flights(str(schedule), repository)
+    assert stats.loaded == len(flights)
+    assert repository.get_flight("F2").available_seats == 72
+    found = repository.search_flights("NYC", "LAX", flights[0].departure_time.date(), min_seats=73)
+    assert [flight.flight_id for flight in found] == ["F1"]
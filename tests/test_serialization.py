@@ -0,0 +1,69 @@
+"""The tool-result fast path must produce exactly what FastMCP's own conversion would."""
+import inspect
+import typing
+from datetime import date, timedelta
+
+import anyio
+import pytest
+from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+
+import tools  # noqa: F401  (registers the tools)
+from mcp_instance import mcp
+from serialization import encode_tool_result
+
+FLIGHT = {
+    "flight_id": "F1",
+    "airline": "AirSwift",
+    "flight_number": "AS101",
+    "origin": "NYC",
+    "destination": "LAX",
+    "departure_time": "2030-01-01T09:00:00",
+    "arrival_time": "2030-01-01T12:30:00",
+    "price": 250.0,
+    "available_seats": 100,
+}
+SAMPLES = {
+    dict: [{}, {"error": "Flight not found."}, {"status": "cancelled", "booking": {"booking_id": "B1", "num_seats": 2}}],
+    list: [[], [{"error": "Invalid date format. Use YYYY-MM-DD."}], [FLIGHT, dict(FLIGHT, flight_id="F2", price=99.5)]],
+}
+
+
+@pytest.mark.parametrize("tool", mcp._tool_manager.list_tools(), ids=lambda tool: tool.name)
+def test_encoding_matches_convert_result(tool):
+    returns = typing.get_origin(inspect.signature(tool.fn).return_annotation)
+    assert returns in SAMPLES, f"{tool.name} returns {returns}; add samples for it"
+    for sample in SAMPLES[returns]:
+        assert encode_tool_result(tool.fn_metadata, sample) == tool.fn_metadata.convert_result(sample)
+
+
+def _calls():
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    later = (date.today() + timedelta(days=5)).isoformat()
+    return [
+        ("search_flights", {"origin": "NYC", "destination": "LAX", "departure_date": tomorrow}),
+        ("search_flights", {"origin": "NYC", "destination": "LAX", "departure_date": "tomorrow"}),
+        ("search_flights", {"origin": "NYC", "destination": "LAX", "departure_date": tomorrow, "fields": ["price"]}),
+        ("search_flights_batch", {"queries": [
+            {"origin": "NYC", "destination": "LAX", "departure_date": tomorrow},
+            {"origin": "SFO", "destination": "ORD", "departure_date": tomorrow, "passenger": 2},
+        ]}),
+        ("search_itineraries", {"origin": "NYC", "destination": "LAX", "departure_date": tomorrow}),
+        ("fare_calendar", {"origin": "NYC", "destination": "LAX", "start_date": tomorrow, "end_date": later}),
+        ("resolve_airport", {"query": "san fransisco"}),
+        ("list_bookings", {"passenger_name": "Nobody"}),
+    ]
+
+
+@pytest.mark.parametrize("name,arguments", _calls())
+def test_call_tool_matches_fastmcp(name, arguments):
+    async def both():
+        return await mcp.call_tool(name, arguments), await FastMCP.call_tool(mcp, name, arguments)
+
+    ours, theirs = anyio.run(both)
+    assert ours == theirs
+
+
+def test_unknown_tool_raises_tool_error():
+    with pytest.raises(ToolError):
+        anyio.run(mcp.call_tool, "no_such_tool", {})
@@ -0,0 +1,125 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from DB.journal import BookingJournal, JournaledRepository  # noqa: E402
+from DB.snapshot import FlightSnapshot, SnapshotRepository, write_snapshot  # noqa: E402
+from tests.conftest import DEPARTURE, make_booking, make_flight  # noqa: E402
+
+
+@pytest.fixture
+def snapshot_path(flights, tmp_path):
+    path = str(tmp_path / "flights.snap")
+    write_snapshot(flights, path)
+    return path
+
+
+def file_seats(path, flight_id):
+    snapshot = FlightSnapshot(path)
+    return int(snapshot.records["seats"][snapshot.row_of(flight_id)])
+
+
+def test_snapshot_round_trips_flights(snapshot_path, flights):
+    repository = SnapshotRepository(snapshot_path, {})
+    assert repository.count_flights() == 3
+    assert repository.get_flight("F2") == flights[1]
+    assert repository.get_flight("missing") is None
+    assert [flight.flight_id for flight in repository.search_flights("NYC", "LAX", DEPARTURE.date(), min_seats=60)] == ["F2", "F1"]
+    assert repository.search_flights("LAX", "NYC", DEPARTURE.date()) == []
+
+
+def test_bookings_stay_in_process(snapshot_path):
+    repository = SnapshotRepository(snapshot_path, {})
+    assert repository.create_booking(make_booking("F3", 50, "all"))
+    assert not repository.create_booking(make_booking("F3", 1))
+    assert repository.get_flight("F3").available_seats == 0
+    assert file_seats(snapshot_path, "F3") == 50
+
+    assert repository.cancel_booking("all").num_seats == 50
+    assert repository.get_flight("F3").available_seats == 50
+
+
+def test_add_flights_rewrites_the_file(snapshot_path):
+    repository = SnapshotRepository(snapshot_path, {})
+    repository.add_flights([make_flight("F4", seats=20, origin="SFO"), make_flight("F1", price=99.0)])
+    assert repository.count_flights() == 4
+    assert repository.get_flight("F1").price == 99.0
+    reopened = SnapshotRepository(snapshot_path, {})
+    assert reopened.get_flight("F4").origin == "SFO"
+    assert reopened.get_flight("F1").price == 99.0
+
+
+def test_rewrite_keeps_loaded_seats_in_the_file(snapshot_path):
+    repository = SnapshotRepository(snapshot_path, {})
+    repository.create_booking(make_booking("F1", 30))
+    repository.add_flights([make_flight("F4", seats=20)])
+
+    assert file_seats(snapshot_path, "F1") == 100
+    assert repository.get_flight("F1").available_seats == 70
+    assert repository.count_flights() == 4
+    # Another process opening the rewritten file sees the full inventory, not our bookings.
+    assert SnapshotRepository(snapshot_path, {}).get_flight("F1").available_seats == 100
+
+
+def test_rewrite_then_restart_replays_bookings_once(snapshot_path, tmp_path):
+    journal_path = str(tmp_path / "bookings.journal")
+    repository = JournaledRepository(SnapshotRepository(snapshot_path, {}), BookingJournal(journal_path, 0))
+    repository.create_booking(make_booking("F1", 30))
+    repository.add_flights([make_flight("F4", seats=20)])
+    repository.journal.close()
+
+    repository = JournaledRepository(SnapshotRepository(snapshot_path, {}), BookingJournal(journal_path, 0))
+    assert repository.get_flight("F1").available_seats == 70
+
+
+def test_rewrite_carries_over_seats_taken_after_the_copy(snapshot_path, monkeypatch):
+    import DB.snapshot as snapshot_module
+
+    repository = SnapshotRepository(snapshot_path, {})
+    write = snapshot_module.write_snapshot
+
+    def write_then_book(flights, path):
+        count = write(flights, path)
+        # A booking lands between copying the rows and swapping the arrays in.
+        repository.create_booking(make_booking("F2", 7))
+        return count
+
+    monkeypatch.setattr(snapshot_module, "write_snapshot", write_then_book)
+    repository.add_flights([make_flight("F4", seats=20)])
+    assert repository.get_flight("F2").available_seats == 73
+
+
+def test_write_leaves_no_temporary_files(snapshot_path, tmp_path, monkeypatch):
+    write_snapshot([make_flight("F9")], snapshot_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["flights.snap"]
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("DB.snapshot.os.replace", fail)
+    with pytest.raises(OSError):
+        write_snapshot([make_flight("F10")], snapshot_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["flights.snap"]
+    assert FlightSnapshot(snapshot_path).row_of("F9") is not None
+
+
+def test_rewrite_merges_into_a_file_another_process_rewrote(snapshot_path):
+    first = SnapshotRepository(snapshot_path, {})
+    second = SnapshotRepository(snapshot_path, {})
+    second.create_booking(make_booking("F1", 10))
+    first.add_flights([make_flight("F4", seats=20)])
+
+    second.add_flights([make_flight("F5", seats=30)])
+    assert second.count_flights() == 5
+    assert second.get_flight("F4").available_seats == 20
+    assert second.get_flight("F1").available_seats == 90
+    assert SnapshotRepository(snapshot_path, {}).count_flights() == 5
+
+
+def test_readers_keep_the_state_they_started_with(snapshot_path):
+    repository = SnapshotRepository(snapshot_path, {})
+    listing = repository.list_flights()
+    first = next(listing)
+    repository.add_flights([make_flight("F4", seats=20)])
+    assert len([first, *listing]) == 3
+    assert repository.count_flights() == 4